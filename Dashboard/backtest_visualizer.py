@@ -1,14 +1,18 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
+import os
 from backtest_engine.backtester import Backtester
 from urllib.parse import urlencode
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
 from finstore.finstore import Finstore
 
+# Opt-in Finstore hot cache (uncompressed Arrow copy of every symbol read, see docs/finstore.md)
+FINSTORE_HOT_CACHE = os.getenv("FINSTORE_HOT_CACHE", "false").lower() == "true"
+
 @st.cache_resource
 def get_finstore(market_name, timeframe, pair=''):
-    return Finstore(market_name=market_name, timeframe=timeframe, pair=pair)
+    return Finstore(market_name=market_name, timeframe=timeframe, pair=pair, hot_cache=FINSTORE_HOT_CACHE)
 
 # 🔄 Load Previously Backtested Portfolio
 with st.expander("📂 Load Previous Backtest", expanded=True):
@@ -49,7 +53,7 @@ with st.expander("📂 Load Previous Backtest", expanded=True):
                     with st.spinner("Loading backtest..."):
                         pf, _ = Backtester.load_backtest(selected_backtest)
                     st.session_state.pf = pf
-                    st.session_state.trades_df = pf.trades.records_readable.sort_values(by="PnL", ascending=False).reset_index(drop=True)
+                    st.session_state.trades_df = pf.trades.sort_values(by="PnL", ascending=False).reset_index(drop=True)
                     st.success(f"Successfully loaded backtest: {selected_backtest}")
 
 # Continue only if portfolio is loaded
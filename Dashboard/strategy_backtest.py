@@ -22,6 +22,8 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path='config/.env')
 
 BACKTEST_BACKEND = os.getenv("BACKTEST_BACKEND", "vectorbt").lower()
+# Opt-in Finstore hot cache (uncompressed Arrow copy of every symbol read, see docs/finstore.md)
+FINSTORE_HOT_CACHE = os.getenv("FINSTORE_HOT_CACHE", "false").lower() == "true"
 
 # 📁 Directory structure for saving backtests
 SAVE_DIR = "saved_backtests"
@@ -33,15 +35,15 @@ os.makedirs(SAVE_DIR, exist_ok=True)
 # -------------------------------------------------------------------
 @st.cache_resource
 def get_finstore_crypto(timeframe='4h'):
-    return Finstore(market_name='crypto_binance', timeframe=timeframe)
+    return Finstore(market_name='crypto_binance', timeframe=timeframe, hot_cache=FINSTORE_HOT_CACHE)
 
 @st.cache_resource
 def get_finstore_indian_equity(timeframe='1d'):
-    return Finstore(market_name='indian_equity', timeframe=timeframe)
+    return Finstore(market_name='indian_equity', timeframe=timeframe, hot_cache=FINSTORE_HOT_CACHE)
 
 @st.cache_resource
 def get_finstore(market_name, timeframe, pair=''):
-    return Finstore(market_name=market_name, timeframe=timeframe, pair=pair)
+    return Finstore(market_name=market_name, timeframe=timeframe, pair=pair, hot_cache=FINSTORE_HOT_CACHE)
 
 # -------------------------------------------------------------------
 # Dummy Strategy Functions for Demonstration
@@ -546,7 +548,8 @@ def show_backtester_page():
                 cash_sharing=cash_sharing,
                 allow_partial=allow_partial,
                 progress_callback=update_progress,
-                pair='BTC'
+                pair='BTC',
+                hot_cache=FINSTORE_HOT_CACHE
             )
             
             pf = backtester.portfolio
@@ -766,26 +769,27 @@ def show_backtester_page():
                         returns_df = pf.returns.to_frame(name="Returns")
                         st.dataframe(returns_df)
 
-                        if BACKTEST_BACKEND == 'vectorbtpro':
-                            st.subheader("📝 Trade History")
-                            st.dataframe(pf.trade_history)
+                        st.subheader("📝 Order History")
+                        st.dataframe(pf.orders)
 
                         # Trade Signals (Records in a human-readable format)
                         st.subheader("📌 Trade Signals")
-                        st.dataframe(pf.trades.records_readable)
+                        st.dataframe(pf.trades)
 
                         # 🔍 Advanced Metrics & Risk Analysis
                         with st.spinner("Loading Advanced Statistics..."):
 
-                            if BACKTEST_BACKEND == 'vectorbtpro':
+                            # MFE / MAE need the full portfolio, only kept for backtests saved with keep_portfolio
+                            if BACKTEST_BACKEND == 'vectorbtpro' and pf.has_portfolio:
+                                full_pf = pf.portfolio()
                                 # Expanding Maximum Favorable Excursion (MFE)
                                 st.subheader("📊 Expanding MFE")
-                                fig_mfe = pf.trades.plot_expanding_mfe_returns()
+                                fig_mfe = full_pf.trades.plot_expanding_mfe_returns()
                                 st.plotly_chart(fig_mfe)
 
                                 # Expanding Maximum Adverse Excursion (MAE)
                                 st.subheader("📊 Expanding MAE")
-                                fig_mae = pf.trades.plot_expanding_mae_returns()
+                                fig_mae = full_pf.trades.plot_expanding_mae_returns()
                                 st.plotly_chart(fig_mae)
 
                             # 📈 Risk-adjusted Metrics: Sharpe & Sortino Ratios
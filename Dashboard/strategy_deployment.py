@@ -87,10 +87,12 @@ def live_deployments(manager):
 DEPLOYMENTS_FILE = "database/deployment/active_deployments.json"
 LOG_DIR = "database/deployment/logs"
 os.makedirs(LOG_DIR, exist_ok=True)
+# Opt-in Finstore hot cache (uncompressed Arrow copy of every symbol read, see docs/finstore.md)
+FINSTORE_HOT_CACHE = os.getenv("FINSTORE_HOT_CACHE", "false").lower() == "true"
 
 @st.cache_resource
 def get_finstore(market_name, timeframe, pair=''):
-    return Finstore(market_name=market_name, timeframe=timeframe, pair=pair)
+    return Finstore(market_name=market_name, timeframe=timeframe, pair=pair, hot_cache=FINSTORE_HOT_CACHE)
 
 # ---------------------------
 # Enhanced Strategy Modules
@@ -303,7 +305,8 @@ def deployment_runner_process(deployment_id, config):
                     cash_sharing=bool(config['deployer_params'].get('cash_sharing', False)),
                     allow_partial=bool(config['deployer_params'].get('allow_partial', False)),
                     oms_params=oms_params,
-                    progress_callback=lambda p, s: append_log(deployment_id, f"PROGRESS: {p}% - {s}")
+                    progress_callback=lambda p, s: append_log(deployment_id, f"PROGRESS: {p}% - {s}"),
+                    hot_cache=FINSTORE_HOT_CACHE
                 )
             except Exception as e:
                 st.error(f"Failed to load backtest: {str(e)}")
@@ -328,7 +331,8 @@ def deployment_runner_process(deployment_id, config):
                 oms_name=oms_name,
                 pair=config['market_params'].get('pair'),
                 oms_params=oms_params,
-                progress_callback=lambda p, s: append_log(deployment_id, f"PROGRESS: {p}% - {s}")
+                progress_callback=lambda p, s: append_log(deployment_id, f"PROGRESS: {p}% - {s}"),
+                hot_cache=FINSTORE_HOT_CACHE
             )
         
         append_log(deployment_id, "✅ Deployer initialized successfully")
@@ -86,9 +86,10 @@ class BacktestAdapter:
     @classmethod
     def from_signals(cls, close, open, entries, exits, direction, init_cash,
                      cash_sharing, size, size_type, fees, slippage, allow_partial,
-                     freq, sim_start=None, sim_end=None):
+                     freq, sim_start=None, sim_end=None, group_by=None):
         """
         Factory method that adapts differences in the from_signals API.
+        group_by (column levels, e.g. the parameter levels of a sweep) is passed to both backends.
         
         For vectorbtpro:
             - Pass all parameters including `open`, `sim_start`, `sim_end`
@@ -119,6 +120,7 @@ class BacktestAdapter:
                 freq=freq,
                 sim_start=sim_start,
                 sim_end=sim_end,
+                group_by=group_by,
             )
         elif BACKTEST_BACKEND == "vectorbt":
             # Adjust parameters:
@@ -137,7 +139,8 @@ class BacktestAdapter:
                 fees=fees,
                 slippage=slippage,
                 allow_partial=allow_partial,
-                freq=freq
+                freq=freq,
+                group_by=group_by,
             )
         else:
             raise NotImplementedError(f"Backend '{BACKTEST_BACKEND}' not supported.")
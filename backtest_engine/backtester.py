@@ -2,13 +2,15 @@ import pandas as pd
 import utils.backtest_backend # imports backtester dynamically
 import abstractbt as vbt
 from backtest_engine.backtest_adapter import BacktestAdapter
+from backtest_engine.sweep import expand_param_grid, sweep_strategies, stack_signals
+from backtest_engine.result_store import ResultStore, StoredBacktest
+from backtest_engine.signal_cache import SignalCache, signal_fingerprint
 from pandas.tseries.frequencies import to_offset
 from pathlib import Path
-import json
 import uuid
 from typing import Callable, Optional, List, Tuple, Dict, Any
 
-from finstore.finstore import Finstore
+from finstore.finstore import Finstore, Panel, _data_version
 from data.store.crypto_binance import store_crypto_binance
 from data.store.indian_equity import store_indian_equity
 from strategy.strategy_builder import StrategyBaseClass
@@ -39,6 +41,10 @@ class Backtester:
         allow_partial: bool,
         progress_callback: Callable[[int, str], None],
         pair: Optional[str] = None,
+        warmup_bars: Optional[int] = None,
+        run_backtest: bool = True,
+        signal_cache: bool = True,
+        hot_cache: bool = False,
     ) -> None:
         """
         Initialize the Backtester with the given parameters.
@@ -59,6 +65,12 @@ class Backtester:
             allow_partial (bool): Allow partial orders.
             progress_callback (Callable[[int, str], None]): Callback for progress updates.
             pair (Optional[str]): The trading pair, e.g., 'USDT', 'BTC' (for crypto).
+            warmup_bars (Optional[int]): Bars to read before start_date for indicator warm-up. Reads full history if None.
+            run_backtest (bool): Run the backtest of strategy_object on init. Pass False to only call sweep.
+            signal_cache (bool): Reuse the strategy signals of an earlier backtest with the same strategy, params and data
+                                 (see backtest_engine.signal_cache), so runs that only change costs or sizing skip the strategy.
+            hot_cache (bool): Read the OHLCV data through the Finstore hot cache (an uncompressed Arrow copy of each
+                              symbol read, kept on disk next to its parquet files).
         """
         self.market_name = market_name
         self.symbol_list = symbol_list
@@ -75,8 +87,13 @@ class Backtester:
         self.cash_sharing = cash_sharing
         self.allow_partial = allow_partial
         self.progress_callback = progress_callback
+        self.warmup_bars = warmup_bars
+        self.signal_cache = signal_cache
+        self.hot_cache = hot_cache
+        self.ohlcv_data = None
+        self.fetched_new_data = False
 
-        self.portfolio = self.backtest()
+        self.portfolio = self.backtest() if run_backtest else None
 
     def backtest(self) -> vbt.Portfolio:
         """
@@ -86,13 +103,75 @@ class Backtester:
             vbt.Portfolio: The simulated portfolio.
         """
         self.progress_callback(0, "Fetching data...")
-        ohlcv_data = self.data_fetch()
-
-        self.progress_callback(25, "Running strategy...")
-        entries, exits, close_data, open_data = self.strategy_object.run(ohlcv_data)
+        signal_cache = SignalCache() if self.signal_cache else None
+        signal_key = self._signal_key() if signal_cache else None
+        signals = signal_cache.get(signal_key) if signal_key else None
+
+        if signals is None:
+            ohlcv_data = self.load_data()
+
+            self.progress_callback(25, "Running strategy...")
+            signals = self.strategy_object.run(ohlcv_data)
+            # Keyed with the data versions from before the read, so data written meanwhile by another process is never
+            # taken for the data the signals were built on. Only a fetch of this read changes them.
+            if signal_cache and self.fetched_new_data:
+                signal_key = self._signal_key()
+            if signal_key:
+                signal_cache.set(signal_key, signals)
+        else:
+            self.progress_callback(25, "Using cached strategy signals...")
+        entries, exits, close_data, open_data = signals
 
         self.progress_callback(50, "Simulating portfolio...")
-        pf = BacktestAdapter.from_signals(
+        pf = self._simulate(entries, exits, close_data, open_data)
+
+        self.progress_callback(75, "Saving results...")
+
+        self.progress_callback(100, "Backtest complete.")
+        return pf
+
+    def data_versions(self) -> Optional[Dict[str, str]]:
+        """
+        Data version of each symbol of the backtest in the finstore manifest (see finstore._data_version), which
+        changes whenever its OHLCV data is written. None if a symbol has no data yet or the manifest cannot be read.
+        """
+        finstore = Finstore(market_name=self.market_name, timeframe=self.timeframe, pair=self.pair)
+        data_versions = {}
+        try:
+            for symbol in self.symbol_list:
+                entry = finstore.manifest.symbol(symbol)
+                if entry is None:
+                    return None
+                data_versions[symbol] = _data_version(entry)
+        except Exception as e:
+            print(f"Error reading the data manifest: {e}")
+            return None
+        return data_versions
+
+    def _signal_key(self) -> Optional[str]:
+        """
+        Fingerprint of the strategy signals of this backtest (see signal_fingerprint), from the data versions of the
+        data it reads. None if a symbol has no data yet, the signals are then not cached.
+        """
+        data_versions = self.data_versions()
+        if data_versions is None:
+            return None
+        read_start = None if self.warmup_bars is None else self.start_date - self.warmup_bars * to_offset(self.timeframe)
+        return signal_fingerprint(self.strategy_object, self.symbol_list, data_versions, read_start, self.end_date)
+
+    def load_data(self):
+        """
+        Returns the OHLCV data of the backtest, fetched on the first call and reused by later backtests and sweeps.
+        """
+        if self.ohlcv_data is None:
+            self.ohlcv_data = self.data_fetch()
+        return self.ohlcv_data
+
+    def _simulate(self, entries: pd.DataFrame, exits: pd.DataFrame, close_data: pd.DataFrame, open_data: pd.DataFrame, group_by=None) -> vbt.Portfolio:
+        """
+        Simulates the portfolio of the given signals with the backtest's settings.
+        """
+        return BacktestAdapter.from_signals(
             close=close_data,
             open=open_data,
             entries=entries,
@@ -108,36 +187,95 @@ class Backtester:
             freq=self._convert_timeframe_to_freq(),
             sim_start=self.start_date,
             sim_end=self.end_date,
+            group_by=group_by,
             )
 
-        self.progress_callback(75, "Saving results...")
+    def sweep(self, param_grid, metric: str = 'sharpe_ratio', ascending: bool = False, batch_size: Optional[int] = None) -> pd.DataFrame:
+        """
+        Backtests the strategy over a grid of parameters on data read once.
 
-        self.progress_callback(100, "Backtest complete.")
-        return pf
+        Each combination builds a strategy of the same class as strategy_object (its other parameters unchanged) and
+        runs it on the shared data. The signals of all combinations are column-stacked with the parameter values as
+        extra column levels and simulated in one from_signals call, grouped per combination, so cash sharing and the
+        metrics apply to each combination separately.
 
-    def data_fetch(self) -> pd.DataFrame:
+        Args:
+            param_grid (dict | list): {param : list of values} or a list of such dicts, see expand_param_grid.
+            metric (str): Column to rank the combinations by ('total_return', 'sharpe_ratio', 'sortino_ratio', 'max_drawdown').
+            ascending (bool): Rank ascending instead of descending.
+            batch_size (Optional[int]): Combinations per from_signals call, to bound memory on large grids. All at once if None.
+
+        Returns:
+            pd.DataFrame: One row per combination indexed by the parameter values, with columns total_return,
+                          sharpe_ratio, sortino_ratio, max_drawdown and rank (1 = best), sorted by rank.
+        """
+        combos = expand_param_grid(param_grid)
+        if not combos:
+            raise ValueError("param_grid has no parameter combinations")
+        strategies = sweep_strategies(self.strategy_object, combos)
+        param_names = list(dict.fromkeys(name for combo in combos for name in combo))
+        labels = [{name: combo.get(name, strategy.params.get(name)) for name in param_names} for combo, strategy in zip(combos, strategies)]
+
+        self.progress_callback(0, "Fetching data...")
+        ohlcv_data = self.load_data()
+
+        batch_size = batch_size or len(combos)
+        metrics = []
+        for start in range(0, len(combos), batch_size):
+            self.progress_callback(10 + int(80 * start / len(combos)), f"Simulating combinations {start + 1}-{min(start + batch_size, len(combos))} of {len(combos)}...")
+            batch_labels = labels[start:start + batch_size]
+            results = [strategy.run(ohlcv_data) for strategy in strategies[start:start + batch_size]]
+            entries, exits, close_data, open_data = stack_signals(results, batch_labels)
+            pf = self._simulate(entries, exits, close_data, open_data, group_by=param_names)
+            metrics.append(pd.DataFrame({
+                'total_return': pf.total_return,
+                'sharpe_ratio': pf.sharpe_ratio,
+                'sortino_ratio': pf.sortino_ratio,
+                'max_drawdown': pf.max_drawdown,
+            }))
+
+        metrics_df = pd.concat(metrics).sort_values(metric, ascending=ascending)
+        metrics_df['rank'] = range(1, len(metrics_df) + 1)
+        self.progress_callback(100, "Sweep complete.")
+        return metrics_df
+
+    def data_fetch(self, as_panel: Optional[bool] = None) -> pd.DataFrame:
         """
         Fetch OHLCV data, fetching new data if necessary.
+        Strategies with supports_panel get a Panel of aligned arrays instead of a dictionary of DataFrames.
+
+        Args:
+            as_panel (Optional[bool]): Read a Panel (True) or a dictionary (False) whatever the strategy supports.
 
         Returns:
             pd.DataFrame: The fetched OHLCV data.
         """
-        finstore = Finstore(market_name=self.market_name, timeframe=self.timeframe, pair=self.pair)
+        finstore = Finstore(market_name=self.market_name, timeframe=self.timeframe, pair=self.pair, hot_cache=self.hot_cache)
+        read_start = None
+        if self.warmup_bars is not None:
+            read_start = self.start_date - self.warmup_bars * to_offset(self.timeframe)
+        if as_panel is None:
+            as_panel = getattr(self.strategy_object, 'supports_panel', False)
+        if as_panel:
+            read_data = lambda: finstore.read.panel(self.symbol_list, start=read_start, end=self.end_date)
+        else:
+            read_data = lambda: finstore.read.symbol_list(self.symbol_list, start=read_start, end=self.end_date)
         ohlcv_dict = {}
         try:
             self.progress_callback(5, "Reading existing data...")
-            ohlcv_dict = finstore.read.symbol_list(self.symbol_list)
+            ohlcv_dict = read_data()
             self._validate_data_dates(ohlcv_dict)
         except Exception as e:
             self.progress_callback(10, f"Data read failed: {str(e)}. Fetching new data...")
             print(f"Data read failed: {str(e)}. Fetching new data...")
             self.fetch_new_data()
             self.progress_callback(15, "Retrying data read...")
-            ohlcv_dict = finstore.read.symbol_list(self.symbol_list)
+            ohlcv_dict = read_data()
             self._validate_data_dates(ohlcv_dict)
 
         # Ensure we have dataframes for all requested symbols
-        missing_symbols = set(self.symbol_list) - set(ohlcv_dict.keys())
+        available_symbols = ohlcv_dict.symbols if isinstance(ohlcv_dict, Panel) else ohlcv_dict.keys()
+        missing_symbols = set(self.symbol_list) - set(available_symbols)
         if missing_symbols:
             print(f"Missing data for symbols: {', '.join(missing_symbols)}")
 
@@ -148,13 +286,19 @@ class Backtester:
         Validate that each symbol's data covers the required date range.
         """
         try:
-            for symbol, original_df in ohlcv_dict.items():
-                df = original_df.copy()
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                if df['timestamp'].iloc[0] > self.start_date:
+            if isinstance(ohlcv_dict, Panel):
+                valid = ohlcv_dict.valid()
+                timestamps = {symbol: ohlcv_dict.index[valid[:, column]] for column, symbol in enumerate(ohlcv_dict.symbols)}
+                date_ranges = {symbol: (index[0], index[-1]) for symbol, index in timestamps.items()}
+            else:
+                date_ranges = {symbol: (df['timestamp'].iloc[0], df['timestamp'].iloc[-1]) for symbol, df in ohlcv_dict.items()}
+
+            for symbol, (first_timestamp, last_timestamp) in date_ranges.items():
+                # Finstore returns datetime64 timestamps, no parsing needed
+                if first_timestamp > self.start_date:
                     print(f"Warning: Data for {symbol} starts after backtest start date.")
 
-                if df['timestamp'].iloc[-1] < self.end_date:
+                if last_timestamp < self.end_date:
                     print(f"Warning: Data for {symbol} ends before backtest end date.")
         except Exception as e:
             print(f'Error while validating dates : {e}')
@@ -173,6 +317,8 @@ class Backtester:
         data_points = int(data_points * 1.2)  # Add buffer
 
         self.progress_callback(15, f"Fetching {data_points} data points...")
+        # The stored data changes from here, see the signal cache key in backtest
+        self.fetched_new_data = True
         if self.market_name == 'crypto_binance':
             store_crypto_binance(
                 timeframe=self.timeframe,
@@ -204,9 +350,14 @@ class Backtester:
         }
         return tf_map.get(self.timeframe, self.timeframe)
 
-    def save_backtest(self, pf: vbt.Portfolio = None, save_name : str = None) -> None:
+    def save_backtest(self, pf: vbt.Portfolio = None, save_name : str = None, keep_portfolio: bool = False) -> None:
         """
-        Save the backtest results and parameters.
+        Save the backtest results and parameters to the result store (see backtest_engine.result_store).
+
+        Args:
+            pf (vbt.Portfolio): Portfolio to save, self.portfolio if None.
+            save_name (str): Backtest id, a timestamp and random suffix if None.
+            keep_portfolio (bool): Also pickle the full portfolio (large), for analyses beyond the stored equity, trades and orders.
         """
         if not pf:
             pf = self.portfolio
@@ -214,102 +365,36 @@ class Backtester:
             backtest_id = save_name
         else:
             backtest_id = f"{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
-        save_dir = Path("database/backtest") / backtest_id
-        save_dir.mkdir(parents=True, exist_ok=True)
-
-        # Create consolidated parameters with proper serialization
-        full_params = {
-            "backtest_id": backtest_id,
-            "created_at": pd.Timestamp.now().isoformat(),
-            "strategy_name": self.strategy_object.display_name,
-            "market_name": self.market_name,
-            "symbol_list": self.symbol_list,
-            "pair": self.pair,
-            "timeframe": self.timeframe,
-            "strategy_type": self.strategy_type,
-            "start_date": self.start_date.isoformat(),
-            "end_date": self.end_date.isoformat(),
-            "init_cash": self.init_cash,
-            "fees": self.fees,
-            "slippage": self.slippage,
-            "size": self.size,
-            "cash_sharing": self.cash_sharing,
-            "allow_partial": self.allow_partial,
-            "strategy_params": self.strategy_object.params,
-            "performance": {
-                "returns": float(pf.total_return),
-                "sharpe_ratio": float(pf.sharpe_ratio),
-                "max_drawdown": float(pf.max_drawdown),
-                "duration_days": (self.end_date - self.start_date).days
-            }
-        }
-
-        # Save parameters (single consolidated file)
-        with open(save_dir / "params.json", 'w') as f:
-            json.dump(full_params, f, indent=4, default=str)
 
-        # Save portfolio and trades
-        self.progress_callback(80, "Saving portfolio...")
-        pf.save(str(save_dir / "portfolio.pkl"))
-
-        self.progress_callback(85, "Saving trades...")
-        trades = pf.trades.records_readable
-        trades.to_parquet(save_dir / "trades.parquet")
+        self.progress_callback(80, "Saving results...")
+        ResultStore(Backtester.BACKTEST_DIR).save_portfolio(self, pf, backtest_id, keep_portfolio=keep_portfolio)
 
         self.progress_callback(100, "Backtest saved.")
     
     @staticmethod
     def list_backtests() -> Dict[str, Dict[str, Any]]:
         """
-        List all saved backtests with their parameters.
+        List all saved backtests with their parameters, from the result store catalog.
+        Use ResultStore.list to filter and sort them in the query.
 
         Returns:
             Dict[str, Dict[str, Any]]: Dictionary of backtest names mapped to their parameters.
         """
-        backtests = {}
-        if not Backtester.BACKTEST_DIR.exists():
-            print("No backtest directory found.")
-            return backtests
-
-        for backtest_folder in Backtester.BACKTEST_DIR.iterdir():
-            if backtest_folder.is_dir():
-                params_file = backtest_folder / "params.json"
-                if params_file.exists():
-                    try:
-                        with open(params_file, 'r') as f:
-                            params = json.load(f)
-                        backtests[backtest_folder.name] = params
-                    except Exception as e:
-                        print(f"Error reading {params_file}: {e}")
-
-        return backtests
+        return ResultStore(Backtester.BACKTEST_DIR).params()
 
     @staticmethod
-    def load_backtest(backtest_name: str) -> Tuple[vbt.Portfolio, Dict[str, Any]]:
+    def load_backtest(backtest_name: str) -> Tuple[StoredBacktest, Dict[str, Any]]:
         """
-        Load a saved backtest by name.
+        Load a saved backtest by name. Its equity curve, trades and orders are read when first used.
 
         Args:
             backtest_name (str): The name of the backtest to load.
 
         Returns:
-            Tuple[vbt.Portfolio, Dict[str, Any]]: A tuple containing the loaded Portfolio object and its parameters.
+            Tuple[StoredBacktest, Dict[str, Any]]: A tuple containing the stored backtest and its parameters.
         """
-        backtest_path = Backtester.BACKTEST_DIR / backtest_name
-        params_file = backtest_path / "params.json"
-        portfolio_file = backtest_path / "portfolio.pkl"
-
-        if not params_file.exists() or not portfolio_file.exists():
-            raise FileNotFoundError(f"Backtest {backtest_name} not found or incomplete.")
-
-        # Load parameters
-        with open(params_file, 'r') as f:
-            params = json.load(f)
-
-        # Load portfolio
-        portfolio = BacktestAdapter(vbt.Portfolio.load(str(portfolio_file)))
-
-        return portfolio, params
+        backtest = ResultStore(Backtester.BACKTEST_DIR).load(backtest_name)
+        return backtest, backtest.params
 
 
 if __name__ == '__main__':
@@ -0,0 +1,390 @@
+'''
+Usage :
+from backtest_engine.result_store import ResultStore
+
+store = ResultStore()
+store.list(where="strategy_name = ? AND sharpe_ratio > ?", params=['EMA Crossover Strategy', 1.5], order_by='sharpe_ratio DESC', limit=20)
+result = store.load('20250301_101500_ab12cd')
+result.value                # equity curve, read on first access
+result.trades               # trades, read on first access
+'''
+import json
+import time
+import duckdb
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from typing import Optional, List, Dict, Any
+
+from finstore.finstore import _connect, _dataset_files, _dataset_query, _list_segments, _write_parquet, _write_segment, _compact_dataset
+from utils.db.lock import FileLock
+
+RESULTS_DIR = Path("database/backtest")
+
+# One row of settings and metrics per saved backtest: <results dir>/catalog.parquet, appended as segments
+# (catalog_segments/<time_ns>_<id>.parquet) and compacted into the main file every COMPACT_SEGMENTS saves.
+# A backtest saved again under the same id replaces its row.
+CATALOG_FILE = 'catalog.parquet'
+CATALOG_LOCK_FILE = 'catalog.lock'
+CATALOG_KEYS = ['backtest_id']
+COMPACT_SEGMENTS = 64
+
+# Per backtest directory: equity curve (timestamp + one float column per portfolio column), trades and orders
+# records, and the portfolio stats. portfolio.pkl only exists for backtests saved with keep_portfolio (or before the catalog).
+EQUITY_FILE = 'equity.parquet'
+TRADES_FILE = 'trades.parquet'
+ORDERS_FILE = 'orders.parquet'
+STATS_FILE = 'stats.json'
+PORTFOLIO_FILE = 'portfolio.pkl'
+LEGACY_PARAMS_FILE = 'params.json'
+
+# Catalog columns holding JSON, decoded by ResultStore.params
+JSON_COLUMNS = ['symbol_list', 'strategy_params']
+PERFORMANCE_COLUMNS = {'returns': 'total_return', 'sharpe_ratio': 'sharpe_ratio', 'sortino_ratio': 'sortino_ratio',
+                       'max_drawdown': 'max_drawdown', 'duration_days': 'duration_days'}
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def _equity_frame(value) -> pd.DataFrame:
+    """
+    Equity curve (pd.Series or one column per portfolio column / group) as a DataFrame with a 'timestamp' column
+    followed by float64 columns, ready for columnar storage.
+    """
+    frame = value.to_frame('value') if isinstance(value, pd.Series) else value.copy()
+    frame.columns = ['_'.join(map(str, column)) if isinstance(column, tuple) else str(column) for column in frame.columns]
+    frame = frame.astype(np.float64)
+    frame.index = pd.DatetimeIndex(frame.index, name='timestamp')
+    return frame.reset_index()
+
+
+class StoredBacktest:
+    """
+    A saved backtest, read lazily: the equity curve, trades and orders are each read from their own file on first
+    access, so opening a backtest to show its metrics or plot its equity does not load the rest.
+
+    Exposes the attributes the dashboards use on a live portfolio (value, returns, cumulative_returns, the metrics,
+    stats()), with trades and orders as DataFrames of their readable records.
+    """
+
+    def __init__(self, backtest_dir : Path, params : Dict[str, Any]):
+        self.backtest_dir = backtest_dir
+        self.params = params
+        self._value = None
+        self._trades = None
+        self._orders = None
+
+    def __repr__(self):
+        return f"StoredBacktest({self.params['backtest_id']!r})"
+
+    @property
+    def has_portfolio(self) -> bool:
+        return (self.backtest_dir / PORTFOLIO_FILE).exists()
+
+    def portfolio(self):
+        """
+        The full pickled portfolio (BacktestAdapter), for analyses the stored results do not cover. Only exists for
+        backtests saved with keep_portfolio.
+        """
+        if not self.has_portfolio:
+            raise FileNotFoundError(f"Backtest {self.params['backtest_id']} was saved without its portfolio.")
+        import abstractbt as vbt
+        from backtest_engine.backtest_adapter import BacktestAdapter
+        return BacktestAdapter(vbt.Portfolio.load(str(self.backtest_dir / PORTFOLIO_FILE)))
+
+    @property
+    def value(self):
+        if self._value is None:
+            equity_path = self.backtest_dir / EQUITY_FILE
+            if equity_path.exists():
+                frame = pd.read_parquet(equity_path).set_index('timestamp')
+                self._value = frame['value'] if list(frame.columns) == ['value'] else frame
+            else:
+                self._value = self.portfolio().value
+        return self._value
+
+    @property
+    def returns(self):
+        value = self.value
+        return value / value.shift(1, fill_value=self.params['init_cash']) - 1
+
+    @property
+    def cumulative_returns(self):
+        return (1 + self.returns).cumprod() - 1
+
+    @property
+    def total_return(self) -> float:
+        return self.params['performance']['returns']
+
+    @property
+    def sharpe_ratio(self) -> float:
+        return self.params['performance']['sharpe_ratio']
+
+    @property
+    def sortino_ratio(self) -> float:
+        return self.params['performance']['sortino_ratio']
+
+    @property
+    def max_drawdown(self) -> float:
+        return self.params['performance']['max_drawdown']
+
+    @property
+    def trades(self) -> pd.DataFrame:
+        if self._trades is None:
+            self._trades = self._read_records(TRADES_FILE)
+        return self._trades
+
+    @property
+    def orders(self) -> pd.DataFrame:
+        if self._orders is None:
+            self._orders = self._read_records(ORDERS_FILE)
+        return self._orders
+
+    def _read_records(self, file_name : str) -> pd.DataFrame:
+        path = self.backtest_dir / file_name
+        return pd.read_parquet(path) if path.exists() else pd.DataFrame()
+
+    def stats(self) -> pd.Series:
+        """
+        The portfolio stats as computed when the backtest was saved (values that are not numbers come back as strings),
+        or the catalog metrics for backtests saved without them.
+        """
+        stats_path = self.backtest_dir / STATS_FILE
+        if stats_path.exists():
+            with open(stats_path, 'r') as f:
+                return pd.Series(json.load(f), dtype=object)
+        return pd.Series(self.params['performance'], dtype=object)
+
+
+class ResultStore:
+    """
+    Catalog of saved backtests.
+
+    Settings and metrics of every backtest are rows of one parquet table (see CATALOG_FILE), queried with DuckDB, so
+    listing and filtering thousands of backtests reads a single small file instead of one params.json per backtest.
+    Each backtest directory holds its equity curve and trades / orders records as zstd-compressed parquet columns,
+    read only when the backtest is opened (see StoredBacktest). Portfolios are no longer pickled unless asked for.
+
+    Args:
+        results_dir (Path): Directory holding the catalog and one directory per backtest.
+    """
+
+    def __init__(self, results_dir : Path = RESULTS_DIR):
+        self.results_dir = Path(results_dir)
+        self.catalog_path = str(self.results_dir / CATALOG_FILE)
+
+    def save(self, record : Dict[str, Any], value, trades : pd.DataFrame = None, orders : pd.DataFrame = None,
+             stats : pd.Series = None, portfolio=None) -> str:
+        """
+        Saves a backtest. Its files are written before its catalog row, so a listed backtest is always complete.
+
+        Args:
+            record (Dict[str, Any]): Catalog row: 'backtest_id', the backtest settings and metrics. symbol_list and
+                                     strategy_params are stored as JSON.
+            value (pd.Series | pd.DataFrame): Equity curve.
+            trades, orders (pd.DataFrame): Readable trades / orders records.
+            stats (pd.Series): Portfolio stats.
+            portfolio: Portfolio to pickle as well (anything with save(path)), for analyses beyond the stored results.
+
+        Returns:
+            str: The backtest id.
+        """
+        backtest_id = record['backtest_id']
+        backtest_dir = self.results_dir / backtest_id
+        backtest_dir.mkdir(parents=True, exist_ok=True)
+
+        _write_parquet(_equity_frame(value), str(backtest_dir / EQUITY_FILE))
+        for records, file_name in ((trades, TRADES_FILE), (orders, ORDERS_FILE)):
+            if records is not None:
+                _write_parquet(records.reset_index(drop=True), str(backtest_dir / file_name))
+        if stats is not None:
+            with open(backtest_dir / STATS_FILE, 'w') as f:
+                json.dump({str(name): stat.item() if isinstance(stat, np.generic) else stat for name, stat in stats.items()}, f, indent=4, default=str)
+        if portfolio is not None:
+            portfolio.save(str(backtest_dir / PORTFOLIO_FILE))
+
+        self._append([record])
+        return backtest_id
+
+    def save_portfolio(self, backtester, pf, backtest_id : str, keep_portfolio : bool = False) -> str:
+        """
+        Saves a Backtester's portfolio (BacktestAdapter) under backtest_id, see save.
+        """
+        record = {
+            "backtest_id": backtest_id,
+            "created_at": pd.Timestamp.now(),
+            "strategy_name": backtester.strategy_object.display_name,
+            "market_name": backtester.market_name,
+            "symbol_list": backtester.symbol_list,
+            "pair": backtester.pair,
+            "timeframe": backtester.timeframe,
+            "strategy_type": backtester.strategy_type,
+            "start_date": backtester.start_date,
+            "end_date": backtester.end_date,
+            "init_cash": backtester.init_cash,
+            "fees": backtester.fees,
+            "slippage": backtester.slippage,
+            "size": backtester.size,
+            "cash_sharing": backtester.cash_sharing,
+            "allow_partial": backtester.allow_partial,
+            "strategy_params": backtester.strategy_object.params,
+            "total_return": _float(pf.total_return),
+            "sharpe_ratio": _float(pf.sharpe_ratio),
+            "sortino_ratio": _float(pf.sortino_ratio),
+            "max_drawdown": _float(pf.max_drawdown),
+            "duration_days": (backtester.end_date - backtester.start_date).days,
+        }
+        return self.save(record, pf.value, trades=pf.trades.records_readable, orders=pf.orders.records_readable,
+                         stats=pf.stats(), portfolio=pf if keep_portfolio else None)
+
+    def _append(self, records : List[Dict[str, Any]]) -> None:
+        """
+        Appends catalog rows as a new segment, compacting the catalog once it has COMPACT_SEGMENTS segments.
+        """
+        rows = pd.DataFrame(records)
+        for column in JSON_COLUMNS:
+            if column in rows:
+                rows[column] = [json.dumps(value, default=str) for value in rows[column]]
+        for column in ('start_date', 'end_date', 'created_at'):
+            if column in rows:
+                rows[column] = pd.to_datetime(rows[column])
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        _write_segment(rows, self.catalog_path)
+
+        if len(_list_segments(self.catalog_path)) >= COMPACT_SEGMENTS:
+            with FileLock(str(self.results_dir / CATALOG_LOCK_FILE)):
+                _compact_dataset(self.catalog_path, CATALOG_KEYS, keep='last', typed_timestamps=False)
+
+    def list(self, where : Optional[str] = None, params : Optional[list] = None, order_by : Optional[str] = None,
+             limit : Optional[int] = None) -> pd.DataFrame:
+        """
+        Queries the catalog.
+
+        Args:
+            where (Optional[str]): SQL condition on the catalog columns, with ? placeholders for params.
+                                   Strategy parameters are JSON, e.g. "strategy_params->>'fast_ema_period' = '10'".
+            params (Optional[list]): Values of the placeholders.
+            order_by (Optional[str]): SQL ORDER BY clause, e.g. 'sharpe_ratio DESC'. Save order by default.
+            limit (Optional[int]): Maximum number of rows.
+
+        Returns:
+            pd.DataFrame: One row per backtest (the latest save of each backtest_id).
+        """
+        if not _dataset_files(self.catalog_path):
+            # First use of the store: backtests saved before the catalog are indexed once
+            self.index_legacy()
+        return self._query(where, params, order_by, limit)
+
+    def _query(self, where : Optional[str] = None, params : Optional[list] = None, order_by : Optional[str] = None,
+               limit : Optional[int] = None) -> pd.DataFrame:
+        """
+        Runs a catalog query, see list.
+        """
+        files = _dataset_files(self.catalog_path)
+        if not files:
+            return pd.DataFrame(columns=['backtest_id'])
+
+        conn = _connect()
+        try:
+            for attempt in range(3):
+                catalog_query, query_params = _dataset_query({None: files}, CATALOG_KEYS, 'last', None, None, None, None, None,
+                                                             hive_partitioning=False, typed_timestamps=False)
+                query = f"SELECT * EXCLUDE (__symbol_order) FROM ({catalog_query})"
+                if where:
+                    query += f" WHERE {where}"
+                if order_by:
+                    query += f" ORDER BY {order_by}"
+                if limit is not None:
+                    query += f" LIMIT {int(limit)}"
+                try:
+                    return conn.execute(query, query_params + list(params or [])).fetchdf()
+                except duckdb.ProgrammingError:
+                    raise
+                except duckdb.Error:
+                    # A concurrent compaction deleted segments between listing and reading them: list the files again
+                    if attempt == 2 or files == _dataset_files(self.catalog_path):
+                        raise
+                    files = _dataset_files(self.catalog_path)
+                    time.sleep(0.01 * (attempt + 1))
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _params(row : Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Catalog row as the parameters dictionary saved backtests have always had (the former params.json).
+        """
+        params = {key: value for key, value in row.items() if key not in PERFORMANCE_COLUMNS.values()}
+        for column in JSON_COLUMNS:
+            if isinstance(params.get(column), str):
+                params[column] = json.loads(params[column])
+        for column in ('start_date', 'end_date', 'created_at'):
+            if isinstance(params.get(column), pd.Timestamp):
+                params[column] = params[column].isoformat()
+        params['performance'] = {name: row.get(column) for name, column in PERFORMANCE_COLUMNS.items()}
+        return params
+
+    def params(self, backtest_id : Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parameters of one backtest (backtest_id given) or {backtest_id : parameters} of all of them.
+        """
+        if backtest_id is None:
+            return {row['backtest_id']: self._params(row) for row in self.list().to_dict('records')}
+        rows = self.list(where="backtest_id = ?", params=[backtest_id]).to_dict('records')
+        if not rows:
+            # A backtest directory saved before the catalog (e.g. copied in after it was created)
+            record = self._legacy_record(self.results_dir / backtest_id)
+            if record is None:
+                raise FileNotFoundError(f"Backtest {backtest_id} not found.")
+            self._append([record])
+            rows = self._query(where="backtest_id = ?", params=[backtest_id]).to_dict('records')
+        return self._params(rows[0])
+
+    def load(self, backtest_id : str) -> StoredBacktest:
+        """
+        Opens a saved backtest. Nothing but its catalog row is read until its attributes are used.
+        """
+        return StoredBacktest(self.results_dir / backtest_id, self.params(backtest_id))
+
+    def index_legacy(self) -> List[str]:
+        """
+        Adds the backtests saved before the catalog (a params.json per directory) to it. Their portfolio.pkl is kept
+        and read for the equity curve when they are opened. Runs on its own the first time the catalog is listed.
+
+        Returns:
+            List[str]: Ids of the backtests added.
+        """
+        known = set(self._query()['backtest_id'])
+        records = []
+        for backtest_dir in sorted(self.results_dir.iterdir()) if self.results_dir.exists() else []:
+            if backtest_dir.name in known:
+                continue
+            record = self._legacy_record(backtest_dir)
+            if record is not None:
+                records.append(record)
+        if records:
+            self._append(records)
+        return [record['backtest_id'] for record in records]
+
+    @staticmethod
+    def _legacy_record(backtest_dir : Path) -> Optional[Dict[str, Any]]:
+        """
+        Catalog row of a backtest directory saved before the catalog, None if it has no readable params.json.
+        """
+        params_file = backtest_dir / LEGACY_PARAMS_FILE
+        if not params_file.exists():
+            return None
+        try:
+            with open(params_file, 'r') as f:
+                params = json.load(f)
+        except Exception as e:
+            print(f"Error reading {params_file}: {e}")
+            return None
+        performance = params.pop('performance', {})
+        record = {**params, 'backtest_id': backtest_dir.name}
+        record.update({column: _float(performance.get(name)) for name, column in PERFORMANCE_COLUMNS.items()})
+        return record
@@ -0,0 +1,117 @@
+'''
+Usage :
+from backtest_engine.signal_cache import SignalCache, signal_fingerprint
+
+signal_cache = SignalCache()
+key = signal_fingerprint(strategy_object, symbol_list, data_versions, start, end)
+signals = signal_cache.get(key)         # (entries, exits, close_data, open_data) or None
+signal_cache.set(key, signals)
+'''
+import hashlib
+import json
+import pickle
+import zlib
+import diskcache as dc
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+SIGNAL_CACHE_DIR = 'database/backtest/signal_cache'
+# Entries beyond the size limit are evicted least recently read first
+SIGNAL_CACHE_SIZE_LIMIT = 2 ** 31
+
+
+def signal_fingerprint(strategy_object, symbol_list : List[str], data_versions : Dict[str, str], start, end) -> str:
+    """
+    Key of the signals a strategy generates on a data read: strategy class and params, symbols, the data version of
+    each symbol (finstore manifest, see finstore._data_version) and the read range. Costs and position sizing are
+    not part of it, they only change the simulation.
+
+    Args:
+        strategy_object (StrategyBaseClass): The strategy.
+        symbol_list (List[str]): Symbols in the order they are read.
+        data_versions (Dict[str, str]): {symbol : data version}.
+        start, end: Range of the data read (start None for the full history).
+    """
+    strategy_class = type(strategy_object)
+    fields = [
+        f"{strategy_class.__module__}.{strategy_class.__qualname__}",
+        sorted(strategy_object.params.items()),
+        list(symbol_list),
+        [data_versions.get(symbol) for symbol in symbol_list],
+        str(start),
+        str(end),
+    ]
+    return hashlib.sha1(json.dumps(fields, default=str).encode()).hexdigest()
+
+def encode_signals(signals : Tuple[pd.DataFrame, ...]) -> bytes:
+    """
+    Serializes the (entries, exits, close_data, open_data) of a strategy run: boolean frames as bitsets (np.packbits),
+    other frames as their values, each zlib-compressed, with the index and columns pickled alongside.
+    """
+    frames = []
+    for frame in signals:
+        if frame is None:
+            frames.append(None)
+            continue
+        values = frame.to_numpy()
+        is_bool = values.dtype == np.bool_
+        data = np.packbits(values, axis=None).tobytes() if is_bool else np.ascontiguousarray(values).tobytes()
+        frames.append({
+            'index': frame.index,
+            'columns': frame.columns,
+            'dtype': values.dtype.str,
+            'shape': values.shape,
+            'bits': is_bool,
+            'data': zlib.compress(data, 1),
+        })
+    return pickle.dumps(frames, protocol=pickle.HIGHEST_PROTOCOL)
+
+def decode_signals(blob : bytes) -> Tuple[pd.DataFrame, ...]:
+    """
+    Inverse of encode_signals.
+    """
+    signals = []
+    for frame in pickle.loads(blob):
+        if frame is None:
+            signals.append(None)
+            continue
+        data = zlib.decompress(frame['data'])
+        size = int(np.prod(frame['shape']))
+        if frame['bits']:
+            values = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=size).astype(np.bool_)
+        else:
+            values = np.frombuffer(data, dtype=np.dtype(frame['dtype'])).copy()
+        signals.append(pd.DataFrame(values.reshape(frame['shape']), index=frame['index'], columns=frame['columns']))
+    return tuple(signals)
+
+class SignalCache:
+    """
+    Disk cache of strategy signals keyed by signal_fingerprint, so backtests that only change costs or sizing skip
+    the data read and the strategy run. Signals are stored compressed (see encode_signals) in a diskcache.Cache
+    that evicts the least recently used entries once it grows past size_limit bytes.
+
+    Args:
+        directory (str): Cache directory.
+        size_limit (int): Maximum size of the cache in bytes.
+    """
+
+    def __init__(self, directory : str = SIGNAL_CACHE_DIR, size_limit : int = SIGNAL_CACHE_SIZE_LIMIT):
+        self.cache = dc.Cache(directory, size_limit=size_limit, eviction_policy='least-recently-used')
+
+    def get(self, key : str) -> Optional[Tuple[pd.DataFrame, ...]]:
+        blob = self.cache.get(key)
+        if blob is None:
+            return None
+        try:
+            return decode_signals(blob)
+        except Exception as e:
+            print(f"Error reading cached signals {key}: {e}")
+            self.cache.delete(key)
+            return None
+
+    def set(self, key : str, signals : Tuple[pd.DataFrame, ...]) -> None:
+        self.cache.set(key, encode_signals(signals))
+
+    def clear(self) -> int:
+        return self.cache.clear()
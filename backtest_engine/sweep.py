@@ -0,0 +1,337 @@
+'''
+Usage :
+from backtest_engine.sweep import expand_param_grid, ParallelSweep
+
+combos = expand_param_grid({'fast_ema_period': [10, 20], 'slow_ema_period': [100, 200]})
+# [{'fast_ema_period': 10, 'slow_ema_period': 100}, {'fast_ema_period': 10, 'slow_ema_period': 200}, ...]
+
+# Grids too large for one Backtester.sweep call: jobs of chunk_size combinations run in a process pool
+backtester = Backtester(..., strategy_object=EMAStrategy(), run_backtest=False)
+sweep = ParallelSweep(backtester, "EMA Crossover Strategy", {'fast_ema_period': range(5, 50), 'slow_ema_period': range(50, 300, 10)})
+results = sweep.run()   # rerun the same sweep to resume it after an interruption
+'''
+import os
+import json
+import hashlib
+import inspect
+import itertools
+import multiprocessing
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from tqdm import tqdm
+import pandas as pd
+from typing import Dict, List, Any, Tuple, Optional
+
+from finstore.finstore import Panel, _write_parquet
+
+SWEEP_DIR = Path("database/backtest/sweeps")
+# Workers are spawned, not forked: forking a process whose numba kernels already started their thread pool can deadlock
+MP_CONTEXT = multiprocessing.get_context('spawn')
+# Backtester attributes a sweep job needs to rebuild the backtest in a worker
+BACKTEST_SETTINGS = ['market_name', 'symbol_list', 'timeframe', 'strategy_type', 'start_date', 'end_date', 'init_cash', 'fees',
+                     'slippage', 'size', 'cash_sharing', 'allow_partial', 'pair', 'warmup_bars']
+
+def expand_param_grid(param_grid) -> List[Dict[str, Any]]:
+    """
+    Expands a parameter grid into the list of parameter combinations, like sklearn's ParameterGrid.
+
+    Args:
+        param_grid (dict | list): {param : list of values} (every combination of the values), or a list of such dicts
+                                  (their combinations one after the other). A single value counts as a one-value list.
+
+    Returns:
+        List[Dict[str, Any]]: One dict per combination, in grid order, duplicates removed.
+    """
+    grids = [param_grid] if isinstance(param_grid, dict) else list(param_grid)
+    combos = []
+    seen = set()
+    for grid in grids:
+        names = list(grid)
+        values = [value if isinstance(value, (list, tuple, range)) else [value] for value in grid.values()]
+        for combo_values in itertools.product(*values):
+            combo = dict(zip(names, combo_values))
+            key = repr(sorted(combo.items()))
+            if key not in seen:
+                seen.add(key)
+                combos.append(combo)
+    return combos
+
+def sweep_strategies(strategy_object, combos : List[Dict[str, Any]]) -> list:
+    """
+    One strategy object per parameter combination: the class of strategy_object built with its current parameters,
+    overridden by the combination.
+
+    Raises:
+        ValueError: If a combination names a parameter the strategy's constructor does not take.
+    """
+    strategy_class = type(strategy_object)
+    signature = inspect.signature(strategy_class)
+    accepts_kwargs = any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in signature.parameters.values())
+    base_params = {name: value for name, value in strategy_object.params.items() if accepts_kwargs or name in signature.parameters}
+    strategies = []
+    for combo in combos:
+        unknown = [name for name in combo if not accepts_kwargs and name not in signature.parameters]
+        if unknown:
+            raise ValueError(f"{strategy_class.__name__} does not take parameters {unknown}")
+        strategies.append(strategy_class(**{**base_params, **combo}))
+    return strategies
+
+def stack_signals(results : list, combos : List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Column-stacks the (entries, exits, close_data, open_data) of several runs of a strategy into one wide frame each.
+
+    The columns become a MultiIndex of the parameter values followed by the symbol, so a single from_signals call
+    simulates every combination and group_by=list(combos[0]) gives one portfolio per combination.
+
+    Args:
+        results (list): (entries, exits, close_data, open_data) tuples as returned by StrategyBaseClass.run, one per combo.
+        combos (List[Dict[str, Any]]): The parameter combination of each result, all with the same parameter names.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: entries, exits, close_data, open_data.
+    """
+    param_names = list(combos[0])
+    keys = [tuple(combo[name] for name in param_names) for combo in combos]
+    if len(param_names) == 1:
+        keys = [key[0] for key in keys]
+
+    stacked = []
+    for position in range(4):
+        frames = [result[position] for result in results]
+        frame = pd.concat(frames, axis=1, keys=keys, names=param_names + ['symbol'])
+        stacked.append(frame)
+    entries, exits, close_data, open_data = stacked
+    return entries.fillna(False).astype(bool), exits.fillna(False).astype(bool), close_data, open_data
+
+def sweep_jobs(combos : List[Dict[str, Any]], chunk_size : int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Splits parameter combinations into jobs of chunk_size combinations.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: {job id : combinations}. The id is a hash of the combinations, so the same
+                                         grid and chunk_size always give the same jobs.
+    """
+    jobs = {}
+    for start in range(0, len(combos), chunk_size):
+        chunk = combos[start:start + chunk_size]
+        job_id = hashlib.sha1(json.dumps(chunk, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        jobs[job_id] = chunk
+    return jobs
+
+def _no_progress(progress: int, status: str) -> None:
+    pass
+
+_PANELS = {}
+
+def run_sweep_job(panel_dir : str, settings : dict, strategy_name : str, combos : List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Backtests parameter combinations of a registered strategy in a worker process, with Backtester.sweep on the
+    panel memory-mapped from panel_dir (loaded once per process).
+
+    Returns:
+        pd.DataFrame: One row per combination: the parameter values and the sweep metrics as columns.
+    """
+    from backtest_engine.backtester import Backtester
+    from strategy.strategy_registry import STRATEGY_REGISTRY
+
+    if panel_dir not in _PANELS:
+        _PANELS[panel_dir] = Panel.load(panel_dir)
+    panel = _PANELS[panel_dir]
+
+    entry = STRATEGY_REGISTRY[strategy_name]
+    strategy_object = entry['class'](**entry['params'])
+    backtester = Backtester(**settings, strategy_object=strategy_object, progress_callback=_no_progress, run_backtest=False)
+    backtester.ohlcv_data = panel if getattr(strategy_object, 'supports_panel', False) else panel.to_dict()
+    # One single-value grid per combination, so list / tuple parameter values are not expanded again
+    metrics = backtester.sweep([{name: [value] for name, value in combo.items()} for combo in combos])
+    return metrics.drop(columns=['rank']).reset_index()
+
+class ParallelSweep:
+    """
+    Parameter sweep of a registered strategy over a process pool, for grids too large for one Backtester.sweep call.
+
+    The backtest's OHLCV data is read once and saved as a Panel of .npy files in the sweep directory. Every worker
+    memory-maps it, so no process receives a pickled copy of the data. The grid is split into jobs of chunk_size
+    combinations, each simulated with one vectorized Backtester.sweep call. Each finished job is written right away
+    as a parquet part of the results table (<sweep_dir>/results/<job id>.parquet).
+
+    A worker crash (e.g. out of memory) breaks the pool and fails every job in flight with it. At most max_workers
+    jobs are in flight, so jobs not started yet just go to the next pool, and the jobs that were running are rerun
+    one at a time in a single-worker pool: only a job that crashes its worker running alone is charged a crash, and
+    it is retried alone up to max_retries times. Jobs that raise or keep crashing are recorded in failed_jobs and
+    run() raises once the other jobs are done. Running the same sweep again (same sweep_id) only runs the jobs that
+    have no results yet, on the saved data, so an interrupted sweep resumes where it stopped.
+
+    Args:
+        backtester (Backtester): Backtest settings (market, symbols, dates, costs...). Build it with run_backtest=False.
+        strategy_name (str): Display name of the strategy in STRATEGY_REGISTRY.
+        param_grid (dict | list): See expand_param_grid. Parameters not in the grid keep the registry defaults.
+        sweep_id (Optional[str]): Name of the sweep directory. Defaults to a hash of the settings, strategy and grid.
+        chunk_size (int): Combinations per job.
+        max_workers (Optional[int]): Worker processes, os.cpu_count() if None.
+        max_retries (int): Times a job is retried after crashing its worker running alone.
+        metric (str), ascending (bool): Ranking of the results, see Backtester.sweep.
+    """
+
+    def __init__(self, backtester, strategy_name : str, param_grid, sweep_id : Optional[str] = None, chunk_size : int = 16,
+                 max_workers : Optional[int] = None, max_retries : int = 2, metric : str = 'sharpe_ratio', ascending : bool = False):
+        from strategy.strategy_registry import STRATEGY_REGISTRY
+        if strategy_name not in STRATEGY_REGISTRY:
+            raise ValueError(f"Unknown strategy '{strategy_name}', use one of {list(STRATEGY_REGISTRY)}")
+        self.backtester = backtester
+        self.strategy_name = strategy_name
+        self.settings = {name: getattr(backtester, name) for name in BACKTEST_SETTINGS}
+        self.combos = expand_param_grid(param_grid)
+        self.chunk_size = chunk_size
+        self.jobs = sweep_jobs(self.combos, chunk_size)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.metric = metric
+        self.ascending = ascending
+
+        self.spec = json.loads(json.dumps({
+            'strategy_name': strategy_name,
+            'settings': self.settings,
+            'jobs': sorted(self.jobs),
+        }, default=str))
+        self.sweep_id = sweep_id or hashlib.sha1(json.dumps(self.spec, sort_keys=True).encode()).hexdigest()[:12]
+        self.sweep_dir = SWEEP_DIR / self.sweep_id
+        self.panel_dir = self.sweep_dir / 'panel'
+        self.results_dir = self.sweep_dir / 'results'
+        # {job id : error} of the jobs of the last run that raised or kept crashing their worker
+        self.failed_jobs = {}
+
+    def _prepare(self) -> None:
+        """
+        Creates the sweep directory, checking that an existing one belongs to the same sweep, and saves the data once.
+        """
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        spec_path = self.sweep_dir / 'sweep.json'
+        if spec_path.exists():
+            with open(spec_path, 'r') as f:
+                if json.load(f) != self.spec:
+                    raise ValueError(f"{self.sweep_dir} holds a different sweep, use another sweep_id")
+        else:
+            with open(spec_path, 'w') as f:
+                json.dump(self.spec, f, indent=4)
+        if not self.panel_dir.exists():
+            self.backtester.data_fetch(as_panel=True).save(str(self.panel_dir))
+
+    def pending_jobs(self) -> List[str]:
+        """
+        Ids of the jobs without results yet.
+        """
+        return [job_id for job_id in self.jobs if not (self.results_dir / f"{job_id}.parquet").exists()]
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs the jobs without results in a process pool and returns the ranked results of the whole sweep.
+
+        Raises:
+            RuntimeError: If jobs failed (see failed_jobs). The results of the other jobs are saved, results() returns
+                          them and running the sweep again retries only the failed jobs.
+        """
+        self._prepare()
+        pending = self.pending_jobs()
+        if len(pending) < len(self.jobs):
+            print(f"Resuming sweep {self.sweep_id}: {len(self.jobs) - len(pending)} of {len(self.jobs)} jobs already done.")
+
+        self.failed_jobs = {}
+        max_workers = self.max_workers or os.cpu_count() or 1
+        with tqdm(total=len(pending), desc="Sweeping") as progress:
+            while pending:
+                suspects, pending = self._run_pool(pending, max_workers, progress)
+                for job_id in suspects:
+                    self._run_alone(job_id, progress)
+
+        if self.failed_jobs:
+            raise RuntimeError(f"{len(self.failed_jobs)} of {len(self.jobs)} sweep jobs failed, see failed_jobs: {sorted(self.failed_jobs)}")
+        return self.results()
+
+    def _submit(self, executor, job_id : str):
+        return executor.submit(run_sweep_job, str(self.panel_dir), self.settings, self.strategy_name, self.jobs[job_id])
+
+    def _finish(self, job_id : str, future) -> None:
+        """
+        Saves the results of a finished job, or records its error in failed_jobs. Raises BrokenProcessPool if its pool broke.
+        """
+        try:
+            metrics = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            print(f"Error in sweep job {job_id}: {e}")
+            self.failed_jobs[job_id] = str(e)
+            return
+        metrics.insert(0, 'strategy_name', self.strategy_name)
+        _write_parquet(metrics, str(self.results_dir / f"{job_id}.parquet"))
+
+    def _run_pool(self, pending : List[str], max_workers : int, progress) -> Tuple[List[str], List[str]]:
+        """
+        Runs jobs in a pool, submitting a new one whenever one finishes so that at most max_workers are in flight.
+
+        Returns:
+            tuple: (jobs in flight when a worker crash broke the pool, jobs not submitted yet). Both empty once all ran.
+        """
+        queue = list(pending)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=MP_CONTEXT) as executor:
+            running = {}
+            while queue or running:
+                broken = False
+                while queue and len(running) < max_workers:
+                    try:
+                        future = self._submit(executor, queue[0])
+                    except BrokenProcessPool:
+                        # The pool broke since the last wait, the job goes to the next pool
+                        broken = True
+                        break
+                    running[future] = queue.pop(0)
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                if broken or any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                    # Every job in flight fails with the pool, the ones that finished before the crash keep their results
+                    concurrent.futures.wait(running)
+                    done = set(running)
+                suspects = []
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        self._finish(job_id, future)
+                    except BrokenProcessPool:
+                        suspects.append(job_id)
+                        continue
+                    progress.update()
+                if suspects or broken:
+                    return suspects, queue
+        return [], []
+
+    def _run_alone(self, job_id : str, progress) -> None:
+        """
+        Reruns a job that was in flight when its pool broke in a single-worker pool, so a crash can only be its own.
+        A job that crashes its worker alone is retried up to max_retries times, then recorded in failed_jobs.
+        """
+        for _ in range(self.max_retries + 1):
+            with ProcessPoolExecutor(max_workers=1, mp_context=MP_CONTEXT) as executor:
+                future = self._submit(executor, job_id)
+                try:
+                    self._finish(job_id, future)
+                except BrokenProcessPool:
+                    continue
+            progress.update()
+            return
+        print(f"Sweep job {job_id} crashed its worker {self.max_retries + 1} times running alone, skipping it.")
+        self.failed_jobs[job_id] = f"crashed its worker {self.max_retries + 1} times running alone"
+        progress.update()
+
+    def results(self) -> pd.DataFrame:
+        """
+        Results of the finished jobs, ranked by metric (rank 1 = best).
+        """
+        parts = [self.results_dir / f"{job_id}.parquet" for job_id in self.jobs if (self.results_dir / f"{job_id}.parquet").exists()]
+        if not parts:
+            return pd.DataFrame()
+        results = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+        results = results.sort_values(self.metric, ascending=self.ascending, ignore_index=True)
+        results['rank'] = range(1, len(results) + 1)
+        return results
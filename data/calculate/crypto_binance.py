@@ -1,17 +1,10 @@
-import pandas as pd
 import time
-from utils.flows.fetch_calculate_insert import fetch_calculate_and_insert, update_technical_indicators
-from utils.calculation.indicators import calculate_ema, calculate_supertrend, calculate_spike, detect_large_gap, calculate_average_volume, calculate_exponential_regression
-from utils.calculation.supertrend import faster_supertrend
-from utils.calculation.slope_r2 import calculate_exponential_regression_optimized
-from utils.calculation.optimized_indicators import calculate_spike_optimized, detect_large_gap_optimized, calculate_average_volume_optimized, calculate_sustained_volume_spike
 from dotenv import load_dotenv
 from data.fetch.indian_equity import fetch_symbol_list_indian_equity
 from finstore.finstore import Finstore
+from utils.calculation.registry import required_lookback
 import os
 import traceback
-from utils.db.batch import BatchInserter
-from tqdm import tqdm
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path='config/.env')
@@ -19,6 +12,22 @@ load_dotenv(dotenv_path='config/.env')
 # Access the DATABASE_PATH environment variable
 database_path = os.getenv('DATABASE_PATH')
 
+# (indicator name, params) of every indicator written to finstore, see utils.calculation.registry. Calculated in one pass per symbol
+INDICATOR_SPECS = [
+    ('ema', {'length': 100}),
+    ('ema', {'length': 200}),
+    ('faster_supertrend', {'period': 7, 'multiplier': 3}),
+    ('slope_r2_multi', {'windows': (90, 30, 15)}),
+    ('spike', {'lookback_period': 30, 'spike_threshold': 0.85}),
+    ('gap', {'lookback_period': 30, 'gap_threshold': 0.15}),
+    ('average_volume', {'lookback_period': 90}),
+]
+# Only written by the one time calculation
+VOLUME_SPIKE_SPECS = [
+    ('sustained_volume_spike', {'lookback_period': 50, 'spike_duration': 3, 'threshold': 5}),
+    ('sustained_volume_spike', {'lookback_period': 50, 'spike_duration': 3, 'threshold': 10}),
+]
+
 def calculate_technical_indicators(market_name, symbol_list, timeframe='1d'):
     '''
     One time run function for calculating all custom indicators for a given market.
@@ -27,17 +36,7 @@ def calculate_technical_indicators(market_name, symbol_list, timeframe='1d'):
     try:
         finstore = Finstore(market_name=market_name, timeframe=timeframe, enable_append=True)
         ohlcv_data = finstore.read.symbol_list(symbol_list=symbol_list)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_ema, length=100)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_ema, length=200)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=faster_supertrend, period=7, multiplier=3)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=90)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=30)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=15)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_spike_optimized, lookback_period=30, spike_threshold=0.85)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=detect_large_gap_optimized, lookback_period=30, gap_threshold=0.15)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_average_volume_optimized, lookback_period=90)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_sustained_volume_spike, lookback_period=50, spike_duration=3, threshold=5) 
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_sustained_volume_spike, lookback_period=50, spike_duration=3, threshold=10)   
+        finstore.write.indicators(ohlcv_data=ohlcv_data, indicator_specs=INDICATOR_SPECS + VOLUME_SPIKE_SPECS)
     except Exception as e:
         print(f"Error calculating technical indicators: {e}")
         print(f"Full traceback:")
@@ -53,7 +52,7 @@ def update_calculated_indicators(market_name='crypto_binance', symbol_list=[], a
     - market_name (str): The market name (e.g., 'indian_equity').
     - symbol_list (list): List of symbols to update indicators for (e.g., ['SBIN', 'HDFC']).
     - timeframe (str): The timeframe for OHLCV data (e.g., '1d').
-    - data_lookback_period (int): Number of past data points to consider for recalculating the indicators (default: 500).
+    - data_lookback_period (int): Number of latest bars to update the indicators for (default: 500). The warm-up the indicators need is read in addition.
     '''
     
     if not symbol_list:
@@ -61,16 +60,10 @@ def update_calculated_indicators(market_name='crypto_binance', symbol_list=[], a
     
     try:
         finstore = Finstore(market_name=market_name, timeframe=timeframe, enable_append=True, limit_data_lookback=data_lookback_period, pair=pair)
-        ohlcv_data = finstore.read.symbol_list(symbol_list=symbol_list)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_ema, length=100)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_ema, length=200)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=faster_supertrend, period=7, multiplier=3)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=90)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=30)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=15)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_spike_optimized, lookback_period=30, spike_threshold=0.85)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=detect_large_gap_optimized, lookback_period=30, gap_threshold=0.15)
-        finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_average_volume_optimized, lookback_period=90)
+        # EMA / supertrend / average volume continue from their persisted state, the rest is calculated for the bars after
+        # their last written bar, which needs the declared warm-up before them
+        ohlcv_data = finstore.read.symbol_list(symbol_list=symbol_list, last_n=data_lookback_period + required_lookback(INDICATOR_SPECS))
+        finstore.write.update_indicators(ohlcv_data=ohlcv_data, indicator_specs=INDICATOR_SPECS)
     except Exception as e:
         print(f"Error updating technical indicators: {e}")
         print(f"Full traceback:")
@@ -1,17 +1,15 @@
-import pandas as pd
 import time
 from utils.flows.fetch_calculate_insert import fetch_calculate_and_insert, update_technical_indicators
-from utils.calculation.indicators import calculate_ema, calculate_supertrend, calculate_spike, detect_large_gap, calculate_average_volume, calculate_exponential_regression
+from utils.calculation.indicators import calculate_ema
 from utils.calculation.supertrend import faster_supertrend
 from utils.calculation.slope_r2 import calculate_exponential_regression_optimized
 from utils.calculation.optimized_indicators import calculate_spike_optimized, detect_large_gap_optimized, calculate_average_volume_optimized
 from dotenv import load_dotenv
 from data.fetch.indian_equity import fetch_symbol_list_indian_equity
 from finstore.finstore import Finstore
+from utils.calculation.registry import required_lookback
 import os
 import traceback
-from utils.db.batch import BatchInserter
-from tqdm import tqdm
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path='config/.env')
@@ -19,6 +17,17 @@ load_dotenv(dotenv_path='config/.env')
 # Access the DATABASE_PATH environment variable
 database_path = os.getenv('DATABASE_PATH')
 
+# (indicator name, params) of every indicator written to finstore, see utils.calculation.registry. Calculated in one pass per symbol
+INDICATOR_SPECS = [
+    ('ema', {'length': 100}),
+    ('ema', {'length': 200}),
+    ('faster_supertrend', {'period': 7, 'multiplier': 3}),
+    ('slope_r2_multi', {'windows': (90, 30, 15)}),
+    ('spike', {'lookback_period': 90, 'spike_threshold': 0.15}),
+    ('gap', {'lookback_period': 90, 'gap_threshold': 0.15}),
+    ('average_volume', {'lookback_period': 90}),
+]
+
 def calculate_technical_indicators(market_name, start_timestamp, all_entries, symbol_list, timeframe='1d', storage_system='finstore'):
     '''
     One time run function for calculating all custom indicators for a given market.
@@ -39,15 +48,7 @@ def calculate_technical_indicators(market_name, start_timestamp, all_entries, sy
         elif storage_system == 'finstore':
             finstore = Finstore(market_name=market_name, timeframe=timeframe, enable_append=True)
             ohlcv_data = finstore.read.symbol_list(symbol_list=symbol_list)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_ema, length=100)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_ema, length=200)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=faster_supertrend, period=7, multiplier=3)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=90)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=30)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=15)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_spike_optimized, lookback_period=90, spike_threshold=0.15)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=detect_large_gap_optimized, lookback_period=90, gap_threshold=0.15)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_average_volume_optimized, lookback_period=90)
+            finstore.write.indicators(ohlcv_data=ohlcv_data, indicator_specs=INDICATOR_SPECS)
     except Exception as e:
         print(f"Error calculating technical indicators: {e}")
         print(f"Full traceback:")
@@ -63,7 +64,7 @@ def update_calculated_indicators(market_name='indian_equity', symbol_list=[], al
     - market_name (str): The market name (e.g., 'indian_equity').
     - symbol_list (list): List of symbols to update indicators for (e.g., ['SBIN', 'HDFC']).
     - timeframe (str): The timeframe for OHLCV data (e.g., '1d').
-    - data_lookback_period (int): Number of past data points to consider for recalculating the indicators (default: 500).
+    - data_lookback_period (int): Number of latest bars to update the indicators for (default: 500). The warm-up the indicators need is read in addition.
     '''
     
     if not symbol_list:
@@ -83,16 +84,10 @@ def update_calculated_indicators(market_name='indian_equity', symbol_list=[], al
         
         elif storage_system == 'finstore':
             finstore = Finstore(market_name=market_name, timeframe=timeframe, enable_append=True, limit_data_lookback=data_lookback_period)
-            ohlcv_data = finstore.read.symbol_list(symbol_list=symbol_list)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_ema, length=100)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_ema, length=200)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=faster_supertrend, period=7, multiplier=3)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=90)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=30)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_exponential_regression_optimized, window=15)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_spike_optimized, lookback_period=90, spike_threshold=0.15)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=detect_large_gap_optimized, lookback_period=90, gap_threshold=0.15)
-            finstore.write.indicator(ohlcv_data=ohlcv_data, calculation_func=calculate_average_volume_optimized, lookback_period=90)
+            # EMA / supertrend / average volume continue from their persisted state, the rest is calculated for the bars after
+            # their last written bar, which needs the declared warm-up before them
+            ohlcv_data = finstore.read.symbol_list(symbol_list=symbol_list, last_n=data_lookback_period + required_lookback(INDICATOR_SPECS))
+            finstore.write.update_indicators(ohlcv_data=ohlcv_data, indicator_specs=INDICATOR_SPECS)
     except Exception as e:
         print(f"Error updating technical indicators: {e}")
         print(f"Full traceback:")
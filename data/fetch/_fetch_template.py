@@ -28,7 +28,7 @@ def fetch_ohlcv(symbol, timeframe, start_date):
 
     Returns:
     pandas.DataFrame: A DataFrame containing the OHLCV data with the following columns:
-        - timestamp (str): The timestamp of each candle in 'YYYY-MM-DD HH:MM:SS' format.
+        - timestamp (datetime64): The timestamp of each candle in UTC (naive datetimes are taken as UTC).
         - open (float): The opening price of the candle.
         - high (float): The highest price of the candle.
         - low (float): The lowest price of the candle.
@@ -41,7 +41,7 @@ def fetch_ohlcv(symbol, timeframe, start_date):
     NotImplementedError: This method must be implemented by the specific data source.
 
     Note:
-    - Ensure that the 'timestamp' column is in string format 'YYYY-MM-DD HH:MM:SS'.
+    - Ensure that the 'timestamp' column is a datetime64 column in UTC. Finstore stores it as timestamp[ms, UTC].
     - All numerical columns (open, high, low, close, volume) should be of type float.
     - Handle any potential errors or exceptions specific to your data source.
     """
@@ -130,6 +130,5 @@ def fetch_ohlcv_data_gecko_meme(address, days=15, resolution="minute", aggregate
     # Format the timestamp column
     if not data.empty:
         data["timestamp"] = pd.to_datetime(data["timestamp"], unit="s")
-        data["timestamp"] = data["timestamp"].dt.strftime('%Y-%m-%d %H:%M:%S')
 
     return data.sort_values("timestamp")  # Return sorted data
\ No newline at end of file
@@ -44,7 +44,7 @@ def fetch_ohlcv_binance(symbol, timeframe, start_date):
     # Convert the accumulated data into a DataFrame.
     df = pd.DataFrame(all_data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
     if not df.empty:
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms').dt.strftime('%Y-%m-%d %H:%M:%S')
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
     return df
 
 
@@ -29,7 +29,9 @@ def fetch_ohlcv_indian_equity(symbol, timeframe, start_date, end_date=datetime.n
     data.reset_index(inplace=True)
     data.columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'adj_close']
     data.drop(columns=['adj_close'], inplace=True)
-    data['timestamp'] = data['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    if data['timestamp'].dt.tz is not None:
+        # Keep the exchange wall-clock time, as the former '%Y-%m-%d %H:%M:%S' strings did
+        data['timestamp'] = data['timestamp'].dt.tz_localize(None)
     return data
 
 #@cache_decorator(expire=60*60*24*30)
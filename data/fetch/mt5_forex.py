@@ -160,8 +160,8 @@ def fetch_ohlcv_mt5(symbol, timeframe, start_date):
         # Convert to DataFrame
         df = pd.DataFrame(rates)
         
-        # Convert timestamp to datetime string format
-        df['timestamp'] = pd.to_datetime(df['time'], unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
+        # Convert timestamp to datetime
+        df['timestamp'] = pd.to_datetime(df['time'], unit='s')
         
         # Rename columns to match expected format
         df = df.rename(columns={
@@ -179,7 +179,7 @@ def fetch_ohlcv_mt5(symbol, timeframe, start_date):
         df['volume'] = df['volume'].astype(int)
         
         # Filter data from start_date onwards
-        df_filtered = df[pd.to_datetime(df['timestamp']) >= start_date].copy()
+        df_filtered = df[df['timestamp'] >= start_date].copy()
         
         print(f"Retrieved {len(df_filtered)} records for {symbol} from {start_date}")
         return df_filtered
@@ -31,7 +31,7 @@ def gather_ohlcv(timeframe='1d', start_date=None, **kwargs):
         - dict: A dictionary where keys are symbols and values are pandas DataFrames
                 containing the OHLCV data for each symbol. Each DataFrame should have
                 the following columns:
-                - timestamp (str): The timestamp of each candle in 'YYYY-MM-DD HH:MM:SS' format.
+                - timestamp (datetime64): The timestamp of each candle in UTC (naive datetimes are taken as UTC).
                 - open (float): The opening price of the candle.
                 - high (float): The highest price of the candle.
                 - low (float): The lowest price of the candle.
@@ -42,7 +42,7 @@ def gather_ohlcv(timeframe='1d', start_date=None, **kwargs):
     NotImplementedError: This method must be implemented by the specific data source.
 
     Note:
-    - Ensure that the 'timestamp' column in each DataFrame is in string format 'YYYY-MM-DD HH:MM:SS'.
+    - Ensure that the 'timestamp' column in each DataFrame is a datetime64 column in UTC. Finstore stores it as timestamp[ms, UTC].
     - All numerical columns (open, high, low, close, volume) should be of type float.
     - Handle any potential errors or exceptions specific to your data source.
     - Implement appropriate filtering or processing based on the provided parameters.
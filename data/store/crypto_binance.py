@@ -15,5 +15,5 @@ def store_crypto_binance(timeframe='1y', data_points_back=1, type='spot', suffix
 
 def store_crypto_binance_gaps(symbols, data, timeframe, pair=''):
 
-    finstore = Finstore(market_name='crypto_binance', timeframe=timeframe, enable_append=True, pair=pair)
+    finstore = Finstore(market_name='crypto_binance', timeframe=timeframe, enable_append=True, pair=pair, append_segments=True)
     finstore.write.symbol_list(data_ohlcv=data)
\ No newline at end of file
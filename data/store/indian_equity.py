@@ -49,7 +49,7 @@ def store_indian_equity_gaps(symbols, data, timeframe, storage_system = 'finstor
         batch_inserter.stop()
     
     elif storage_system == 'finstore':
-        finstore = Finstore(market_name='indian_equity', timeframe='1d', enable_append=True)
+        finstore = Finstore(market_name='indian_equity', timeframe='1d', enable_append=True, append_segments=True)
         finstore.write.symbol_list(data_ohlcv=data)
 
 if __name__ == "__main__":
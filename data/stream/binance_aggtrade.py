@@ -10,7 +10,7 @@ from finstore.finstore import Finstore
 from data.stream.binance_stream import WebSocketManager
 
 class BinanceWebSocket(WebSocketManager):
-    def __init__(self, market_name, timeframe, handle_message_function=None, chunk_size=1):
+    def __init__(self, market_name, timeframe, handle_message_function=None, chunk_size=1, persist_trades=False):
         super().__init__(market_name, timeframe, handle_message_function, chunk_size)
         self.market_name = market_name
         self.timeframe = timeframe
@@ -23,6 +23,10 @@ class BinanceWebSocket(WebSocketManager):
         self.handle_message_function = handle_message_function or self.default_handle_message
         self.chunk_size = chunk_size
         self.handle_message_function_str = "updated_handle_message"
+        # Trades are buffered per symbol and flushed to parquet segments, see Finstore.Stream.buffer_trade_data
+        self.persist_trades = persist_trades
+        if self.persist_trades:
+            self.finstore.stream.start_buffering(flush_rows=5000, flush_interval=5.0)
 
     def default_handle_message(self, pair, message, symbol_trade_data, anomaly_dict, finstore, current_time):
         if self.symbol_trade_data[pair]:
@@ -32,7 +36,8 @@ class BinanceWebSocket(WebSocketManager):
                     print(f"Warning: Missed trades for {pair}. Previous 'a': {previous_message['a']}, Current 'a': {message['a']}")
 
         self.symbol_trade_data[pair].append(message)
-        #self.finstore.stream.save_trade_data(pair, message, preset=self.timeframe)
+        if self.persist_trades:
+            self.finstore.stream.buffer_trade_data(pair, message, preset='agg_trade', save_raw_data=False)
 
     async def cleanup_old_trades(self, trade_retention_ms, anomaly_retention_ms, sleep_time=60):
         try:
@@ -90,6 +95,8 @@ class BinanceWebSocket(WebSocketManager):
             self.close_all_websockets()
         finally:
             print("Cleaning up tasks...")
+            if self.persist_trades:
+                self.finstore.stream.stop_buffering()
             tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
             for task in tasks:
                 task.cancel()
@@ -3,7 +3,6 @@ import utils.backtest_backend # imports backtester dynamically
 import abstractbt as vbt
 from pandas.tseries.frequencies import to_offset
 from pathlib import Path
-import json
 import uuid
 import schedule
 import time
@@ -19,6 +18,7 @@ from data.update.crypto_binance import fill_gap
 from utils.db.fetch import fetch_entries
 from executor.monitor import TradeMonitor
 from strategy.strategy_registry import STRATEGY_REGISTRY
+from backtest_engine.result_store import ResultStore
 
 class Deployer:
     def __init__(
@@ -43,6 +43,8 @@ class Deployer:
         oms_name: Optional[str] = None,
         pair: Optional[str] = None,
         oms_params: Optional[Dict[str, Any]] = None,
+        lookback_bars: Optional[int] = None,
+        hot_cache: bool = False,
     ) -> None:
         self.backtest_uuid = backtest_uuid
         self.market_name = market_name
@@ -64,6 +66,8 @@ class Deployer:
         self.oms_name = oms_name
         self.pair = pair
         self.oms_params = oms_params or {}
+        self.lookback_bars = lookback_bars
+        self.hot_cache = hot_cache
         self.oms = None
 
         self.oms_init()
@@ -104,13 +108,11 @@ class Deployer:
         allow_partial: Optional[bool] = False,
         oms_params: Optional[Dict[str, Any]] = None,
         progress_callback: Optional[Callable[[int, str], None]] = None,
+        lookback_bars: Optional[int] = None,
+        hot_cache: bool = False,
     ) -> "Deployer":
         """Initialize Deployer from a backtest UUID."""
-        bt_dir = Path(f"database/backtest/{backtest_uuid}")
-        params_path = bt_dir / "params.json"
-        
-        with open(params_path, "r") as f:
-            data = json.load(f)
+        data = ResultStore().params(backtest_uuid)
         
         strategy_name = data["strategy_name"]
         strategy_params = data["strategy_params"]
@@ -153,6 +155,8 @@ class Deployer:
             oms_name=oms_name,
             pair=data.get("pair"),
             oms_params=oms_params,
+            lookback_bars=lookback_bars,
+            hot_cache=hot_cache,
         )
 
     @classmethod
@@ -177,6 +181,8 @@ class Deployer:
         pair: Optional[str] = None,
         oms_params: Optional[Dict[str, Any]] = None,
         progress_callback: Optional[Callable[[int, str], None]] = None,
+        lookback_bars: Optional[int] = None,
+        hot_cache: bool = False,
     ) -> "Deployer":
         """Initialize Deployer with direct market parameters."""
         return cls(
@@ -199,6 +205,8 @@ class Deployer:
             oms_name=oms_name,
             pair=pair,
             oms_params=oms_params,
+            lookback_bars=lookback_bars,
+            hot_cache=hot_cache,
         )
 
     def scheduler_loop(self) -> None:
@@ -231,8 +239,9 @@ class Deployer:
         if self.progress_callback:
             self.progress_callback(30, "Fetching OHLCV data")
         
-        finstore = Finstore(market_name=self.market_name, timeframe=self.timeframe, enable_append=True, pair=self.pair)
-        ohlcv_data = finstore.read.symbol_list(symbol_list=self.symbol_list, merged_dataframe=False)
+        finstore = Finstore(market_name=self.market_name, timeframe=self.timeframe, enable_append=True, pair=self.pair, hot_cache=self.hot_cache)
+        # Only the bars the strategy needs to evaluate the latest candle are read when lookback_bars is set
+        ohlcv_data = finstore.read.symbol_list(symbol_list=self.symbol_list, merged_dataframe=False, last_n=self.lookback_bars)
         
         if self.progress_callback:
             self.progress_callback(50, "Running strategy")
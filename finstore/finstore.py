@@ -1,26 +1,717 @@
 import duckdb
 import os
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.compute as pc
 from concurrent.futures import ProcessPoolExecutor
 import concurrent.futures
+from threading import Thread, Lock, Event
+from collections import defaultdict
+import atexit
 from tqdm import tqdm
+import time
+import uuid
+import json
+import hashlib
+from datetime import datetime, timezone
 import os
 import sys
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db.lock import FileLock
+from utils.calculation.incremental import incremental_indicator
+from utils.calculation.registry import get_indicator, resolve_spec, resolve_specs
+from utils.calculation.result import IndicatorResult
+
+# Append-only writes land next to the main parquet file, e.g. ohlcv_data.parquet -> ohlcv_data_segments/<time_ns>_<id>.parquet
+SEGMENT_DIR_SUFFIX = '_segments'
+
+OHLCV_DEDUP_KEYS = ['timestamp']
+TECHNICAL_DEDUP_KEYS = ['timestamp', 'indicator_name', 'symbol', 'timeframe']
+
+# Wide indicator layout: one float column per indicator keyed by timestamp, next to the long technical_indicators.parquet
+TECHNICAL_LONG_FILE = 'technical_indicators.parquet'
+TECHNICAL_WIDE_FILE = 'technical_indicators_wide.parquet'
+INDICATOR_LAYOUTS = ('long', 'wide')
+
+# Hot tier: uncompressed Arrow IPC copy of a dataset next to its parquet file (ohlcv_data.parquet -> ohlcv_data.arrow),
+# memory-mapped by readers and rebuilt when the parquet files it was built from change.
+HOT_CACHE_EXTENSION = '.arrow'
+HOT_CACHE_SIGNATURE_KEY = b'finstore_signature'
+
+# State of the stateful indicators of a symbol (see utils.calculation.incremental), next to its technical indicator files
+INDICATOR_STATE_FILE = 'indicator_state.json'
+
+# Indicators computed on demand (Finstore.Indicators), one file per indicator, parameters and data version:
+# <symbol>/_indicator_cache/<calculation function>_<params hash>_<data version>.parquet
+INDICATOR_CACHE_DIR = '_indicator_cache'
+
+# Per market/timeframe metadata: symbol -> first/last timestamp, row count, schema version, indicators
+MANIFEST_FILE = '_manifest.json'
+# 1 : timestamps stored as '%Y-%m-%d %H:%M:%S' strings
+# 2 : timestamps stored as timestamp[ms, UTC]
+SCHEMA_VERSION = 2
+TIMESTAMP_DTYPE = 'datetime64[ms, UTC]'
+TECHNICAL_SCHEMA = pa.schema([('symbol', pa.string()), ('timeframe', pa.string()), ('timestamp', pa.timestamp('ms', tz='UTC')),
+                              ('indicator_name', pa.string()), ('indicator_value', pa.float64())])
+
+# Writers of a symbol hold <symbol dir>/.lock, manifest updates hold market_name=<market>/timeframe=<timeframe>/_manifest.lock.
+# Both are cross-process locks, so several ingestion jobs can write the same market/timeframe. ohlcv writes update the
+# manifest while holding the symbol lock (never the other way round), so appends count rows on the latest entry.
+LOCK_FILE = '.lock'
+MANIFEST_LOCK_FILE = '_manifest.lock'
+# A read that races a file replacement or a compaction (see _query_datasets) is retried with a fresh file list
+READ_RETRIES = 3
+
+
+def _sql_path(path):
+    return "'" + path.replace("'", "''") + "'"
+
+def _segment_dir(file_path):
+    return os.path.splitext(file_path)[0] + SEGMENT_DIR_SUFFIX
+
+def _dataset_root(path):
+    """
+    Main parquet file of the dataset a file (main file or segment) belongs to, see _segment_dir.
+    """
+    parent = os.path.dirname(path)
+    if parent.endswith(SEGMENT_DIR_SUFFIX):
+        return parent[:-len(SEGMENT_DIR_SUFFIX)] + '.parquet'
+    return path
+
+def _list_segments(file_path):
+    """
+    Returns the segment files of a dataset, oldest first (segment names start with a fixed width time_ns).
+    """
+    segment_dir = _segment_dir(file_path)
+    if not os.path.isdir(segment_dir):
+        return []
+    return sorted(os.path.join(segment_dir, name) for name in os.listdir(segment_dir) if name.endswith('.parquet'))
+
+def _dataset_files(file_path):
+    """
+    Returns the main parquet file (if present) followed by its segments, in write order.
+    """
+    files = [file_path] if os.path.isfile(file_path) else []
+    return files + _list_segments(file_path)
+
+def _write_parquet(data, file_path):
+    """
+    Writes data to file_path under a unique temporary name and swaps it in with os.replace, so readers only ever
+    see the previous or the new complete file, never a partial one.
+    """
+    temp_path = f"{file_path}.{os.getpid()}_{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        if isinstance(data, pa.Table):
+            pq.write_table(data, temp_path, compression='zstd')
+        else:
+            data.to_parquet(temp_path, index=False, compression='zstd')
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def _segment_name():
+    """
+    Name of a new segment. Segments are read in name order, so the name is taken when the segment's rows are.
+    """
+    return f"{time.time_ns()}_{uuid.uuid4().hex[:8]}.parquet"
+
+def _write_segment(data, file_path, segment_name=None):
+    """
+    Writes data as a new immutable segment of the dataset rooted at file_path.
+    The segment is written under a temporary name first so readers never pick up a partial file.
+
+    Args:
+        segment_name (str) : name from _segment_name(), taken when the rows were collected if writers can race.
+                             A new name by default.
+    """
+    segment_dir = _segment_dir(file_path)
+    os.makedirs(segment_dir, exist_ok=True)
+    segment_path = os.path.join(segment_dir, segment_name or _segment_name())
+    _write_parquet(data, segment_path)
+    return segment_path
+
+def _symbol_lock(dir_path):
+    """
+    Cross-process lock held while a symbol's files are read-modified-written (appends, compaction, migrations).
+    """
+    return FileLock(os.path.join(dir_path, LOCK_FILE))
+
+def _remove_files(files):
+    for path in files:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def _connect():
+    """
+    DuckDB connection with the session time zone pinned to UTC, so stored UTC timestamps and legacy string
+    timestamps compare and convert the same way on every machine.
+    """
+    conn = duckdb.connect()
+    conn.execute("SET TimeZone='UTC'")
+    return conn
+
+def _utc_naive(value):
+    """
+    pd.Timestamp in UTC without tz info, the way Finstore returns timestamps. Naive values are taken as UTC.
+    """
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_convert('UTC').tz_localize(None)
+    return value
+
+def _normalize_timestamps(data):
+    """
+    Converts the 'timestamp' column to timestamp[ms, UTC] before it is written to parquet.
+    Accepts datetimes (naive ones are taken as UTC), '%Y-%m-%d %H:%M:%S' strings and epoch milliseconds.
+    """
+    if 'timestamp' not in data.columns or str(data['timestamp'].dtype) == TIMESTAMP_DTYPE:
+        return data
+    timestamps = data['timestamp']
+    if pd.api.types.is_integer_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps, unit='ms', utc=True)
+    else:
+        timestamps = pd.to_datetime(timestamps, utc=True)
+    data = data.copy()
+    data['timestamp'] = timestamps.astype(TIMESTAMP_DTYPE)
+    return data
+
+def _has_legacy_timestamps(file_path):
+    """
+    True if the parquet file still stores timestamps as strings (schema version 1).
+    """
+    schema = pq.read_schema(file_path)
+    return 'timestamp' in schema.names and not pa.types.is_timestamp(schema.field('timestamp').type)
+
+def _sql_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _sql_timestamp(value):
+    """
+    Formats a timestamp filter as a UTC timestamp literal, see _utc_naive.
+    """
+    return _utc_naive(value).isoformat(sep=' ')
+
+# Typed and legacy string timestamps both come back as naive UTC timestamps
+TIMESTAMP_SQL = 'timezone(\'UTC\', d."timestamp"::TIMESTAMPTZ)'
+
+def _query_datasets(conn, symbol_files, dedup_keys, keep='first', columns=None, start=None, end=None, last_n=None, filters=None, hive_partitioning=True, typed_timestamps=True):
+    """
+    Reads the datasets of one or more symbols (main parquet file + segments each) in a single DuckDB query.
+
+    Rows are deduplicated per symbol on dedup_keys, keeping the row from the earliest ('first') or latest ('last') written file,
+    which matches what the old read-concat-rewrite path produced. Rows come back in symbol order, then write order.
+    Column selection and the timestamp range are pushed into the parquet scan, so DuckDB only decodes the requested
+    columns and skips row groups whose timestamp statistics fall outside [start, end].
+    The 'timestamp' column is returned as naive UTC datetime64, whether it is stored typed or as legacy strings.
+
+    Args:
+        conn : DuckDB connection.
+        symbol_files (dict) : {symbol : [main file, segment, ...]} as returned by _dataset_files.
+        dedup_keys (list) : columns identifying a row within a symbol.
+        keep (str) : 'first' or 'last'.
+        columns (list) : columns to return, 'timestamp' is always included. None returns all columns.
+        start, end : inclusive timestamp range.
+        last_n (int) : only return the last n rows (by timestamp) of each symbol.
+        filters (list) : extra (sql condition, params) tuples on the scanned rows.
+        hive_partitioning (bool) : add the market_name / timeframe columns DuckDB derives from the path.
+                                   Disabled when the result is written back to a parquet file.
+        typed_timestamps (bool) : convert 'timestamp' as described above. Disabled for stream data, which keeps raw
+                                  exchange timestamps.
+
+    Returns:
+        DuckDBPyConnection: executed query, with an extra '__symbol_order' column holding the position of the symbol in symbol_files.
+    """
+    for attempt in range(READ_RETRIES):
+        query, params = _dataset_query(symbol_files, dedup_keys, keep, columns, start, end, last_n, filters, hive_partitioning, typed_timestamps)
+        try:
+            return conn.execute(query, params)
+        except duckdb.ProgrammingError:
+            raise
+        except duckdb.Error:
+            # Files are only ever replaced atomically, but a concurrent writer can swap a main file between DuckDB reading
+            # its footer and its row groups, and compaction deletes the segments it merged (their rows are in the new main file).
+            # Listing the files again and rerunning the query reads a consistent set.
+            if attempt == READ_RETRIES - 1:
+                raise
+            time.sleep(0.01 * (attempt + 1))
+            symbol_files = {symbol: _dataset_files(_dataset_root(paths[0])) if paths else paths for symbol, paths in symbol_files.items()}
+
+def _dataset_query(symbol_files, dedup_keys, keep, columns, start, end, last_n, filters, hive_partitioning, typed_timestamps):
+    """
+    Builds the query run by _query_datasets.
+
+    Returns:
+        tuple: (query, params)
+    """
+    files = []
+    file_rows = []
+    needs_dedup = False
+    for symbol_order, (symbol, paths) in enumerate(symbol_files.items()):
+        needs_dedup = needs_dedup or len(paths) > 1
+        for path in paths:
+            file_rows.append(f"({_sql_path(path)}, {symbol_order}, {len(files)})")
+            files.append(path)
+
+    def column_sql(column):
+        if typed_timestamps and column == 'timestamp':
+            return TIMESTAMP_SQL
+        return f'd.{_sql_identifier(column)}'
+
+    if columns is None:
+        projection = 'd.* EXCLUDE (filename, file_row_number)'
+        if typed_timestamps:
+            projection += f' REPLACE ({TIMESTAMP_SQL} AS "timestamp")'
+    else:
+        selected = ['timestamp'] + [column for column in columns if column != 'timestamp']
+        projection = ', '.join(f'{column_sql(column)} AS {_sql_identifier(column)}' for column in selected)
+
+    conditions = []
+    params = []
+    # Compared as TIMESTAMPTZ so the filter reaches the parquet row-group statistics of typed files
+    if start is not None:
+        conditions.append('d."timestamp"::TIMESTAMPTZ >= ?::TIMESTAMPTZ')
+        params.append(_sql_timestamp(start))
+    if end is not None:
+        conditions.append('d."timestamp"::TIMESTAMPTZ <= ?::TIMESTAMPTZ')
+        params.append(_sql_timestamp(end))
+    for condition, condition_params in (filters or []):
+        conditions.append(condition)
+        params.extend(condition_params)
+
+    file_list = ', '.join(_sql_path(path) for path in files)
+    query = f"""
+        SELECT f.symbol_order AS __symbol_order, f.file_rank AS __file_rank, d.file_row_number AS __file_row_number, {projection}
+        FROM read_parquet([{file_list}], union_by_name=true, filename=true, file_row_number=true{'' if hive_partitioning else ', hive_partitioning=false'}) d
+        JOIN (VALUES {', '.join(file_rows)}) f(filename, symbol_order, file_rank) USING (filename)
+    """
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    if needs_dedup and dedup_keys:
+        partition = ', '.join(['f.symbol_order'] + [column_sql(key) for key in dedup_keys])
+        order = 'ASC' if keep == 'first' else 'DESC'
+        query += f" QUALIFY row_number() OVER (PARTITION BY {partition} ORDER BY f.file_rank {order}, d.file_row_number {order}) = 1"
+
+    if last_n is not None:
+        query = f"""
+            SELECT * FROM ({query})
+            QUALIFY row_number() OVER (PARTITION BY __symbol_order ORDER BY "timestamp" DESC) <= {int(last_n)}
+        """
+    query = f"SELECT * EXCLUDE (__file_rank, __file_row_number) FROM ({query}) ORDER BY __file_rank, __file_row_number"
+    return query, params
+
+def _read_dataset(conn, files, dedup_keys, keep='first', **query_kwargs):
+    """
+    Reads a single dataset (main parquet file + segments) as one DataFrame. See _query_datasets for query_kwargs.
+    """
+    return _query_datasets(conn, {None: files}, dedup_keys, keep, **query_kwargs).fetchdf().drop(columns=['__symbol_order'])
+
+def _compact_dataset(file_path, dedup_keys, keep='first', typed_timestamps=True, force=False):
+    """
+    Merges the segments of a dataset into its main parquet file and deletes the merged segments.
+    With force the main file is rewritten even without segments, which migrates legacy string timestamps.
+    Callers hold the symbol lock; segments written meanwhile are not in the merged list and are kept.
+
+    Returns:
+        pd.DataFrame: The compacted dataset, None if there was nothing to compact.
+    """
+    segments = _list_segments(file_path)
+    files = _dataset_files(file_path)
+    if not segments and not (force and files):
+        return None
+
+    conn = _connect()
+    data = _read_dataset(conn, files, dedup_keys, keep, hive_partitioning=False, typed_timestamps=typed_timestamps)
+    conn.close()
+    if typed_timestamps:
+        data = _normalize_timestamps(data)
+
+    # Written under a temporary name so the main file is swapped in one step.
+    _write_parquet(data, file_path)
+    _remove_files(segments)
+    return data
+
+def _files_signature(files):
+    """
+    Identifies the exact parquet files a hot cache was built from: name, mtime and size of the main file and every segment.
+    """
+    signature = []
+    for path in files:
+        stat = os.stat(path)
+        signature.append([os.path.basename(path), stat.st_mtime_ns, stat.st_size])
+    return json.dumps([SCHEMA_VERSION, signature]).encode()
+
+def _read_hot_cache(file_path, files, dedup_keys):
+    """
+    Returns the dataset rooted at file_path as a memory-mapped Arrow table, rebuilding the Arrow IPC copy first
+    if the parquet files changed since it was written.
+    """
+    cache_path = os.path.splitext(file_path)[0] + HOT_CACHE_EXTENSION
+    try:
+        signature = _files_signature(files)
+    except FileNotFoundError:
+        # A segment was compacted away since files was listed
+        files = _dataset_files(file_path)
+        signature = _files_signature(files)
+
+    try:
+        table = pa.ipc.open_file(pa.memory_map(cache_path, 'r')).read_all()
+        if (table.schema.metadata or {}).get(HOT_CACHE_SIGNATURE_KEY) == signature:
+            return table
+    except (FileNotFoundError, pa.ArrowInvalid):
+        pass
+
+    conn = _connect()
+    table = _query_datasets(conn, {None: files}, dedup_keys).arrow()
+    conn.close()
+    table = table.drop(['__symbol_order']).replace_schema_metadata({HOT_CACHE_SIGNATURE_KEY: signature})
+
+    temp_path = f"{cache_path}.{os.getpid()}_{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with pa.OSFile(temp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, cache_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return pa.ipc.open_file(pa.memory_map(cache_path, 'r')).read_all()
+
+def _filter_table(table, columns=None, start=None, end=None, last_n=None):
+    """
+    Applies the Read filters (see _query_datasets) to an in-memory Arrow table.
+    """
+    if start is not None:
+        table = table.filter(pc.greater_equal(table['timestamp'], pa.scalar(_utc_naive(start), table.schema.field('timestamp').type)))
+    if end is not None:
+        table = table.filter(pc.less_equal(table['timestamp'], pa.scalar(_utc_naive(end), table.schema.field('timestamp').type)))
+    if last_n is not None and table.num_rows > last_n:
+        # Last n rows by timestamp, kept in write order
+        indices = pc.sort_indices(table['timestamp']).to_numpy()
+        table = table.take(np.sort(indices[table.num_rows - int(last_n):]))
+    if columns is not None:
+        table = table.select(['timestamp'] + [column for column in columns if column != 'timestamp'])
+    return table
+
+def _stream_dedup_keys(columns):
+    """
+    Stream rows are deduplicated on 'timestamp' (klines) or 'dedup' (trade ids), like save_trade_data.
+    """
+    if 'timestamp' in columns:
+        return ['timestamp']
+    if 'dedup' in columns:
+        return ['dedup']
+    return []
+
+def _pivot_indicators(indicators_df):
+    """
+    Turns long indicator rows (timestamp, indicator_name, indicator_value) into one column per indicator.
+    The first value of a duplicated (timestamp, indicator_name) wins, like the long layout's dedup.
+    """
+    indicators_df = indicators_df.drop_duplicates(subset=['timestamp', 'indicator_name'])
+    wide_df = indicators_df.pivot(index='timestamp', columns='indicator_name', values='indicator_value').astype(float)
+    wide_df.columns.name = None
+    return wide_df
+
+def _combine_wide(wide_df, other_df):
+    """
+    Combines two wide frames indexed by timestamp. Values already in wide_df win, new timestamps and indicators are added.
+    """
+    column_order = list(wide_df.columns) + [column for column in other_df.columns if column not in wide_df.columns]
+    return wide_df.combine_first(other_df)[column_order]
+
+def _format_timestamp(value):
+    return str(_utc_naive(value))
+
+def _utc_naive_series(timestamps):
+    return pd.to_datetime(timestamps, utc=True).dt.tz_localize(None)
+
+def _ohlcv_stats(data, previous=None):
+    """
+    Manifest fields for ohlcv rows written to a symbol.
+
+    Args:
+        data (pd.DataFrame) : the complete dataset, or only the appended rows when previous is given.
+        previous (dict) : manifest entry of the symbol before an append. The appended rows are counted on top of its
+                          row_count when they all fall outside its [first_timestamp, last_timestamp] range.
+
+    Returns:
+        dict: The manifest fields, or None when appended rows fall inside the previous range: they may fill holes or
+              repeat existing rows, so the row count can only be known by counting the files again.
+    """
+    timestamps = _utc_naive_series(data['timestamp']).drop_duplicates()
+    if timestamps.empty:
+        return {}
+    stats = {
+        'first_timestamp': _format_timestamp(timestamps.min()),
+        'last_timestamp': _format_timestamp(timestamps.max()),
+        'row_count': int(len(timestamps)),
+        'columns': [column for column in data.columns if column != 'timestamp'],
+        'schema_version': SCHEMA_VERSION,
+    }
+    if previous and previous.get('row_count') is not None:
+        first_timestamp = pd.Timestamp(previous['first_timestamp'])
+        last_timestamp = pd.Timestamp(previous['last_timestamp'])
+        if ((timestamps >= first_timestamp) & (timestamps <= last_timestamp)).any():
+            return None
+        stats['first_timestamp'] = _format_timestamp(min(first_timestamp, timestamps.min()))
+        stats['last_timestamp'] = _format_timestamp(max(last_timestamp, timestamps.max()))
+        stats['row_count'] = previous['row_count'] + int(len(timestamps))
+        stats['columns'] = previous.get('columns', []) + [column for column in stats['columns'] if column not in previous.get('columns', [])]
+    return stats
+
+def _indicator_stats(indicators):
+    """
+    Manifest fields for written indicators: {'indicators' : {indicator_name : last timestamp}}.
+
+    Args:
+        indicators (list | pd.DataFrame) : IndicatorResults and / or long indicator rows.
+    """
+    if isinstance(indicators, pd.DataFrame):
+        indicators = [indicators]
+    last_timestamps = {}
+    for item in indicators:
+        if isinstance(item, IndicatorResult):
+            if not len(item):
+                continue
+            last_timestamp = _utc_naive_series(pd.Series(item.timestamps)).max()
+            item_timestamps = {name: last_timestamp for name in item.names}
+        elif item is not None and not item.empty:
+            item_timestamps = _utc_naive_series(item['timestamp']).groupby(item['indicator_name'].to_numpy()).max().to_dict()
+        else:
+            continue
+        for name, value in item_timestamps.items():
+            last_timestamps[str(name)] = max(last_timestamps.get(str(name), value), value)
+    if not last_timestamps:
+        return {}
+    return {'indicators': {name: _format_timestamp(value) for name, value in last_timestamps.items()}}
+
+def _indicator_table(indicators, symbol, timeframe):
+    """
+    Long technical indicator rows (symbol, timeframe, timestamp, indicator_name, indicator_value) as an Arrow table.
+
+    IndicatorResults are laid out column by column: their timestamps are converted once and repeated per indicator, and
+    the name, symbol and timeframe columns are built from dictionaries with one entry per distinct value, so no Python
+    object is created per row. Long DataFrames are converted column by column.
+
+    Args:
+        indicators (list) : IndicatorResults and / or long indicator DataFrames.
+
+    Returns:
+        pa.Table: rows in TECHNICAL_SCHEMA, None if there are none.
+    """
+    tables = []
+    for item in indicators:
+        if isinstance(item, IndicatorResult):
+            if not len(item) or not item.names:
+                continue
+            timestamps = pa.array(_normalize_timestamps(pd.DataFrame({'timestamp': item.timestamps}))['timestamp'])
+            name_indices = np.repeat(np.arange(len(item.names), dtype=np.int32), len(item))
+            tables.append(pa.table({
+                'timestamp': pa.concat_arrays([timestamps] * len(item.names)),
+                'indicator_name': pa.DictionaryArray.from_arrays(name_indices, item.names),
+                'indicator_value': np.concatenate(list(item.values.values())),
+            }))
+        elif item is not None and not item.empty:
+            item = _normalize_timestamps(item)
+            tables.append(pa.table({
+                'timestamp': pa.array(item['timestamp']),
+                'indicator_name': pa.array(item['indicator_name'].astype(str)).dictionary_encode(),
+                'indicator_value': item['indicator_value'].astype(float).to_numpy(),
+            }))
+    if not tables:
+        return None
+
+    table = pa.concat_tables(tables)
+    constant_indices = np.zeros(table.num_rows, dtype=np.int32)
+    return pa.table({
+        'symbol': pa.DictionaryArray.from_arrays(constant_indices, [symbol]),
+        'timeframe': pa.DictionaryArray.from_arrays(constant_indices, [timeframe]),
+        'timestamp': table['timestamp'],
+        'indicator_name': table['indicator_name'],
+        'indicator_value': table['indicator_value'],
+    }).cast(TECHNICAL_SCHEMA)
+
+def _calculate_indicator(calculation_func, df, calculation_kwargs):
+    """
+    Runs a calculation function on df, as an IndicatorResult if it has a result method (result_df_decorator),
+    otherwise as the long DataFrame it returns.
+    """
+    if hasattr(calculation_func, 'result'):
+        return calculation_func.result(df, **calculation_kwargs)
+    return calculation_func(df, **calculation_kwargs)
+
+def _first_bar_after(df, last_timestamp):
+    """
+    Position of the first row of df (sorted by timestamp) after last_timestamp, 0 if last_timestamp is None.
+    """
+    if last_timestamp is None:
+        return 0
+    return int((_utc_naive_series(df['timestamp']) <= _utc_naive(last_timestamp)).sum())
+
+def _rows_from(indicators, first_timestamp):
+    """
+    Rows of an IndicatorResult or long indicator DataFrame at or after first_timestamp.
+    """
+    if isinstance(indicators, IndicatorResult):
+        return indicators.select((_utc_naive_series(pd.Series(indicators.timestamps)) >= first_timestamp).to_numpy())
+    return indicators[(_utc_naive_series(indicators['timestamp']) >= first_timestamp).to_numpy()]
+
+def _drop_duplicate_rows(table, keys):
+    """
+    Arrow version of DataFrame.drop_duplicates(subset=keys): keeps the first row of each key, in the original order.
+    """
+    row_numbers = table.append_column('__row', pa.array(np.arange(table.num_rows))).group_by(keys).aggregate([('__row', 'min')])['__row_min']
+    return table.take(np.sort(row_numbers.to_numpy()))
+
+def _data_version(entry):
+    """
+    Identifies the ohlcv data of a symbol from its manifest entry. The row count and timestamp range are part of it
+    because a rebuilt manifest starts counting data versions from 0 again.
+    """
+    fields = [entry.get(key) for key in ['data_version', 'first_timestamp', 'last_timestamp', 'row_count']]
+    return hashlib.sha1(json.dumps(fields).encode()).hexdigest()[:16]
+
+def _indicator_key(calculation_func, params):
+    """
+    File name prefix of a cached indicator: calculation function name and a hash of its module and parameters.
+    """
+    fields = [calculation_func.__module__, calculation_func.__qualname__, sorted(params.items())]
+    return f"{calculation_func.__name__}_{hashlib.sha1(json.dumps(fields, default=str).encode()).hexdigest()[:12]}"
+
+def _split_by_symbol(df, symbols):
+    """
+    Splits a frame sorted by '__symbol_order' into {symbol : df}.
+    """
+    results = {}
+    order = df['__symbol_order'].to_numpy()
+    df = df.drop(columns=['__symbol_order'])
+    boundaries = (order[1:] != order[:-1]).nonzero()[0] + 1
+    starts = [0] + boundaries.tolist()
+    ends = boundaries.tolist() + [len(order)]
+    for start, end in zip(starts, ends):
+        if start < end:
+            results[symbols[order[start]]] = df.iloc[start:end].reset_index(drop=True)
+    return results
+
+
+class Panel:
+    """
+    Ohlcv fields of several symbols aligned on one timestamp index, as returned by Finstore.Read.panel.
+
+    Attributes:
+        index (pd.DatetimeIndex) : sorted union of the timestamps of all symbols.
+        symbols (list) : symbols in column order.
+        fields (dict) : {field : np.ndarray of shape (len(index), len(symbols))}, NaN where a symbol has no row.
+    """
+    def __init__(self, index : pd.DatetimeIndex, symbols : list, fields : dict):
+        self.index = index
+        self.symbols = symbols
+        self.fields = fields
+
+    def __getitem__(self, field : str) -> np.ndarray:
+        return self.fields[field]
+
+    def __contains__(self, field : str) -> bool:
+        return field in self.fields
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def frame(self, field : str) -> pd.DataFrame:
+
+        """
+        Returns a field as a (timestamp x symbol) DataFrame around the existing array, without any index alignment.
+        """
+
+        return pd.DataFrame(self.fields[field], index=self.index, columns=self.symbols, copy=False)
+
+    def valid(self) -> np.ndarray:
+
+        """
+        Returns a (timestamp x symbol) boolean array, True where the symbol has a row.
+        """
+
+        valid = np.zeros((len(self.index), len(self.symbols)), dtype=bool)
+        for values in self.fields.values():
+            valid |= ~np.isnan(values)
+        return valid
+
+    def symbol(self, symbol : str) -> pd.DataFrame:
+
+        """
+        Returns the rows of one symbol as a DataFrame indexed by timestamp, like a preprocessed Read.symbol result.
+        """
+
+        column = self.symbols.index(symbol)
+        rows = np.zeros(len(self.index), dtype=bool)
+        for values in self.fields.values():
+            rows |= ~np.isnan(values[:, column])
+        return pd.DataFrame({field: values[rows, column] for field, values in self.fields.items()}, index=self.index[rows])
+
+    def to_dict(self) -> dict:
+
+        """
+        Returns {symbol : DataFrame with a 'timestamp' column}, like Read.symbol_list, for strategies without panel support.
+        """
+
+        return {symbol: self.symbol(symbol).rename_axis('timestamp').reset_index() for symbol in self.symbols}
+
+    def save(self, dir_path : str):
+
+        """
+        Writes the panel to dir_path as one .npy file per field plus the index and symbols, so other processes can
+        memory-map it with Panel.load instead of receiving a pickled copy. The directory is swapped in complete.
+        """
+
+        temp_dir = f"{dir_path}.{os.getpid()}_{uuid.uuid4().hex[:8]}.tmp"
+        os.makedirs(temp_dir)
+        np.save(os.path.join(temp_dir, 'index.npy'), self.index.values.astype('datetime64[ns]').view(np.int64))
+        for field, values in self.fields.items():
+            np.save(os.path.join(temp_dir, f'{field}.npy'), np.ascontiguousarray(values, dtype=np.float64))
+        with open(os.path.join(temp_dir, 'panel.json'), 'w') as f:
+            json.dump({'symbols': list(self.symbols), 'fields': list(self.fields), 'index_dtype': str(self.index.dtype)}, f)
+        os.replace(temp_dir, dir_path)
+
+    @classmethod
+    def load(cls, dir_path : str, mmap : bool = True) -> 'Panel':
+
+        """
+        Reads a panel written by save. With mmap the field arrays are read-only memory maps of the files, shared by
+        every process that loads them.
+        """
+
+        with open(os.path.join(dir_path, 'panel.json'), 'r') as f:
+            meta = json.load(f)
+        mmap_mode = 'r' if mmap else None
+        index = pd.DatetimeIndex(np.load(os.path.join(dir_path, 'index.npy')).view('datetime64[ns]'), name='timestamp').astype(meta['index_dtype'])
+        fields = {field: np.load(os.path.join(dir_path, f'{field}.npy'), mmap_mode=mmap_mode) for field in meta['fields']}
+        return cls(index, meta['symbols'], fields)
+
 
 class Finstore:
-    def __init__(self, market_name :str , timeframe : str, base_directory : str ='database/finstore', enable_append : bool = True, limit_data_lookback : int = -1, pair : str = ''):
+    def __init__(self, market_name :str , timeframe : str, base_directory : str ='database/finstore', enable_append : bool = True, limit_data_lookback : int = -1, pair : str = '', append_segments : bool = False, indicator_layout : str = 'long', hot_cache : bool = False):
         self.base_directory = base_directory
         self.market_name = market_name
         self.timeframe = timeframe
         self.enable_append = enable_append
         self.limit_data_lookback = limit_data_lookback
         self.pair = pair
+        self.append_segments = append_segments
+        if indicator_layout not in INDICATOR_LAYOUTS:
+            raise ValueError(f"indicator_layout must be one of {INDICATOR_LAYOUTS}, got '{indicator_layout}'")
+        self.indicator_layout = indicator_layout
+        self.hot_cache = hot_cache
+        self.manifest = self.Manifest(self)
         self.read = self.Read(self)
+        self.indicators = self.Indicators(self)
         self.write = self.Write(self)
         self.stream = self.Stream(self)
-        self.list_items_in_dir() # For debugging
 
     def list_items_in_dir(self):
         """
@@ -36,88 +727,396 @@ class Finstore:
         except Exception as e:
             print(f"An error occurred: {e}")
 
+    class Manifest:
+        """
+        Metadata of all symbols of a market and timeframe, kept in market_name=<market>/timeframe=<timeframe>/_manifest.json.
+
+        Every Finstore write updates the entries of the symbols it touched, so listing symbols or looking up
+        timestamps does not need to open any parquet file. A missing manifest is rebuilt from the parquet files.
+
+        Format:
+            {
+                'schema_version' : int,
+                'version' : int,                    # bumped on every update
+                'symbols' : {
+                    symbol : {
+                        'first_timestamp' : str,
+                        'last_timestamp' : str,
+                        'row_count' : int,
+                        'columns' : list,               # ohlcv columns besides timestamp
+                        'indicators' : {indicator_name : last timestamp},
+                        'schema_version' : int,
+                        'version' : int,                # bumped on every write to the symbol
+                        'data_version' : int,           # bumped on every ohlcv write to the symbol
+                        'updated_at' : str,
+                    }
+                }
+            }
+        """
+        def __init__(self, finstore_instance):
+            self.market_name = finstore_instance.market_name
+            self.timeframe = finstore_instance.timeframe
+            self.base_directory = finstore_instance.base_directory
+            self.dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}")
+            self.file_path = os.path.join(self.dir_path, MANIFEST_FILE)
+            self.lock_path = os.path.join(self.dir_path, MANIFEST_LOCK_FILE)
+
+        def _read(self):
+            try:
+                with open(self.file_path, 'r') as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                return None
+
+        def load(self) -> dict:
+
+            """
+            Reads the manifest, rebuilding it from the parquet files if it does not exist yet.
+
+            Returns:
+                dict: The manifest.
+            """
+
+            manifest = self._read()
+            if manifest is not None:
+                return manifest
+            with FileLock(self.lock_path):
+                # Another process may have rebuilt it while we waited for the lock
+                manifest = self._read()
+                return manifest if manifest is not None else self._rebuild()
+
+        def save(self, manifest : dict):
+            os.makedirs(self.dir_path, exist_ok=True)
+            temp_path = f"{self.file_path}.{os.getpid()}_{uuid.uuid4().hex[:8]}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(manifest, f, indent=1)
+            os.replace(temp_path, self.file_path)
+
+        def symbol(self, symbol : str) -> dict:
+
+            """
+            Returns the manifest entry of a symbol, or None if the symbol has no data.
+            """
+
+            return self.load()['symbols'].get(symbol)
+
+        def update(self, entries : dict):
+
+            """
+            Merges new fields into the entries of the given symbols and saves the manifest. The read-modify-write
+            runs under the manifest lock, so updates from concurrent writers are not lost.
+
+            Args:
+                entries (dict) : {symbol : fields}, fields as returned by _ohlcv_stats / _indicator_stats.
+            """
+
+            entries = {symbol: fields for symbol, fields in entries.items() if fields}
+            if not entries:
+                return
+            with FileLock(self.lock_path):
+                manifest = self._read()
+                if manifest is None:
+                    manifest = self._rebuild()
+                updated_at = datetime.now(timezone.utc).isoformat()
+                for symbol, fields in entries.items():
+                    entry = manifest['symbols'].setdefault(symbol, {'indicators': {}, 'version': 0, 'data_version': 0, 'schema_version': SCHEMA_VERSION})
+                    fields = dict(fields)
+                    indicators = fields.pop('indicators', {})
+                    for name, last_timestamp in indicators.items():
+                        previous = entry['indicators'].get(name)
+                        entry['indicators'][name] = last_timestamp if previous is None else _format_timestamp(max(pd.Timestamp(previous), pd.Timestamp(last_timestamp)))
+                    if 'row_count' in fields:
+                        entry['data_version'] = entry.get('data_version', 0) + 1
+                    entry.update(fields)
+                    entry['version'] += 1
+                    entry['updated_at'] = updated_at
+                manifest['version'] += 1
+                self.save(manifest)
+
+        def _symbol_entry(self, conn, symbol_dir : str) -> dict:
+            entry = {'indicators': {}, 'version': 0, 'data_version': 0, 'schema_version': SCHEMA_VERSION}
+            timestamp_sql = 'timezone(\'UTC\', "timestamp"::TIMESTAMPTZ)'
+            files = _dataset_files(os.path.join(symbol_dir, 'ohlcv_data.parquet'))
+            if files:
+                if _has_legacy_timestamps(files[0]):
+                    entry['schema_version'] = 1
+                file_list = ', '.join(_sql_path(path) for path in files)
+                first_timestamp, last_timestamp, row_count = conn.execute(
+                    f'SELECT min({timestamp_sql}), max({timestamp_sql}), count(DISTINCT {timestamp_sql}) FROM read_parquet([{file_list}], union_by_name=true, hive_partitioning=false)'
+                ).fetchone()
+                if row_count:
+                    columns = [name for name in pq.read_schema(files[0]).names if name != 'timestamp']
+                    entry.update({'first_timestamp': _format_timestamp(first_timestamp), 'last_timestamp': _format_timestamp(last_timestamp), 'row_count': int(row_count), 'columns': columns})
+
+            wide_path = os.path.join(symbol_dir, TECHNICAL_WIDE_FILE)
+            long_files = _dataset_files(os.path.join(symbol_dir, TECHNICAL_LONG_FILE))
+            if os.path.isfile(wide_path):
+                names = [name for name in pq.read_schema(wide_path).names if name != 'timestamp']
+                if names:
+                    selects = ', '.join(f'max({timestamp_sql}) FILTER (WHERE {_sql_identifier(name)} IS NOT NULL)' for name in names)
+                    values = conn.execute(f"SELECT {selects} FROM read_parquet({_sql_path(wide_path)}, hive_partitioning=false)").fetchone()
+                    entry['indicators'] = {name: _format_timestamp(value) for name, value in zip(names, values) if value is not None}
+            elif long_files:
+                file_list = ', '.join(_sql_path(path) for path in long_files)
+                rows = conn.execute(
+                    f'SELECT indicator_name, max({timestamp_sql}) FROM read_parquet([{file_list}], union_by_name=true, hive_partitioning=false) GROUP BY indicator_name'
+                ).fetchall()
+                entry['indicators'] = {str(name): _format_timestamp(value) for name, value in rows}
+            return entry
+
+        def rebuild(self) -> dict:
+
+            """
+            Rebuilds the manifest by scanning the parquet files of every symbol and saves it.
+            Useful after files were copied or deleted by hand.
+
+            Returns:
+                dict: The rebuilt manifest.
+            """
+
+            with FileLock(self.lock_path):
+                return self._rebuild()
+
+        def _rebuild(self) -> dict:
+            manifest = {'schema_version': SCHEMA_VERSION, 'version': 0, 'symbols': {}}
+            if not os.path.isdir(self.dir_path):
+                return manifest
+
+            dataset_names = {'ohlcv_data.parquet', TECHNICAL_LONG_FILE, TECHNICAL_WIDE_FILE}
+            updated_at = datetime.now(timezone.utc).isoformat()
+            conn = _connect()
+            for root, dirs, files in os.walk(self.dir_path):
+                if dataset_names.intersection(files) or any(name.endswith(SEGMENT_DIR_SUFFIX) for name in dirs):
+                    symbol = os.path.relpath(root, self.dir_path).replace(os.sep, '/')
+                    try:
+                        entry = self._symbol_entry(conn, root)
+                    except Exception as e:
+                        print(f"Error reading metadata for symbol {symbol} : {e}")
+                        continue
+                    entry['updated_at'] = updated_at
+                    manifest['symbols'][symbol] = entry
+                dirs[:] = [name for name in dirs if not name.endswith(SEGMENT_DIR_SUFFIX)]
+            conn.close()
+
+            self.save(manifest)
+            return manifest
+
     class Read: 
         def __init__(self, finstore_instance):
             self.market_name = finstore_instance.market_name
             self.timeframe = finstore_instance.timeframe
             self.base_directory = finstore_instance.base_directory
             self.pair = finstore_instance.pair
+            self.manifest = finstore_instance.manifest
+            self.hot_cache = finstore_instance.hot_cache
 
-        def symbol(self, symbol : str):
+        def symbol(self, symbol : str, start=None, end=None, columns : list = None, last_n : int = None):
             
             """
             Reads the Parquet file for a given symbol and returns it as a DataFrame.
 
             Args:
                 symbol (str): The symbol to read data for.
+                start, end (str | pd.Timestamp): Inclusive timestamp range, pushed into the parquet scan.
+                columns (list): Columns to read ('timestamp' is always included). Reads all columns if None.
+                last_n (int): Only return the last n rows.
 
             Returns:
                 tuple: A tuple containing the symbol and its corresponding DataFrame.
             """
 
             file_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, 'ohlcv_data.parquet')
-            if not os.path.isfile(file_path):
+            files = _dataset_files(file_path)
+            if not files:
                 raise FileNotFoundError(f"Parquet file not found for symbol '{symbol}' at '{file_path}'")
 
-            conn = duckdb.connect()
+            if self.hot_cache:
+                table = _read_hot_cache(file_path, files, OHLCV_DEDUP_KEYS)
+                return symbol, _filter_table(table, columns=columns, start=start, end=end, last_n=last_n).to_pandas()
+
+            conn = _connect()
             conn.execute("PRAGMA threads=4")  # Use multiple threads for parallel reading
 
-            df = conn.execute(f"SELECT * FROM read_parquet('{file_path}')").fetchdf()
+            df = _read_dataset(conn, files, OHLCV_DEDUP_KEYS, columns=columns, start=start, end=end, last_n=last_n)
             conn.close()
             
             return symbol, df
         
-        def merged_df(self, symbol : str):
+        def merged_df(self, symbol : str, start=None, end=None, columns : list = None, last_n : int = None):
             
             """
             Reads the Merged Df for ohlcv and technical indicators data files for a given symbol and returns it as a DataFrame.
 
             Args:
                 symbol (str): The symbol to read data for.
+                start, end (str | pd.Timestamp): Inclusive timestamp range, pushed into the parquet scan.
+                columns (list): Ohlcv columns and/or indicator names to return ('timestamp' is always included). Returns all if None.
+                last_n (int): Only return the last n rows.
 
             Returns:
                 tuple: A tuple containing the symbol and its corresponding DataFrame.
             """
             
             file_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, 'ohlcv_data.parquet')
-            technical_indicators_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, 'technical_indicators.parquet')
+            technical_indicators_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, TECHNICAL_LONG_FILE)
+            technical_indicators_wide_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, TECHNICAL_WIDE_FILE)
 
-            if not os.path.isfile(file_path):
+            files = _dataset_files(file_path)
+            wide_layout = os.path.isfile(technical_indicators_wide_path)
+            technical_indicators_files = [technical_indicators_wide_path] if wide_layout else _dataset_files(technical_indicators_path)
+            if not files:
                 raise FileNotFoundError(f"Parquet file not found for symbol '{symbol}' at '{file_path}'")
-            if not os.path.isfile(technical_indicators_path):
+            if not technical_indicators_files:
                 raise FileNotFoundError(f"Technical indicators file not found for symbol '{symbol}' at '{technical_indicators_path}'")
 
-            conn = duckdb.connect()
+            conn = _connect()
             conn.execute("PRAGMA threads=4")  # Use multiple threads for parallel reading
 
-            df = conn.execute(f"SELECT * FROM read_parquet('{file_path}')").fetchdf()
-            technical_indicators_df = conn.execute(f"SELECT * FROM read_parquet('{technical_indicators_path}')").fetchdf()
-            technical_indicators_df = technical_indicators_df.drop_duplicates(subset=['timestamp', 'indicator_name'])
-            technical_indicators_df = technical_indicators_df.pivot(index='timestamp', columns='indicator_name', values='indicator_value').reset_index()
+            df = _read_dataset(conn, files, OHLCV_DEDUP_KEYS, start=start, end=end, last_n=last_n)
+            if last_n is not None and not df.empty:
+                start = df['timestamp'].min()
+
+            if wide_layout:
+                # Already one column per indicator, nothing to pivot. Columns come from the file schema so hive
+                # partition columns (market_name, timeframe) are not read twice.
+                indicator_columns = [column for column in pq.read_schema(technical_indicators_wide_path).names if column != 'timestamp']
+                if columns is not None:
+                    indicator_columns = [column for column in columns if column in indicator_columns]
+                technical_indicators_df = _read_dataset(conn, technical_indicators_files, ['timestamp'], columns=indicator_columns, start=start, end=end)
+            else:
+                filters = []
+                if columns is not None:
+                    filters.append((f"d.indicator_name IN ({', '.join('?' for _ in columns)})", list(columns)))
+                technical_indicators_df = _read_dataset(conn, technical_indicators_files, TECHNICAL_DEDUP_KEYS, columns=['indicator_name', 'indicator_value'], start=start, end=end, filters=filters)
+                technical_indicators_df = _pivot_indicators(technical_indicators_df).reset_index()
             merged_df = df.merge(technical_indicators_df, on='timestamp', how='left')
 
             conn.close()
 
+            if columns is not None:
+                merged_df = merged_df[['timestamp'] + [column for column in columns if column in merged_df.columns and column != 'timestamp']]
+
             return symbol, merged_df
 
-        def symbol_list(self, symbol_list : list, merged_dataframe : bool = False):
+        def symbols(self, symbol_list : list, as_arrow : bool = False, start=None, end=None, columns : list = None, last_n : int = None):
+
+            """
+            Reads the ohlcv data of all given symbols with a single DuckDB query over all their parquet files.
+
+            Args:
+                symbol_list (list): List of symbols to read data for.
+                as_arrow (bool): Return one long pyarrow Table with a 'symbol' column instead of a dictionary.
+                start, end (str | pd.Timestamp): Inclusive timestamp range, pushed into the parquet scan.
+                columns (list): Columns to read ('timestamp' is always included). Reads all columns if None.
+                last_n (int): Only return the last n rows of each symbol.
+
+            Returns:
+                dict | pyarrow.Table: {symbol : DataFrame}, or a long Arrow table if as_arrow is set.
+            """
+
+            dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}")
+            symbol_files = {}
+            for symbol in symbol_list:
+                files = _dataset_files(os.path.join(dir_path, symbol, 'ohlcv_data.parquet'))
+                if files:
+                    symbol_files[symbol] = files
+                else:
+                    print(f"Error reading data for symbol {symbol}: Parquet file not found at '{os.path.join(dir_path, symbol)}'")
+
+            symbols = list(symbol_files)
+            if not symbols:
+                return pa.table({'symbol': pa.array([], pa.string())}) if as_arrow else {}
+
+            if self.hot_cache:
+                tables = {
+                    symbol: _filter_table(_read_hot_cache(os.path.join(dir_path, symbol, 'ohlcv_data.parquet'), files, OHLCV_DEDUP_KEYS), columns=columns, start=start, end=end, last_n=last_n)
+                    for symbol, files in symbol_files.items()
+                }
+                if as_arrow:
+                    tables = [
+                        table.drop([name for name in ('symbol',) if name in table.column_names]).add_column(0, 'symbol', pa.array([symbol] * table.num_rows, pa.string()))
+                        for symbol, table in tables.items()
+                    ]
+                    return pa.concat_tables(tables, promote_options='default')
+                return {symbol: table.to_pandas() for symbol, table in tables.items()}
+
+            conn = _connect()
+            conn.execute("PRAGMA threads=4")  # Use multiple threads for parallel reading
+            relation = _query_datasets(conn, symbol_files, OHLCV_DEDUP_KEYS, columns=columns, start=start, end=end, last_n=last_n)
+
+            if as_arrow:
+                table = relation.arrow()
+                conn.close()
+                order = table.column('__symbol_order').to_numpy()
+                table = table.drop([name for name in ('__symbol_order', 'symbol') if name in table.column_names])
+                return table.add_column(0, 'symbol', pa.array(np.asarray(symbols, dtype=object)[order], pa.string()))
+
+            df = relation.fetchdf()
+            conn.close()
+            return _split_by_symbol(df, symbols)
+
+        def panel(self, symbol_list : list, fields : list = None, start=None, end=None, last_n : int = None) -> Panel:
+
+            """
+            Reads the given fields of all symbols into a Panel: one shared timestamp index and one 2-D float array
+            (timestamp x symbol) per field. The arrays are filled in one pass over the long table returned by symbols,
+            instead of aligning one Series per symbol.
+
+            Args:
+                symbol_list (list): List of symbols to read data for.
+                fields (list): Ohlcv columns to read, open/high/low/close/volume if None.
+                start, end (str | pd.Timestamp): Inclusive timestamp range, pushed into the parquet scan.
+                last_n (int): Only read the last n rows of each symbol.
+
+            Returns:
+                Panel: Symbols without data in the range are left out.
+            """
+
+            if fields is None:
+                fields = ['open', 'high', 'low', 'close', 'volume']
+            table = self.symbols(symbol_list, as_arrow=True, start=start, end=end, columns=fields, last_n=last_n)
+            if table.num_rows == 0:
+                return Panel(pd.DatetimeIndex([], name='timestamp'), [], {field: np.empty((0, 0)) for field in fields})
+
+            encoded = pc.dictionary_encode(table['symbol']).combine_chunks()
+            present = set(encoded.dictionary.to_pylist())
+            symbols = [symbol for symbol in dict.fromkeys(symbol_list) if symbol in present]
+            column_of = {symbol: column for column, symbol in enumerate(symbols)}
+            columns = np.array([column_of[symbol] for symbol in encoded.dictionary.to_pylist()])[encoded.indices.to_numpy()]
+
+            timestamps, rows = np.unique(table['timestamp'].to_numpy(), return_inverse=True)
+            panel_fields = {}
+            for field in fields:
+                values = np.full((len(timestamps), len(symbols)), np.nan)
+                values[rows, columns] = pc.cast(table[field], pa.float64()).to_numpy()
+                panel_fields[field] = values
+            return Panel(pd.DatetimeIndex(timestamps, name='timestamp'), symbols, panel_fields)
+
+        def symbol_list(self, symbol_list : list, merged_dataframe : bool = False, as_arrow : bool = False, start=None, end=None, columns : list = None, last_n : int = None):
             
             """
-            Reads the Parquet files for all given symbols in parallel and returns a dictionary with the results.
+            Reads the Parquet files for all given symbols and returns a dictionary with the results.
+            Ohlcv data is read in-process with a single query (see symbols), merged dataframes are read in parallel.
 
             Args:
                 symbol_list (list): List of symbols to read data for.
+                merged_dataframe (bool): Merge technical indicators into the ohlcv data.
+                as_arrow (bool): Return one long pyarrow Table instead of a dictionary (ohlcv data only).
+                start, end (str | pd.Timestamp): Inclusive timestamp range, pushed into the parquet scan.
+                columns (list): Columns to read ('timestamp' is always included). Reads all columns if None.
+                last_n (int): Only return the last n rows of each symbol.
 
             Returns:
                 dict: A dictionary with symbols as keys and their corresponding DataFrames as values.
             """
             
+            query_kwargs = {'start': start, 'end': end, 'columns': columns, 'last_n': last_n}
+            if not merged_dataframe:
+                return self.symbols(symbol_list, as_arrow=as_arrow, **query_kwargs)
+
             results = {}
             with ProcessPoolExecutor() as executor:
-                if merged_dataframe:
-                    futures = {executor.submit(self.merged_df, symbol): symbol for symbol in symbol_list}
-                else:
-                    futures = {executor.submit(self.symbol, symbol): symbol for symbol in symbol_list}
+                futures = {executor.submit(self.merged_df, symbol, **query_kwargs): symbol for symbol in symbol_list}
                 for future in futures:
                     symbol = futures[future]
                     try:
@@ -141,22 +1140,168 @@ class Finstore:
             if not os.path.isdir(file_path):
                 raise FileNotFoundError(f"Directory not found for market '{self.market_name}' at '{file_path}'")
             
+            symbols = self.manifest.load()['symbols']
             if self.pair != '':
-                symbol_list = [str(folder) + '/' + str(self.pair) for folder in os.listdir(file_path) if os.path.isdir(os.path.join(file_path, folder))]
+                symbol_list = [symbol for symbol in symbols if symbol.endswith('/' + str(self.pair))]
             else:
-                symbol_list = [folder for folder in os.listdir(file_path) if os.path.isdir(os.path.join(file_path, folder))]
+                symbol_list = list(dict.fromkeys(symbol.split('/')[0] for symbol in symbols))
             return symbol_list  
+
+        def symbol_info(self, symbol_list : list = None) -> pd.DataFrame:
+
+            """
+            Returns the manifest entries of the given symbols (all symbols if None) without opening any parquet file.
+
+            Returns:
+                pd.DataFrame: One row per symbol (index) with first_timestamp, last_timestamp, row_count, indicators, ...
+            """
+
+            symbols = self.manifest.load()['symbols']
+            if symbol_list is None:
+                symbol_list = list(symbols)
+            info = pd.DataFrame.from_dict({symbol: symbols[symbol] for symbol in symbol_list if symbol in symbols}, orient='index')
+            for column in ['first_timestamp', 'last_timestamp']:
+                if column in info.columns:
+                    info[column] = pd.to_datetime(info[column])
+            return info
     
+    class Indicators:
+        """
+        Indicators computed on demand and cached per symbol, keyed by (symbol, indicator, parameters, data version).
+
+        The first request of an indicator reads the symbol's full ohlcv history, runs the calculation function and
+        persists the result in <symbol>/_indicator_cache/. Later requests (from any process, e.g. a backtest and a
+        deployment) read it back until the symbol's ohlcv data changes, see Manifest 'data_version'.
+
+        Usage:
+            ema = finstore.indicators.symbol('BTC/USDT', 'ema', length=50)['ema_50']
+            ema_dict = finstore.indicators.symbol_list(symbol_list, calculate_ema, length=50)
+        """
+        def __init__(self, finstore_instance):
+            self.market_name = finstore_instance.market_name
+            self.timeframe = finstore_instance.timeframe
+            self.base_directory = finstore_instance.base_directory
+            self.manifest = finstore_instance.manifest
+            self.read = finstore_instance.read
+
+        def _cache_path(self, symbol : str, key : str, data_version : str) -> str:
+            return os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, INDICATOR_CACHE_DIR, f"{key}_{data_version}.parquet")
+
+        def _read_cached(self, cache_path : str):
+            try:
+                df = pd.read_parquet(cache_path)
+            except FileNotFoundError:
+                return None
+            # Same dtype as the DuckDB reads the indicator was calculated from
+            df['timestamp'] = _utc_naive_series(df['timestamp']).astype('datetime64[us]')
+            return df.set_index('timestamp')
+
+        def _compute(self, symbol : str, calculation_func, params : dict, cache_path : str) -> pd.DataFrame:
+
+            """
+            Calculates an indicator over the full history of a symbol and persists it at cache_path, removing the
+            files of older data versions. Safe to run in worker processes.
+
+            Returns:
+                pd.DataFrame: One column per indicator name, indexed by timestamp.
+            """
+
+            _, df = self.read.symbol(symbol)
+            indicators = _calculate_indicator(calculation_func, df, params)
+            wide_df = indicators.to_wide_df() if isinstance(indicators, IndicatorResult) else _pivot_indicators(indicators)
+            wide_df.index = pd.DatetimeIndex(_utc_naive_series(pd.Series(wide_df.index)), name='timestamp')
+
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            _write_parquet(_normalize_timestamps(wide_df.reset_index()), cache_path)
+            prefix = os.path.basename(cache_path).rsplit('_', 1)[0] + '_'
+            cache_dir = os.path.dirname(cache_path)
+            _remove_files([os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.startswith(prefix) and name.endswith('.parquet') and name != os.path.basename(cache_path)])
+            return wide_df
+
+        def symbol(self, symbol : str, indicator, **params) -> pd.DataFrame:
+
+            """
+            Returns an indicator of a symbol, calculating and caching it if there is no result for the current data yet.
+
+            Args:
+                symbol (str): The symbol to get the indicator for.
+                indicator (str | callable): Name in INDICATOR_REGISTRY or a calculation function returning long indicator rows.
+                **params: Parameters of the calculation function, registry defaults are filled in.
+
+            Returns:
+                pd.DataFrame: One column per indicator name (e.g. 'ema_50'), indexed by timestamp.
+            """
+
+            calculation_func, params = resolve_spec(indicator, params)
+            entry = self.manifest.symbol(symbol)
+            if entry is None or entry.get('row_count') is None:
+                raise FileNotFoundError(f"No ohlcv data for symbol '{symbol}'")
+            cache_path = self._cache_path(symbol, _indicator_key(calculation_func, params), _data_version(entry))
+            cached = self._read_cached(cache_path)
+            if cached is not None:
+                return cached
+            return self._compute(symbol, calculation_func, params, cache_path)
+
+        def symbol_list(self, symbol_list : list, indicator, **params) -> dict:
+
+            """
+            Returns an indicator for all given symbols. Cached results are read in-process, missing ones are calculated in parallel.
+
+            Args:
+                symbol_list (list): List of symbols.
+                indicator (str | callable): See symbol.
+                **params: Parameters of the calculation function.
+
+            Returns:
+                dict: {symbol : DataFrame}, see symbol.
+            """
+
+            calculation_func, params = resolve_spec(indicator, params)
+            key = _indicator_key(calculation_func, params)
+            symbols = self.manifest.load()['symbols']
+
+            results = {}
+            missing = {}
+            for symbol in symbol_list:
+                entry = symbols.get(symbol)
+                if entry is None or entry.get('row_count') is None:
+                    print(f"Error calculating indicator for symbol {symbol}: no ohlcv data")
+                    continue
+                cache_path = self._cache_path(symbol, key, _data_version(entry))
+                cached = self._read_cached(cache_path)
+                if cached is not None:
+                    results[symbol] = cached
+                else:
+                    missing[symbol] = cache_path
+
+            if missing:
+                with ProcessPoolExecutor() as executor:
+                    futures = {executor.submit(self._compute, symbol, calculation_func, params, cache_path): symbol for symbol, cache_path in missing.items()}
+                    for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Calculating indicators"):
+                        symbol = futures[future]
+                        try:
+                            results[symbol] = future.result()
+                        except Exception as e:
+                            print(f"Error calculating indicator for symbol {symbol}: {e}")
+
+            return {symbol: results[symbol] for symbol in symbol_list if symbol in results}
+
     class Write:
         """
         Writes data to the finstore.
 
         Args:
             appends (bool) : enable appends if file already exists, useful for adding future data or more technical indicators.
+            append_segments (bool) : write appends as small immutable segment files instead of rewriting the whole file.
+                                     Segments are merged back into the main file by compact().
 
         Functions:
             symbol(self, symbol : str, data : pd.DataFrame) : writes symbol ohlcv to parquet file.
             indicator(self, ohlcv_data : dict, calculation_func : callable, **calculation_kwargs) : writes technical indicators to parquet file.
+            indicators(self, ohlcv_data : dict, indicator_specs : list) : writes several technical indicators with one write per symbol.
+            update_indicators(self, ohlcv_data : dict, indicator_specs : list) : like indicators, continuing stateful indicators from their persisted state.
+            compact(self, symbol : str) : merges a symbol's segments into its main parquet files.
+            migrate_technical_data(self, symbol_list : list = None) : converts long technical indicator files to the wide layout.
         """
         def __init__(self, finstore_instance):
             self.market_name = finstore_instance.market_name
@@ -164,28 +1309,94 @@ class Finstore:
             self.base_directory = finstore_instance.base_directory
             self.enable_append = finstore_instance.enable_append
             self.limit_data_lookback = finstore_instance.limit_data_lookback
+            self.append_segments = finstore_instance.append_segments
+            self.indicator_layout = finstore_instance.indicator_layout
+            self.manifest = finstore_instance.manifest
 
-    
-        def symbol(self, symbol : str, data : pd.DataFrame):
+        def _write_dataset(self, file_path : str, data : pd.DataFrame, dedup_keys : list):
 
             """
-            Writes to Parquet file for a given symbol and it's ohlcv DataFrame.
+            Writes data to the dataset rooted at file_path (main parquet file + segments).
+
+            With append_segments the new rows become a new segment, so the cost scales with the new data only.
+            Otherwise the existing rows (including any segments) are merged with the new rows and the main file is rewritten.
+            Timestamps are stored as timestamp[ms, UTC]; a dataset still holding string timestamps is rewritten (migrated)
+            instead of getting a segment. Callers hold the symbol lock.
 
             Args:
-                symbol (str): The symbol to write data for.
-                data (pd.Dataframe) : The ohlcv dataframe for symbol.
+                data (pd.DataFrame | pa.Table) : new rows. Arrow tables must already hold timestamp[ms, UTC] timestamps and
+                                                 are merged without converting them to pandas.
+
+            Returns:
+                tuple: (data, appended) - the complete dataset, or only the new rows if they were appended as a segment.
+            """
+
+            if not isinstance(data, pa.Table):
+                data = _normalize_timestamps(data)
+            existing_files = _dataset_files(file_path)
+
+            if self.enable_append and self.append_segments and existing_files and not _has_legacy_timestamps(existing_files[0]):
+                _write_segment(data, file_path)
+                return data, True
+
+            segments = _list_segments(file_path)
+            if existing_files and self.enable_append:
+                conn = _connect()
+                if isinstance(data, pa.Table):
+                    existing = _query_datasets(conn, {None: existing_files}, dedup_keys, hive_partitioning=False).fetch_arrow_table()
+                    data = _drop_duplicate_rows(pa.concat_tables([existing.select(data.column_names).cast(data.schema), data]), dedup_keys)
+                else:
+                    existing_df = _read_dataset(conn, existing_files, dedup_keys, hive_partitioning=False)
+                    data = pd.concat([_normalize_timestamps(existing_df), data], ignore_index=True)
+                    data = data.drop_duplicates(subset=dedup_keys)
+                conn.close()
+
+            _write_parquet(data, file_path)
+            _remove_files(segments)
+            return data, False
+
+        def _write_symbol(self, symbol : str, data : pd.DataFrame):
+
+            """
+            Writes the ohlcv data of a symbol and updates its manifest entry, both under the symbol lock: an append
+            counts its rows on top of the entry left by the previous write, so concurrent writers of the symbol must
+            not read the entry before the other's update is saved. Safe to run in worker processes.
+
+            Returns:
+                tuple: (symbol, manifest fields)
             """
 
             dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol)
             os.makedirs(dir_path, exist_ok=True)
             file_path = os.path.join(dir_path, 'ohlcv_data.parquet')
 
-            if os.path.isfile(file_path) and self.enable_append:
-                existing_df = pd.read_parquet(file_path)
-                data = pd.concat([existing_df, data], ignore_index=True)
-                data = data.drop_duplicates(subset=['timestamp'])
+            with _symbol_lock(dir_path):
+                written_df, appended = self._write_dataset(file_path, data, OHLCV_DEDUP_KEYS)
+                if not appended:
+                    stats = _ohlcv_stats(written_df)
+                else:
+                    previous = self.manifest.symbol(symbol)
+                    stats = _ohlcv_stats(written_df, previous) if previous is not None and previous.get('row_count') is not None else None
+                if stats is None:
+                    # Symbol is not in the manifest yet, or the new rows fall inside its range: count its files.
+                    conn = _connect()
+                    stats = self.manifest._symbol_entry(conn, dir_path)
+                    conn.close()
+                    stats = {key: stats[key] for key in ['first_timestamp', 'last_timestamp', 'row_count', 'columns', 'schema_version'] if key in stats}
+                self.manifest.update({symbol: stats})
+            return symbol, stats
+
+        def symbol(self, symbol : str, data : pd.DataFrame):
+
+            """
+            Writes to Parquet file for a given symbol and it's ohlcv DataFrame.
+
+            Args:
+                symbol (str): The symbol to write data for.
+                data (pd.Dataframe) : The ohlcv dataframe for symbol.
+            """
 
-            data.to_parquet(file_path, index=False, compression='zstd')
+            self._write_symbol(symbol, data)
 
         def symbol_list(self, data_ohlcv : pd.DataFrame):
             
@@ -199,38 +1410,250 @@ class Finstore:
                 None
             """
             
+            self.manifest.load() # Make sure the workers find an existing manifest instead of each rebuilding it
             with ProcessPoolExecutor() as executor:
-                futures = {executor.submit(self.symbol, symbol, data): symbol for symbol, data in data_ohlcv.items()}
+                futures = {executor.submit(self._write_symbol, symbol, data): symbol for symbol, data in data_ohlcv.items()}
                 for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Writing symbols"):
                     try:
                         future.result()
                     except Exception as e:
                         print(f"Error writing data for symbol : {e}")
 
-        def technical_data(self, symbol : str, indicators_df: pd.DataFrame):
+        def technical_data(self, symbol : str, indicators_df):
             
             """
             Write technical indicators data to a parquet file.
 
             Args:
             symbol (str) : the symbol name you are saving technical values for.
-            indicators_df (pd.Dataframe) : must be formatted using results_df decorator.
+            indicators_df (pd.Dataframe | IndicatorResult | list) : long rows formatted using results_df decorator, an
+                                                                   IndicatorResult (calculation_func.result) or a list of them.
             """
-            
-            file_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, 'technical_indicators.parquet')
+
+            self.manifest.update({symbol: self._write_technical_data(symbol, indicators_df)})
+
+        def _write_technical_data(self, symbol : str, indicators_df):
+
+            """
+            Writes technical indicators data of a symbol and returns its manifest fields, see technical_data.
+            """
+
+            indicators = indicators_df if isinstance(indicators_df, list) else [indicators_df]
+            file_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, TECHNICAL_LONG_FILE)
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            indicators_df['symbol'] = symbol
-            indicators_df['timeframe'] = self.timeframe
-            formatted_df = indicators_df[['symbol', 'timeframe', 'timestamp', 'indicator_name', 'indicator_value']]
-            formatted_df.loc[:, 'indicator_value'] = formatted_df['indicator_value'].astype(float)
-
-            if os.path.isfile(file_path) and self.enable_append:
-                existing_df = pd.read_parquet(file_path)
-                formatted_df = pd.concat([existing_df, formatted_df], ignore_index=True)
-                formatted_df = formatted_df.drop_duplicates(subset=['timestamp', 'indicator_name', 'symbol', 'timeframe'])
-            
-            formatted_df.to_parquet(file_path, index=False, compression='zstd')
+
+            with _symbol_lock(os.path.dirname(file_path)):
+                # Symbols that were migrated keep using the wide layout whatever the instance default is.
+                if self.indicator_layout == 'wide' or os.path.isfile(os.path.join(os.path.dirname(file_path), TECHNICAL_WIDE_FILE)):
+                    self._write_technical_wide(os.path.dirname(file_path), indicators)
+                    return _indicator_stats(indicators)
+
+                table = _indicator_table(indicators, symbol, self.timeframe)
+                if table is None:
+                    return {}
+                self._write_dataset(file_path, table, TECHNICAL_DEDUP_KEYS)
+                return _indicator_stats(indicators)
+
+        def _write_technical_wide(self, dir_path : str, indicators : list = None):
+
+            """
+            Writes indicators to the wide technical indicators file of a symbol, one column per indicator.
+
+            Existing values win over new ones on the same timestamp, like the long layout's dedup. Any long layout
+            files of the symbol are folded in and removed, so a symbol is only ever stored in one layout. Callers hold the symbol lock.
+
+            Args:
+                dir_path (str) : directory of the symbol.
+                indicators (list) : IndicatorResults and / or long indicator rows formatted using results_df decorator, None to only migrate.
+            """
+
+            wide_path = os.path.join(dir_path, TECHNICAL_WIDE_FILE)
+            long_files = _dataset_files(os.path.join(dir_path, TECHNICAL_LONG_FILE))
+
+            frames = []
+            if self.enable_append:
+                if os.path.isfile(wide_path):
+                    frames.append(_normalize_timestamps(pd.read_parquet(wide_path)).set_index('timestamp'))
+                if long_files:
+                    conn = _connect()
+                    long_df = _read_dataset(conn, long_files, TECHNICAL_DEDUP_KEYS, columns=['indicator_name', 'indicator_value'])
+                    conn.close()
+                    frames.append(_pivot_indicators(_normalize_timestamps(long_df)))
+            for item in indicators or []:
+                if isinstance(item, IndicatorResult):
+                    if len(item) and item.names:
+                        wide_df = item.to_wide_df()
+                        wide_df.index = pd.Index(_normalize_timestamps(wide_df.index.to_frame())['timestamp'], name='timestamp')
+                        frames.append(wide_df[~wide_df.index.duplicated()])
+                elif item is not None and not item.empty:
+                    frames.append(_pivot_indicators(_normalize_timestamps(item)))
+            if not frames:
+                return
+
+            wide_df = frames[0]
+            for frame in frames[1:]:
+                wide_df = _combine_wide(wide_df, frame)
+            wide_df = wide_df.sort_index().reset_index()
+
+            _write_parquet(wide_df, wide_path)
+            _remove_files(long_files)
+
+        def _migrate_technical_symbol(self, dir_path : str):
+            with _symbol_lock(dir_path):
+                self._write_technical_wide(dir_path)
+
+        def migrate_technical_data(self, symbol_list : list = None):
+
+            """
+            Converts the long technical indicator files of the given symbols to the wide layout in parallel.
+            Migrates every symbol of the market and timeframe that still has long files if symbol_list is None.
+
+            Args:
+                symbol_list (list): List of symbols to migrate.
+            """
+
+            dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}")
+            if symbol_list is None:
+                symbol_list = []
+                for root, dirs, files in os.walk(dir_path):
+                    if TECHNICAL_LONG_FILE in files or os.path.splitext(TECHNICAL_LONG_FILE)[0] + SEGMENT_DIR_SUFFIX in dirs:
+                        symbol_list.append(os.path.relpath(root, dir_path).replace(os.sep, '/'))
+                    dirs[:] = [name for name in dirs if not name.endswith(SEGMENT_DIR_SUFFIX)]
+
+            with ProcessPoolExecutor() as executor:
+                futures = {executor.submit(self._migrate_technical_symbol, os.path.join(dir_path, symbol)): symbol for symbol in symbol_list}
+                for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Migrating symbols"):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Error migrating technical data for symbol {futures[future]} : {e}")
+
+        def _migrate_symbol_timestamps(self, symbol : str):
+
+            """
+            Rewrites the datasets of a symbol with timestamp[ms, UTC] timestamps, merging any segments on the way.
+
+            Returns:
+                tuple: (symbol, manifest fields)
+            """
+
+            dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol)
+            with _symbol_lock(dir_path):
+                ohlcv_df = _compact_dataset(os.path.join(dir_path, 'ohlcv_data.parquet'), OHLCV_DEDUP_KEYS, force=True)
+                _compact_dataset(os.path.join(dir_path, TECHNICAL_LONG_FILE), TECHNICAL_DEDUP_KEYS, force=True)
+                wide_path = os.path.join(dir_path, TECHNICAL_WIDE_FILE)
+                if os.path.isfile(wide_path) and _has_legacy_timestamps(wide_path):
+                    _write_parquet(_normalize_timestamps(pd.read_parquet(wide_path)), wide_path)
+            return symbol, (_ohlcv_stats(ohlcv_df) if ohlcv_df is not None else {})
+
+        def migrate_timestamps(self, symbol_list : list = None):
+
+            """
+            One-shot migration of string timestamps ('%Y-%m-%d %H:%M:%S', schema version 1) to timestamp[ms, UTC].
+            Symbols are otherwise migrated lazily on their next write. Migrates every symbol of the market and
+            timeframe still on an older schema version (according to the manifest) if symbol_list is None.
+
+            Args:
+                symbol_list (list): List of symbols to migrate.
+            """
+
+            if symbol_list is None:
+                symbols = self.manifest.load()['symbols']
+                symbol_list = [symbol for symbol, entry in symbols.items() if entry.get('schema_version', 1) < SCHEMA_VERSION]
+
+            entries = {}
+            with ProcessPoolExecutor() as executor:
+                futures = {executor.submit(self._migrate_symbol_timestamps, symbol): symbol for symbol in symbol_list}
+                for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Migrating timestamps"):
+                    try:
+                        symbol, stats = future.result()
+                        entries[symbol] = stats
+                    except Exception as e:
+                        print(f"Error migrating timestamps for symbol {futures[future]} : {e}")
+            self.manifest.update(entries)
+
+        def _compact_symbol(self, symbol : str):
+
+            """
+            Compacts a symbol and returns its exact ohlcv manifest fields, see compact.
+
+            Returns:
+                tuple: (symbol, manifest fields)
+            """
+
+            dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol)
+            with _symbol_lock(dir_path):
+                ohlcv_df = _compact_dataset(os.path.join(dir_path, 'ohlcv_data.parquet'), OHLCV_DEDUP_KEYS)
+                _compact_dataset(os.path.join(dir_path, TECHNICAL_LONG_FILE), TECHNICAL_DEDUP_KEYS)
+            return symbol, (_ohlcv_stats(ohlcv_df) if ohlcv_df is not None else {})
+
+        def compact(self, symbol : str):
+
+            """
+            Merges the append segments of a symbol into its ohlcv and technical indicator parquet files.
+
+            Args:
+                symbol (str): The symbol to compact.
+            """
+
+            self.manifest.update(dict([self._compact_symbol(symbol)]))
+
+        def compact_symbol_list(self, symbol_list : list = None):
+
+            """
+            Compacts all given symbols in parallel. Compacts every symbol of the market and timeframe if symbol_list is None.
+
+            Args:
+                symbol_list (list): List of symbols to compact.
+            """
+
+            if symbol_list is None:
+                dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}")
+                symbol_list = []
+                for root, dirs, files in os.walk(dir_path):
+                    if any(name.endswith(SEGMENT_DIR_SUFFIX) for name in dirs):
+                        symbol_list.append(os.path.relpath(root, dir_path).replace(os.sep, '/'))
+                    dirs[:] = [name for name in dirs if not name.endswith(SEGMENT_DIR_SUFFIX)]
+
+            entries = {}
+            with ProcessPoolExecutor() as executor:
+                futures = {executor.submit(self._compact_symbol, symbol): symbol for symbol in symbol_list}
+                for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Compacting symbols"):
+                    try:
+                        symbol, stats = future.result()
+                        entries[symbol] = stats
+                    except Exception as e:
+                        print(f"Error compacting data for symbol {futures[future]} : {e}")
+            self.manifest.update(entries)
+
+        def compact_in_background(self, symbol_list : list = None) -> Thread:
+
+            """
+            Runs compact_symbol_list in a background thread so ingestion can carry on while segments are merged.
+
+            Returns:
+                Thread: The started compaction thread.
+            """
+
+            compaction_thread = Thread(target=self.compact_symbol_list, args=(symbol_list,), daemon=True)
+            compaction_thread.start()
+            return compaction_thread
+
+        def _lookback_rows(self, df, calculation_func, calculation_kwargs):
+
+            """
+            Rows to calculate an indicator on when only the last limit_data_lookback bars of df are written: those bars
+            plus the warm-up the indicator declares in the registry, so the written bars do not carry warm-up bias.
+
+            Returns:
+                tuple: (rows, timestamp of the first bar to write or None to write every bar)
+            """
+
+            if self.limit_data_lookback <= 0 or len(df) <= self.limit_data_lookback:
+                return df, None
+            spec = get_indicator(calculation_func)
+            warmup = spec.warmup(**calculation_kwargs) if spec is not None else 0
+            return df.iloc[-(self.limit_data_lookback + warmup):], _utc_naive(df['timestamp'].iloc[-self.limit_data_lookback])
 
         def process_indicator(self, symbol, df, calculation_func, calculation_kwargs):
             
@@ -245,13 +1668,14 @@ class Finstore:
             """
             
             try:
-                if self.limit_data_lookback > 0:
-                    df = df.iloc[-self.limit_data_lookback:]
-                indicators_df = calculation_func(df, **calculation_kwargs)
-                self.technical_data(symbol=symbol, indicators_df=indicators_df)
+                rows, first_timestamp = self._lookback_rows(df, calculation_func, calculation_kwargs)
+                indicators = _calculate_indicator(calculation_func, rows, calculation_kwargs)
+                if first_timestamp is not None:
+                    indicators = _rows_from(indicators, first_timestamp)
+                return self._write_technical_data(symbol=symbol, indicators_df=indicators)
             except Exception as e:
                 print(f"Error calculating {calculation_func.__name__} for {symbol}: {e}")
-                return
+                return {}
 
         def indicator(self, ohlcv_data, calculation_func, **calculation_kwargs):
 
@@ -264,20 +1688,209 @@ class Finstore:
                 calculation_kwargs : arguments for your calculation function.
             """
             
+            entries = {}
             use_multiprocessing = True
             if use_multiprocessing:
                 with ProcessPoolExecutor() as executor:
-                    futures = [
-                        executor.submit(self.process_indicator, symbol, df, calculation_func, calculation_kwargs)
+                    futures = {
+                        executor.submit(self.process_indicator, symbol, df, calculation_func, calculation_kwargs): symbol
                         for symbol, df in ohlcv_data.items()
-                    ]
-                    for _ in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Processing symbols"):
-                        pass  # Wait for all futures to complete
+                    }
+                    for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Processing symbols"):
+                        entries[futures[future]] = future.result()
             else:
                 for symbol, df in tqdm(ohlcv_data.items(), desc="Processing symbols"):
-                    self.process_indicator(symbol, df, calculation_func, calculation_kwargs)
+                    entries[symbol] = self.process_indicator(symbol, df, calculation_func, calculation_kwargs)
+            self.manifest.update(entries)
 
             print(f"{calculation_func.__name__} calculation and insertion completed for market: {self.market_name} and timeframe: {self.timeframe}")
+
+        def process_indicators(self, symbol, df, indicator_specs):
+
+            """
+            Calculates several indicators for one symbol and writes them to its technical indicators file in a single write.
+
+            Args:
+            symbol (str): Symbol name.
+            df (pd.DataFrame): OHLCV data DataFrame.
+            indicator_specs (list): (calculation_func, calculation_kwargs) tuples, see indicators.
+            """
+
+            indicators = []
+            for calculation_func, calculation_kwargs in indicator_specs:
+                try:
+                    rows, first_timestamp = self._lookback_rows(df, calculation_func, calculation_kwargs)
+                    result = _calculate_indicator(calculation_func, rows, calculation_kwargs)
+                    indicators.append(result if first_timestamp is None else _rows_from(result, first_timestamp))
+                except Exception as e:
+                    print(f"Error calculating {calculation_func.__name__} for {symbol}: {e}")
+            if not indicators:
+                return {}
+            try:
+                return self._write_technical_data(symbol=symbol, indicators_df=indicators)
+            except Exception as e:
+                print(f"Error writing technical indicators for {symbol}: {e}")
+                return {}
+
+        def indicators(self, ohlcv_data, indicator_specs):
+
+            """
+            Writes several technical indicators for all symbols in the ohlcv_data df in one pass: each symbol's data is sent to a
+            worker once, all indicators are calculated there and the symbol's technical indicators file is written once.
+
+            Args:
+                ohlcv_data (dict) : dictionary of format {symbol : df}
+                indicator_specs (list) : (calculation_func, calculation_kwargs) tuples, calculation_func wrapped with results_df decorator
+                                         or a name in utils.calculation.registry.INDICATOR_REGISTRY. Duplicates are calculated once.
+                                         ex : [(calculate_ema, {'length' : 100}), ('faster_supertrend', {'period' : 7, 'multiplier' : 3})]
+            """
+
+            indicator_specs = resolve_specs(indicator_specs)
+            entries = {}
+            with ProcessPoolExecutor() as executor:
+                futures = {
+                    executor.submit(self.process_indicators, symbol, df, indicator_specs): symbol
+                    for symbol, df in ohlcv_data.items()
+                }
+                for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Processing symbols"):
+                    entries[futures[future]] = future.result()
+            self.manifest.update(entries)
+
+            indicator_names = ', '.join(calculation_func.__name__ for calculation_func, _ in indicator_specs)
+            print(f"{indicator_names} calculation and insertion completed for market: {self.market_name} and timeframe: {self.timeframe}")
+
+        def _load_indicator_state(self, dir_path : str) -> dict:
+            try:
+                with open(os.path.join(dir_path, INDICATOR_STATE_FILE), 'r') as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                return {}
+
+        def _save_indicator_state(self, dir_path : str, states : dict):
+            state_path = os.path.join(dir_path, INDICATOR_STATE_FILE)
+            with _symbol_lock(dir_path):
+                states = {**self._load_indicator_state(dir_path), **states}
+                temp_path = f"{state_path}.{os.getpid()}_{uuid.uuid4().hex[:8]}.tmp"
+                with open(temp_path, 'w') as f:
+                    json.dump(states, f)
+                os.replace(temp_path, state_path)
+
+        def _read_history(self, dir_path : str) -> pd.DataFrame:
+            conn = _connect()
+            history_df = _read_dataset(conn, _dataset_files(os.path.join(dir_path, 'ohlcv_data.parquet')), OHLCV_DEDUP_KEYS, hive_partitioning=False)
+            conn.close()
+            return history_df
+
+        def process_indicator_updates(self, symbol, df, indicator_specs):
+
+            """
+            Updates several indicators of one symbol and writes them in a single write, see update_indicators.
+
+            Args:
+            symbol (str): Symbol name.
+            df (pd.DataFrame): Latest OHLCV rows of the symbol.
+            indicator_specs (list): (calculation_func, calculation_kwargs) tuples.
+            """
+
+            dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol)
+            states = self._load_indicator_state(dir_path)
+            written = (self.manifest.symbol(symbol) or {}).get('indicators', {})
+            history_df = None
+            indicators = []
+            new_states = {}
+            for calculation_func, calculation_kwargs in indicator_specs:
+                try:
+                    update_func = incremental_indicator(calculation_func)
+                    spec = get_indicator(calculation_func)
+                    if update_func is None and spec is None:
+                        # Unknown warm-up: recalculate the lookback, values already written win
+                        rows, first_timestamp = self._lookback_rows(df, calculation_func, calculation_kwargs)
+                        result = _calculate_indicator(calculation_func, rows, calculation_kwargs)
+                        indicators.append(result if first_timestamp is None else _rows_from(result, first_timestamp))
+                        continue
+
+                    if update_func is None:
+                        # Bars after the last written bar of every output, calculated on those bars plus the declared warm-up
+                        warmup = spec.warmup(**calculation_kwargs)
+                        last_timestamps = [written.get(name) for name in spec.outputs(**calculation_kwargs)]
+                        last_timestamp = None if None in last_timestamps else min(pd.Timestamp(value) for value in last_timestamps)
+                        rows = df
+                        start = _first_bar_after(rows, last_timestamp)
+                        # df has to reach back to the last written bar and hold the warm-up before the first new bar
+                        if last_timestamp is None or start < max(warmup, 1):
+                            if history_df is None:
+                                history_df = self._read_history(dir_path)
+                            rows = history_df
+                            start = _first_bar_after(rows, last_timestamp)
+                        if start >= len(rows):
+                            continue
+                        result = _calculate_indicator(calculation_func, rows.iloc[max(start - warmup, 0):], calculation_kwargs)
+                        indicators.append(_rows_from(result, _utc_naive(rows['timestamp'].iloc[start])))
+                        continue
+
+                    indicator_name = calculation_func.indicator_name(**calculation_kwargs)
+                    state = states.get(indicator_name)
+                    # The state can only be continued if df holds every bar after the state's last bar
+                    if state is not None and not df.empty and pd.Timestamp(state['last_timestamp']) >= df['timestamp'].iloc[0]:
+                        rows = df[df['timestamp'] > pd.Timestamp(state['last_timestamp'])]
+                        state = state['state']
+                    else:
+                        if history_df is None:
+                            history_df = self._read_history(dir_path)
+                        rows = history_df
+                        state = None
+                    if rows.empty:
+                        continue
+
+                    values, state = update_func(rows, state, **calculation_kwargs)
+                    new_states[indicator_name] = {'last_timestamp': _format_timestamp(rows['timestamp'].iloc[-1]), 'state': state}
+                    indicators.append(IndicatorResult(rows['timestamp'], {indicator_name: values}))
+                except Exception as e:
+                    print(f"Error calculating {calculation_func.__name__} for {symbol}: {e}")
+            if not indicators:
+                return {}
+            try:
+                stats = self._write_technical_data(symbol=symbol, indicators_df=indicators)
+                self._save_indicator_state(dir_path, new_states)
+                return stats
+            except Exception as e:
+                print(f"Error writing technical indicators for {symbol}: {e}")
+                return {}
+
+        def update_indicators(self, ohlcv_data, indicator_specs):
+
+            """
+            Writes the new bars of several technical indicators for all symbols, like indicators.
+
+            Indicators with a stateful version in utils.calculation.incremental (EMA, supertrend, average volume) continue
+            from the state persisted in the symbol's indicator_state.json, so only the bars after the state are calculated
+            and the values are exactly those of a full recompute. Without a usable state (first run, or ohlcv_data does not
+            reach back to the state's last bar) they are calculated once over the symbol's full history.
+            Other registered indicators are calculated over the bars after their last written bar plus the warm-up they
+            declare in the registry, and only the new bars are written. The bars come from ohlcv_data if it holds them,
+            otherwise from the symbol's history (first run, or ohlcv_data too short). Read
+            last_n = new bars + required_lookback(indicator_specs) to avoid that read.
+            Unregistered calculation functions are recalculated over the last limit_data_lookback bars of ohlcv_data.
+            Delete indicator_state.json of a symbol after rewriting its history to recalculate from scratch.
+
+            Args:
+                ohlcv_data (dict) : dictionary of format {symbol : df}, the latest bars of each symbol.
+                indicator_specs (list) : (calculation_func, calculation_kwargs) tuples, see indicators.
+            """
+
+            indicator_specs = resolve_specs(indicator_specs)
+            entries = {}
+            with ProcessPoolExecutor() as executor:
+                futures = {
+                    executor.submit(self.process_indicator_updates, symbol, df, indicator_specs): symbol
+                    for symbol, df in ohlcv_data.items()
+                }
+                for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Updating symbols"):
+                    entries[futures[future]] = future.result()
+            self.manifest.update(entries)
+
+            indicator_names = ', '.join(calculation_func.__name__ for calculation_func, _ in indicator_specs)
+            print(f"{indicator_names} update completed for market: {self.market_name} and timeframe: {self.timeframe}")
     
     class Stream:
         """
@@ -287,14 +1900,24 @@ class Finstore:
             appends (bool) : enable appends if file already exists, useful for adding future data or more technical indicators.
 
         Functions:
-            symbol(self, symbol : str, data : pd.DataFrame) : writes symbol ohlcv to parquet file.
-            indicator(self, ohlcv_data : dict, calculation_func : callable, **calculation_kwargs) : writes technical indicators to parquet file.
+            save_trade_data(self, symbol : str, message : dict, ...) : writes a single message, rewriting the symbol's files.
+            buffer_trade_data(self, symbol : str, message : dict, ...) : buffers a message, flushed to append-only segments.
+            flush(self, symbol : str = None) : writes buffered messages.
+            fetch_trade_data(self, symbol : str) : reads the trade data of a symbol.
         """
         def __init__(self, finstore_instance):
             self.market_name = finstore_instance.market_name
             self.timeframe = finstore_instance.timeframe
             self.base_directory = finstore_instance.base_directory
             self.enable_append = finstore_instance.enable_append
+
+            # Buffered writer state: {(symbol, file_name) : {'columns' : {column : [values]}, 'rows' : int}}
+            self.buffers = {}
+            self.buffer_lock = Lock()
+            self.flush_rows = 10000
+            self.flush_interval = 5.0
+            self.flush_thread = None
+            self.stop_event = Event()
         
         PRESET_CONFIGS = {
         'binance_kline': lambda message: {
@@ -352,27 +1975,130 @@ class Finstore:
                 # Default parsing if no function or preset is provided
                 df = pd.DataFrame([message])
 
-            # Append to existing file if it exists
-            if os.path.isfile(file_path) and self.enable_append:
-                existing_df = pd.read_parquet(file_path)
-                df = pd.concat([existing_df, df], ignore_index=True)
-                if 'timestamp' in df.columns:
-                    df = df.drop_duplicates(subset=['timestamp'], keep='last')
-                elif 'dedup' in df.columns:
-                    df = df.drop_duplicates(subset=['dedup'], keep='last')
-            
-            # Save to Parquet
-            df.to_parquet(file_path, index=False, compression='zstd')
+            with _symbol_lock(dir_path):
+                # Append to existing file if it exists
+                if os.path.isfile(file_path) and self.enable_append:
+                    existing_df = pd.read_parquet(file_path)
+                    df = pd.concat([existing_df, df], ignore_index=True)
+                    if 'timestamp' in df.columns:
+                        df = df.drop_duplicates(subset=['timestamp'], keep='last')
+                    elif 'dedup' in df.columns:
+                        df = df.drop_duplicates(subset=['dedup'], keep='last')
+
+                # Save to Parquet
+                _write_parquet(df, file_path)
 
-            if save_raw_data:
-                df_raw = pd.DataFrame([message])
-                if os.path.isfile(os.path.join(dir_path, 'raw_data.parquet')) and self.enable_append:
-                    existing_df = pd.read_parquet(os.path.join(dir_path, 'raw_data.parquet'))
-                    df_raw = pd.concat([existing_df, df_raw], ignore_index=True)
+                if save_raw_data:
+                    df_raw = pd.DataFrame([message])
+                    if os.path.isfile(os.path.join(dir_path, 'raw_data.parquet')) and self.enable_append:
+                        existing_df = pd.read_parquet(os.path.join(dir_path, 'raw_data.parquet'))
+                        df_raw = pd.concat([existing_df, df_raw], ignore_index=True)
 
-                df_raw.to_parquet(os.path.join(dir_path, 'raw_data.parquet'), index=False, compression='zstd')
+                    _write_parquet(df_raw, os.path.join(dir_path, 'raw_data.parquet'))
 
 
+        def start_buffering(self, flush_rows: int = 10000, flush_interval: float = 5.0):
+            """
+            Starts the buffered writer used by buffer_trade_data. Buffers are flushed when a symbol reaches flush_rows
+            rows, every flush_interval seconds by a background thread, and on interpreter shutdown.
+
+            Args:
+                flush_rows (int): Buffered rows per symbol that trigger a flush.
+                flush_interval (float): Seconds between periodic flushes of all buffers.
+            """
+            self.flush_rows = flush_rows
+            self.flush_interval = flush_interval
+            if self.flush_thread is not None and self.flush_thread.is_alive():
+                return
+            self.stop_event.clear()
+            self.flush_thread = Thread(target=self._flush_loop, daemon=True)
+            self.flush_thread.start()
+            atexit.register(self.stop_buffering)
+
+        def stop_buffering(self):
+            """
+            Stops the periodic flush thread and flushes everything still buffered.
+            """
+            self.stop_event.set()
+            if self.flush_thread is not None:
+                self.flush_thread.join()
+                self.flush_thread = None
+            self.flush()
+
+        def _flush_loop(self):
+            while not self.stop_event.wait(self.flush_interval):
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Error flushing stream buffers : {e}")
+
+        def _append_row(self, key, row : dict) -> int:
+            buffer = self.buffers.setdefault(key, {'columns': {}, 'rows': 0})
+            columns = buffer['columns']
+            for column, value in row.items():
+                if column not in columns:
+                    columns[column] = [None] * buffer['rows']
+                columns[column].append(value)
+            buffer['rows'] += 1
+            for values in columns.values():
+                if len(values) < buffer['rows']:
+                    values.append(None)
+            return buffer['rows']
+
+        def buffer_trade_data(self, symbol: str, message: dict, parse_func: callable = None, preset: str = None, save_raw_data: bool = True):
+            """
+            Buffers the received trade message in per-symbol column buffers. Buffers are written as append-only
+            parquet segments next to ohlcv_data.parquet / raw_data.parquet, so a flush costs O(buffered rows)
+            instead of rewriting the symbol's files. Same arguments as save_trade_data.
+            """
+            if self.flush_thread is None:
+                self.start_buffering(self.flush_rows, self.flush_interval)
+
+            if preset and preset in self.PRESET_CONFIGS:
+                parse_func = self.PRESET_CONFIGS[preset]
+            row = parse_func(message) if parse_func else dict(message)
+
+            with self.buffer_lock:
+                rows = self._append_row((symbol, 'ohlcv_data.parquet'), row)
+                if save_raw_data:
+                    self._append_row((symbol, 'raw_data.parquet'), dict(message))
+
+            if rows >= self.flush_rows:
+                self.flush(symbol)
+
+        def flush(self, symbol: str = None):
+            """
+            Writes the buffered messages of a symbol (all symbols if None) as new parquet segments.
+            """
+            with self.buffer_lock:
+                keys = [key for key in self.buffers if symbol is None or key[0] == symbol]
+                # Segment names are taken with the rows, so a later flush of the same symbol racing this one
+                # (periodic and size-triggered) still sorts after it and its newer rows win the dedup
+                buffers = {key: (self.buffers.pop(key), _segment_name()) for key in keys}
+
+            for (buffer_symbol, file_name), (buffer, segment_name) in buffers.items():
+                if not buffer['rows']:
+                    continue
+                df = pd.DataFrame(buffer['columns'])
+                dedup_keys = _stream_dedup_keys(df.columns)
+                if dedup_keys:
+                    df = df.drop_duplicates(subset=dedup_keys, keep='last')
+                dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", buffer_symbol)
+                os.makedirs(dir_path, exist_ok=True)
+                _write_segment(df, os.path.join(dir_path, file_name), segment_name)
+
+        def compact(self, symbol: str):
+            """
+            Merges the stream segments of a symbol into its main parquet files, keeping the latest row per timestamp / dedup id.
+            """
+            dir_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol)
+            with _symbol_lock(dir_path):
+                for file_name in ['ohlcv_data.parquet', 'raw_data.parquet']:
+                    file_path = os.path.join(dir_path, file_name)
+                    files = _dataset_files(file_path)
+                    if files:
+                        _compact_dataset(file_path, _stream_dedup_keys(pq.read_schema(files[0]).names), keep='last', typed_timestamps=False)
+
         def fetch_trade_data(self, symbol: str) -> pd.DataFrame:
             """
             Fetches the trade data for a given symbol from a Parquet file.
@@ -387,8 +2113,12 @@ class Finstore:
             file_path = os.path.join(self.base_directory, f"market_name={self.market_name}", f"timeframe={self.timeframe}", symbol, 'ohlcv_data.parquet')
             
             # Check if the file exists
-            if not os.path.isfile(file_path):
+            files = _dataset_files(file_path)
+            if not files:
                 raise FileNotFoundError(f"Trade data file not found for symbol '{symbol}' at '{file_path}'")
             
-            # Read and return the DataFrame
-            return pd.read_parquet(file_path)
\ No newline at end of file
+            # Read the main file and any buffered-writer segments, later messages win
+            conn = _connect()
+            df = _read_dataset(conn, files, _stream_dedup_keys(pq.read_schema(files[0]).names), keep='last', hive_partitioning=False, typed_timestamps=False)
+            conn.close()
+            return df
\ No newline at end of file
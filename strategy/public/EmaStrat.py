@@ -1,4 +1,5 @@
 from strategy.strategy_builder import StrategyBaseClass
+from finstore.finstore import Panel
 import pandas as pd
 pd.set_option('future.no_silent_downcasting', True)
 from typing import Callable, Optional, List, Tuple, Dict, Any
@@ -9,6 +10,8 @@ class EMAStrategy(StrategyBaseClass):
     - Long entry when fast EMA crosses above slow EMA
     - Exit when fast EMA crosses below slow EMA
     """
+
+    supports_panel = True
     
     def __init__(self, fast_ema_period: int = 10, slow_ema_period: int = 100):
         """
@@ -27,7 +30,7 @@ class EMAStrategy(StrategyBaseClass):
         Process OHLCV data and generate EMA crossover signals.
         
         Args:
-            ohlcv_data (Dict[str, pd.DataFrame]): Dictionary of OHLCV DataFrames keyed by symbol
+            ohlcv_data (Dict[str, pd.DataFrame] | Panel): Dictionary of OHLCV DataFrames keyed by symbol, or a Panel
             
         Returns:
             Tuple containing:
@@ -36,6 +39,9 @@ class EMAStrategy(StrategyBaseClass):
             - close_data: DataFrame of closing prices
             - open_data: DataFrame of opening prices
         """
+        if isinstance(ohlcv_data, Panel):
+            return self._run_panel(ohlcv_data)
+
         entries_dict = {}
         exits_dict = {}
         close_dict = {}
@@ -73,6 +79,27 @@ class EMAStrategy(StrategyBaseClass):
 
         return entries, exits, close_prices, open_prices
 
+    def _run_panel(self, panel: Panel) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Same signals as run on a dictionary, computed on all symbols at once.
+
+        A symbol's missing rows (NaN) are skipped by the EMA and the crossover compares against the symbol's
+        previous row, exactly like the per-symbol computation.
+        """
+        close_prices = panel.frame('close')
+        open_prices = panel.frame('open')
+        valid = close_prices.notna()
+
+        fast_ema = close_prices.ewm(span=self.fast_ema_period, adjust=False, ignore_na=True).mean()
+        slow_ema = close_prices.ewm(span=self.slow_ema_period, adjust=False, ignore_na=True).mean()
+        prev_fast_ema = fast_ema.where(valid).ffill().shift(1)
+        prev_slow_ema = slow_ema.where(valid).ffill().shift(1)
+
+        entries = (fast_ema > slow_ema) & (prev_fast_ema <= prev_slow_ema) & valid
+        exits = (fast_ema < slow_ema) & (prev_fast_ema >= prev_slow_ema) & valid
+
+        return entries, exits, close_prices, open_prices
+
     def _preprocess_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Prepare raw OHLCV data for analysis.
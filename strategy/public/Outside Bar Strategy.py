@@ -1,4 +1,6 @@
 from strategy.strategy_builder import StrategyBaseClass
+from finstore.finstore import Panel
+import numpy as np
 import pandas as pd
 from typing import Dict, Tuple
 
@@ -8,12 +10,17 @@ class OutsideBarReversalStrategy(StrategyBaseClass):
     - Bullish entry when outside bar closes below previous low with bearish candle
     - Exit when close price hits 1.5x ATR stop loss or 3x ATR take profit
     """
+
+    supports_panel = True
     
     def __init__(self, atr_period: int = 14):
         super().__init__(name="Outside Bar Reversal Strategy")
         self.atr_period = atr_period
 
     def run(self, ohlcv_data: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        if isinstance(ohlcv_data, Panel):
+            return self._run_panel(ohlcv_data)
+
         entries_dict = {}
         exits_dict = {}
         close_dict = {}
@@ -43,6 +50,24 @@ class OutsideBarReversalStrategy(StrategyBaseClass):
 
         return entries, exits, close_prices, open_prices
 
+    def _run_panel(self, panel: Panel) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Same signals as run, written straight into (timestamp x symbol) arrays instead of aligning per-symbol Series"""
+        valid = panel.valid()
+        entries = np.zeros(valid.shape, dtype=bool)
+        exits = np.zeros(valid.shape, dtype=bool)
+
+        for column, symbol in enumerate(panel.symbols):
+            processed_df = panel.symbol(symbol)
+            processed_df['atr'] = self._calculate_atr(processed_df)
+            long_entries = self._calculate_entries(processed_df)
+            rows = valid[:, column]
+            entries[rows, column] = long_entries.to_numpy()
+            exits[rows, column] = self._calculate_exits(processed_df, long_entries).to_numpy()
+
+        entries = pd.DataFrame(entries, index=panel.index, columns=panel.symbols)
+        exits = pd.DataFrame(exits, index=panel.index, columns=panel.symbols)
+        return entries, exits, panel.frame('close'), panel.frame('open')
+
     def _preprocess_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and validate OHLCV data"""
         if 'timestamp' in df.columns:
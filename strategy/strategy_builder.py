@@ -4,8 +4,13 @@ from typing import Tuple, Dict, Any
 class StrategyBaseClass:
     """
     Base class for all trading strategies. Child classes must implement the run method.
+
+    Strategies that set supports_panel = True also accept a finstore.finstore.Panel (aligned 2-D arrays per field)
+    in run, which the Backtester then reads instead of a dictionary of DataFrames.
     """
 
+    supports_panel = False
+
     def __init__(self, name: str = "Unnamed Strategy") -> None:
         """
         Initialize strategy parameters. Child classes should set their parameters as instance variables.
@@ -28,7 +33,8 @@ class StrategyBaseClass:
         Process the OHLCV data and generate entry/exit signals.
 
         Args:
-            ohlcv_data (Dict[str, pd.DataFrame]): Dictionary of DataFrames containing OHLCV data for each symbol
+            ohlcv_data (Dict[str, pd.DataFrame] | Panel): Dictionary of DataFrames containing OHLCV data for each symbol,
+                or a Panel if supports_panel is set.
 
         Returns:
             Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]: A tuple containing:
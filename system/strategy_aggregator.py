@@ -8,17 +8,10 @@ import abstractbt as vbt
 import pandas as pd
 import scipy.optimize as sco
 import numpy as np
-from strategy.private.SOTM_optimized import get_signals
 from finstore.finstore import Finstore
 from utils.db.fetch import fetch_entries
 from utils.decorators import cache_decorator
 
-from executor.constructor import construct_portfolio
-
-finstore = Finstore(market_name='indian_equity', timeframe='1d')
-symbol_list = finstore.read.get_symbol_list()
-ohlcv_data = fetch_entries(market_name='indian_equity', timeframe='1d')
-
 def annual_sharpe_ratio(weights, returns):
     # Calculate portfolio return
     portfolio_return = np.dot(weights, returns.mean()) * 252
@@ -107,6 +100,9 @@ def aggregated_entries_exits(portfolio_value : int ,
                              params_list : list[dict], 
                              signal_function):
     
+    # executor.constructor imports the private SOTM strategy
+    from executor.constructor import construct_portfolio
+
     assert len(params_list) == len(optimal_weights), "Length of params_list and optimal_weights must be the same"
     
     rounded_weights = [round(num, 1) for num in optimal_weights]
@@ -121,6 +117,13 @@ def aggregated_entries_exits(portfolio_value : int ,
     
 
 if __name__ == '__main__':
+    # Reads the whole market and needs the private SOTM strategy, so only when run as a script
+    # (system.walk_forward imports optimize_portfolio from here).
+    from strategy.private.SOTM_optimized import get_signals
+
+    finstore = Finstore(market_name='indian_equity', timeframe='1d')
+    symbol_list = finstore.read.get_symbol_list()
+    ohlcv_data = fetch_entries(market_name='indian_equity', timeframe='1d')
 
     params_list = [
         {'ohlcv_data': ohlcv_data, 'symbol_list': symbol_list, 'top_n': 10},
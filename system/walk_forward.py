@@ -0,0 +1,286 @@
+'''
+Usage :
+from system.walk_forward import WalkForward
+
+backtester = Backtester(..., strategy_object=EMAStrategy(), run_backtest=False)
+walk_forward = WalkForward(backtester, "EMA Crossover Strategy", {'fast_ema_period': [5, 10, 20], 'slow_ema_period': [50, 100, 200]},
+                           train_period='730D', test_period='365D', anchored=False, top_k=3)
+folds_df = walk_forward.run()       # parameters, ensemble weights and out-of-sample metrics per fold
+walk_forward.oos_equity             # stitched out-of-sample equity curve
+'''
+import json
+import hashlib
+import uuid
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from tqdm import tqdm
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from typing import Dict, List, Any, Optional
+
+from finstore.finstore import Panel
+from backtest_engine.sweep import BACKTEST_SETTINGS, expand_param_grid, sweep_strategies, stack_signals, _no_progress, _PANELS
+
+WALK_FORWARD_DIR = Path("database/backtest/walk_forward")
+
+def _period(period):
+    """
+    pd.Timedelta / pd.DateOffset of a period given as one of them or as a string ('365D', '2W', '6MS', ...).
+    """
+    if isinstance(period, str):
+        try:
+            return pd.Timedelta(period)
+        except ValueError:
+            return to_offset(period)
+    return period
+
+def walk_forward_folds(index : pd.DatetimeIndex, train_period, test_period, anchored : bool = False, step=None) -> List[Dict[str, pd.Timestamp]]:
+    """
+    Splits the time range of index into walk-forward folds of consecutive train and test windows.
+
+    Args:
+        index (pd.DatetimeIndex): Timestamps of the data.
+        train_period, test_period (str | pd.Timedelta | pd.DateOffset): Length of the train and test windows.
+        anchored (bool): Train windows all start at the first timestamp and grow (anchored), instead of rolling
+                         forward with a fixed length.
+        step (str | pd.Timedelta | pd.DateOffset): Distance between folds, test_period if None, so the test windows
+                                                   follow each other without overlap.
+
+    Returns:
+        List[Dict[str, pd.Timestamp]]: 'train_start', 'train_end', 'test_start', 'test_end' per fold. Windows are
+                                       half-open ([start, end)), the last test window is cut at the end of the data.
+    """
+    if len(index) == 0:
+        return []
+    train_period, test_period = _period(train_period), _period(test_period)
+    step = test_period if step is None else _period(step)
+    first, last = index.min(), index.max()
+
+    folds = []
+    train_start = first
+    test_start = first + train_period
+    while test_start <= last:
+        test_end = min(test_start + test_period, last + pd.Timedelta(1, 'ns'))
+        folds.append({'train_start': first if anchored else train_start, 'train_end': test_start, 'test_start': test_start, 'test_end': test_end})
+        train_start = train_start + step
+        test_start = test_start + step
+    return folds
+
+def _window(frame : pd.DataFrame, start : pd.Timestamp, end : pd.Timestamp) -> pd.DataFrame:
+    return frame[(frame.index >= start) & (frame.index < end)]
+
+_SIGNALS = {}
+
+def run_walk_forward_fold(panel_dir : str, settings : dict, strategy_name : str, combos : List[Dict[str, Any]], fold : Dict[str, pd.Timestamp],
+                          metric : str, ascending : bool, top_k : int) -> Dict[str, Any]:
+    """
+    Runs one walk-forward fold in a worker process.
+
+    The signals of every combination are calculated once per process on the full memory-mapped panel and reused by
+    every fold the process runs. The strategies only look back, so the signals inside a window are those of a run on
+    the data up to it. On the train window all combinations are simulated in one grouped from_signals call. The top_k
+    by metric are kept, and their ensemble weights are fitted on their train returns (max Sharpe, optimize_portfolio).
+    The kept combinations are then simulated on the test window and their returns combined with those weights.
+
+    Returns:
+        Dict[str, Any]: The fold's windows, 'params' (kept combinations), 'weights', 'train_metric' and 'returns',
+                        the out-of-sample returns of the weighted ensemble.
+    """
+    from backtest_engine.backtester import Backtester
+    from strategy.strategy_registry import STRATEGY_REGISTRY
+    from system.strategy_aggregator import optimize_portfolio
+
+    if panel_dir not in _PANELS:
+        _PANELS[panel_dir] = Panel.load(panel_dir)
+    panel = _PANELS[panel_dir]
+
+    entry = STRATEGY_REGISTRY[strategy_name]
+    strategy_object = entry['class'](**entry['params'])
+    backtester = Backtester(**settings, strategy_object=strategy_object, progress_callback=_no_progress, run_backtest=False)
+
+    strategies = sweep_strategies(strategy_object, combos)
+    param_names = list(dict.fromkeys(name for combo in combos for name in combo))
+    signal_key = (panel_dir, strategy_name, json.dumps(combos, sort_keys=True, default=str))
+    if signal_key not in _SIGNALS:
+        ohlcv_data = panel if getattr(strategy_object, 'supports_panel', False) else panel.to_dict()
+        labels = [{name: combo.get(name, strategy.params.get(name)) for name in param_names} for combo, strategy in zip(combos, strategies)]
+        _SIGNALS[signal_key] = stack_signals([strategy.run(ohlcv_data) for strategy in strategies], labels)
+    entries, exits, close_data, open_data = _SIGNALS[signal_key]
+    keys = list(dict.fromkeys(entries.columns.droplevel('symbol')))
+
+    def simulate(start, end, selected_keys):
+        columns = entries.columns[entries.columns.droplevel('symbol').isin(selected_keys)]
+        backtester.start_date, backtester.end_date = start, end
+        return backtester._simulate(*(_window(frame[columns], start, end) for frame in (entries, exits, close_data, open_data)), group_by=param_names)
+
+    train_pf = simulate(fold['train_start'], fold['train_end'], keys)
+    train_metric = getattr(train_pf, metric).sort_values(ascending=ascending).dropna()
+    selected = list(train_metric.index[:top_k])
+    if not selected:
+        raise ValueError(f"No combination has a {metric} on the train window {fold['train_start']} - {fold['train_end']}")
+    train_returns = train_pf.returns[selected].dropna()
+    weights = optimize_portfolio(train_returns) if len(selected) > 1 else np.ones(1)
+
+    test_returns = simulate(fold['test_start'], fold['test_end'], selected).returns[selected]
+    key_params = lambda key: dict(zip(param_names, key if isinstance(key, tuple) else (key,)))
+    return {
+        **fold,
+        'params': [key_params(key) for key in selected],
+        'weights': [float(weight) for weight in weights],
+        'train_metric': [float(train_metric[key]) for key in selected],
+        'returns': (test_returns.fillna(0.0) * weights).sum(axis=1),
+    }
+
+class WalkForward:
+    """
+    Walk-forward optimization of a registered strategy on rolling or anchored train / test windows.
+
+    Each fold re-optimizes the strategy's parameters over param_grid on its train window, keeps the top_k
+    combinations and fits their ensemble weights there, then trades the weighted ensemble on the following test
+    window (see run_walk_forward_fold). Folds run in parallel. The OHLCV data is saved as a Panel that the workers
+    memory-map, rebuilt when the finstore data versions change, and each worker calculates the signals once and reuses them for all its folds. The test
+    windows' returns are stitched into one out-of-sample equity curve.
+
+    Args:
+        backtester (Backtester): Backtest settings, its start_date / end_date bound the data. Build it with run_backtest=False.
+        strategy_name (str): Display name of the strategy in STRATEGY_REGISTRY.
+        param_grid (dict | list): Parameters to optimize, see expand_param_grid.
+        train_period, test_period, anchored, step: Fold windows, see walk_forward_folds.
+        metric (str), ascending (bool): Train window ranking, see Backtester.sweep.
+        top_k (int): Combinations kept per fold for the ensemble.
+        max_workers (Optional[int]): Worker processes, os.cpu_count() if None.
+        walk_forward_id (Optional[str]): Name of the directory holding the data. Defaults to a hash of the settings.
+
+    Attributes (after run):
+        folds (pd.DataFrame): One row per fold: windows, params, weights, train_metric, test_return, test_sharpe_ratio, error.
+        oos_returns (pd.Series): Stitched out-of-sample returns of all test windows (see stitch_returns).
+        oos_equity (pd.Series): init_cash compounded with oos_returns.
+    """
+
+    def __init__(self, backtester, strategy_name : str, param_grid, train_period, test_period, anchored : bool = False, step=None,
+                 metric : str = 'sharpe_ratio', ascending : bool = False, top_k : int = 3, max_workers : Optional[int] = None,
+                 walk_forward_id : Optional[str] = None):
+        from strategy.strategy_registry import STRATEGY_REGISTRY
+        if strategy_name not in STRATEGY_REGISTRY:
+            raise ValueError(f"Unknown strategy '{strategy_name}', use one of {list(STRATEGY_REGISTRY)}")
+        self.backtester = backtester
+        self.strategy_name = strategy_name
+        self.settings = {name: getattr(backtester, name) for name in BACKTEST_SETTINGS}
+        self.combos = expand_param_grid(param_grid)
+        self.train_period = train_period
+        self.test_period = test_period
+        self.anchored = anchored
+        self.step = step
+        self.metric = metric
+        self.ascending = ascending
+        self.top_k = top_k
+        self.max_workers = max_workers
+
+        data_spec = json.dumps(self.settings, sort_keys=True, default=str)
+        self.walk_forward_id = walk_forward_id or hashlib.sha1(data_spec.encode()).hexdigest()[:12]
+        self.walk_forward_dir = WALK_FORWARD_DIR / self.walk_forward_id
+        self.panel_dir = None
+
+        self.folds = None
+        self.oos_returns = None
+        self.oos_equity = None
+
+    def _panel_dir(self, data_versions : Optional[Dict[str, str]]) -> Path:
+        """
+        Directory of the panel saved for the given data versions (see Backtester.data_versions), a new one if they are unknown.
+        """
+        if data_versions is None:
+            return self.walk_forward_dir / f"panel_{uuid.uuid4().hex[:12]}"
+        data_hash = hashlib.sha1(json.dumps(data_versions, sort_keys=True).encode()).hexdigest()[:12]
+        return self.walk_forward_dir / f"panel_{data_hash}"
+
+    def _prepare_panel(self) -> Path:
+        """
+        Saves the backtest's data as a Panel, once per version of the data: a panel is reused only while the finstore
+        data versions of the symbols are those it was read at.
+        """
+        data_versions = self.backtester.data_versions()
+        panel_dir = self._panel_dir(data_versions)
+        if data_versions is not None and panel_dir.exists():
+            return panel_dir
+
+        panel = self.backtester.data_fetch(as_panel=True)
+        if self.backtester.fetched_new_data:
+            panel_dir = self._panel_dir(self.backtester.data_versions())
+        if not panel_dir.exists():
+            self.walk_forward_dir.mkdir(parents=True, exist_ok=True)
+            panel.save(str(panel_dir))
+        return panel_dir
+
+    def run(self) -> pd.DataFrame:
+        """
+        Runs every fold and stitches the out-of-sample results.
+
+        Returns:
+            pd.DataFrame: self.folds.
+
+        Raises:
+            RuntimeError: If a fold failed. self.folds then lists every fold with its 'error', and oos_returns /
+                          oos_equity are not set, since they would be stitched across the missing test window.
+        """
+        self.panel_dir = self._prepare_panel()
+        index = Panel.load(str(self.panel_dir)).index
+        folds = walk_forward_folds(index[(index >= self.backtester.start_date) & (index <= self.backtester.end_date)],
+                                   self.train_period, self.test_period, self.anchored, self.step)
+        if not folds:
+            raise ValueError("The backtest range is shorter than one train and test window")
+
+        results = []
+        failed = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(run_walk_forward_fold, str(self.panel_dir), self.settings, self.strategy_name, self.combos, fold, self.metric, self.ascending, self.top_k): position
+                for position, fold in enumerate(folds)
+            }
+            for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Walk-forward folds"):
+                fold = folds[futures[future]]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"Error in walk-forward fold {fold['test_start']}: {e}")
+                    failed.append({**fold, 'error': str(e)})
+
+        self.folds = pd.DataFrame([{
+            **{key: value for key, value in result.items() if key != 'returns'},
+            'test_return': float((1 + result['returns']).prod() - 1),
+            'test_sharpe_ratio': _sharpe_ratio(result['returns']),
+            'error': None,
+        } for result in results] + failed).sort_values('test_start').reset_index(drop=True)
+        self.oos_returns = None
+        self.oos_equity = None
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(folds)} walk-forward folds failed, see the 'error' column of folds")
+
+        self.oos_returns = stitch_returns(results)
+        self.oos_equity = self.backtester.init_cash * (1 + self.oos_returns).cumprod()
+        return self.folds
+
+def stitch_returns(results : List[Dict[str, Any]]) -> pd.Series:
+    """
+    Out-of-sample returns of all folds as one series. A bar covered by several test windows (step shorter than
+    test_period) is taken from the latest fold covering it, so it is compounded once.
+
+    Args:
+        results (List[Dict[str, Any]]): Fold results of run_walk_forward_fold ('test_start' and 'returns').
+    """
+    if not results:
+        return pd.Series(dtype=float)
+    ordered = sorted(results, key=lambda result: result['test_start'])
+    returns = pd.concat([result['returns'] for result in ordered])
+    return returns[~returns.index.duplicated(keep='last')].sort_index()
+
+def _sharpe_ratio(returns : pd.Series) -> float:
+    """
+    Annualized Sharpe ratio of per-bar returns, with the median bar length of their index.
+    """
+    if len(returns) < 2 or returns.std() == 0:
+        return float('nan')
+    bars_per_year = pd.Timedelta(days=365) / returns.index.to_series().diff().median()
+    return float(returns.mean() / returns.std() * np.sqrt(bars_per_year))
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def make_ohlcv():
+    """
+    Factory of random-walk OHLCV DataFrames with daily 'timestamp', 'open', 'high', 'low', 'close' and 'volume' columns.
+
+    make_ohlcv(periods, seed, volatility, gap, wick): close is a geometric random walk with volatility per bar, open
+    the previous close moved by gap, high / low open and close widened by wick.
+    """
+    def make(periods=500, seed=0, volatility=0.02, gap=0.005, wick=0.01):
+        rng = np.random.default_rng(seed)
+        close = 100.0 * np.exp(rng.normal(0, volatility, periods).cumsum())
+        open_ = np.roll(close, 1) * np.exp(rng.normal(0, gap, periods))
+        open_[0] = close[0]
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, wick, periods)))
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, wick, periods)))
+        return pd.DataFrame({
+            'timestamp': pd.date_range('2020-01-01', periods=periods, freq='D'),
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': rng.uniform(1e3, 1e4, periods),
+        })
+    return make
+
+# Pandas references of the Wilder-smoothed indicators (TA-Lib seeding), independent of the numba kernels
+
+def _wilder_average(values, length):
+    # Mean of the first length values (from the second bar on), then an ewm with alpha = 1 / length
+    seeded = pd.Series(np.nan, index=values.index)
+    seeded.iloc[length] = values.iloc[1:length + 1].mean()
+    seeded.iloc[length + 1:] = values.iloc[length + 1:]
+    return seeded.ewm(alpha=1.0 / length, adjust=False).mean()
+
+def _reference_rsi(close, length):
+    change = close.diff()
+    gains = _wilder_average(change.clip(lower=0), length)
+    losses = _wilder_average(-change.clip(upper=0), length)
+    return 100 * gains / (gains + losses)
+
+def _reference_atr(df, length):
+    prev_close = df['close'].shift(1)
+    true_range = pd.concat([df['high'] - df['low'], (df['high'] - prev_close).abs(), (df['low'] - prev_close).abs()], axis=1).max(axis=1)
+    return _wilder_average(true_range, length)
+
+def _reference_supertrend(df, length, multiplier):
+    # pandas_ta supertrend loop
+    hl2 = (df['high'] + df['low']) / 2
+    matr = multiplier * _reference_atr(df, length)
+    upperband = (hl2 + matr).to_numpy()
+    lowerband = (hl2 - matr).to_numpy()
+    close = df['close'].to_numpy()
+    dir_, trend = [1] * len(df), [0] * len(df)
+    for i in range(1, len(df)):
+        if close[i] > upperband[i - 1]:
+            dir_[i] = 1
+        elif close[i] < lowerband[i - 1]:
+            dir_[i] = -1
+        else:
+            dir_[i] = dir_[i - 1]
+            if dir_[i] > 0 and lowerband[i] < lowerband[i - 1]:
+                lowerband[i] = lowerband[i - 1]
+            if dir_[i] < 0 and upperband[i] > upperband[i - 1]:
+                upperband[i] = upperband[i - 1]
+        trend[i] = lowerband[i] if dir_[i] > 0 else upperband[i]
+    return np.array(trend, dtype=float)
+
+@pytest.fixture(name='reference_rsi')
+def reference_rsi_fixture():
+    """ reference_rsi(close, length): RSI of a close Series. """
+    return _reference_rsi
+
+@pytest.fixture(name='reference_atr')
+def reference_atr_fixture():
+    """ reference_atr(df, length): ATR of an OHLC DataFrame. """
+    return _reference_atr
+
+@pytest.fixture(name='reference_supertrend')
+def reference_supertrend_fixture():
+    """ reference_supertrend(df, length, multiplier): supertrend line of an OHLC DataFrame, as pandas_ta computes it. """
+    return _reference_supertrend
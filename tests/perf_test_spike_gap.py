@@ -0,0 +1,120 @@
+# Run from the repository root: python -m tests.perf_test_spike_gap
+import time
+import numpy as np
+import pandas as pd
+from numba import njit
+from utils.calculation.optimized_indicators import spike_signal, large_gap_signal
+
+# 10 years of daily bars for 2,000 symbols
+N_BARS = 2520
+N_SYMBOLS = 2000
+LOOKBACK_PERIOD = 90
+SPIKE_THRESHOLD = 0.15
+GAP_THRESHOLD = 0.15
+# The pandas loop takes seconds per symbol, so it is timed on a sample and extrapolated
+PANDAS_SAMPLE = 5
+
+@njit
+def spike_loop_numba(open_prices, close_prices, high_prices, low_prices, lookback_period, spike_threshold):
+    # Previous O(n * lookback) numba kernel
+    n = len(open_prices)
+    spikes = np.zeros(n)
+    for i in range(lookback_period, n):
+        for j in range(i - lookback_period, i):
+            if (close_prices[j] - open_prices[j]) / open_prices[j] >= spike_threshold:
+                spikes[i] = 1
+                break
+            elif (high_prices[j] - low_prices[j]) / low_prices[j] >= spike_threshold * 2:
+                spikes[i] = 1
+                break
+    return spikes
+
+@njit
+def gap_loop_numba(open_prices, close_prices, lookback_period, gap_threshold):
+    # Previous O(n * lookback) numba kernel
+    n = len(open_prices)
+    gaps = np.zeros(n)
+    for i in range(1, n):
+        if i >= lookback_period:
+            for j in range(i - lookback_period, i):
+                gap = (open_prices[j + 1] - close_prices[j]) / close_prices[j]
+                if gap >= gap_threshold or gap <= -gap_threshold:
+                    gaps[i] = 1
+                    break
+    return gaps
+
+def spike_loop_pandas(df, lookback_period, spike_threshold):
+    # Previous indicators.calculate_spike
+    spikes = pd.Series(0, index=df.index)
+    for i in range(lookback_period, len(df)):
+        window = df.iloc[i-lookback_period:i]
+        if any((window['close'] - window['open']) / window['open'] >= spike_threshold):
+            spikes.iloc[i] = 1
+        elif any((window['high'] - window['low']) / window['low'] >= spike_threshold*2):
+            spikes.iloc[i] = 1
+    return spikes
+
+def gap_loop_pandas(df, lookback_period, gap_threshold):
+    # Previous indicators.detect_large_gap
+    gaps = pd.Series(0, index=df.index)
+    for i in range(1, len(df)):
+        if i >= lookback_period:
+            window = df.iloc[i-lookback_period:i+1]
+            gap = (window['open'] - window['close'].shift(1)) / window['close'].shift(1)
+            if any(gap >= gap_threshold) or any(gap <= -gap_threshold):
+                gaps.iloc[i] = 1
+    return gaps
+
+def generate_prices():
+    rng = np.random.default_rng(42)
+    # Mostly quiet markets so the loops rarely exit early
+    close = 100.0 * np.exp(rng.normal(0, 0.01, (N_BARS, N_SYMBOLS)).cumsum(axis=0))
+    open_ = np.vstack([close[:1], close[:-1]]) * np.exp(rng.normal(0, 0.01, (N_BARS, N_SYMBOLS)))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.01, (N_BARS, N_SYMBOLS))))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.01, (N_BARS, N_SYMBOLS))))
+    return open_, high, low, close
+
+def timed(label, func, scale=1):
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * scale
+    print(f'{label:<45}{elapsed:>10.2f} s')
+    return result, elapsed
+
+def run_benchmark():
+    open_, high, low, close = generate_prices()
+    columns = [(np.ascontiguousarray(open_[:, k]), np.ascontiguousarray(high[:, k]), np.ascontiguousarray(low[:, k]), np.ascontiguousarray(close[:, k])) for k in range(N_SYMBOLS)]
+    print(f'{N_BARS} daily bars x {N_SYMBOLS} symbols, lookback {LOOKBACK_PERIOD}')
+
+    # Compile the numba kernels before timing
+    spike_loop_numba(*[c[:LOOKBACK_PERIOD + 2] for c in (columns[0][0], columns[0][3], columns[0][1], columns[0][2])], LOOKBACK_PERIOD, SPIKE_THRESHOLD)
+    gap_loop_numba(columns[0][0][:LOOKBACK_PERIOD + 2], columns[0][3][:LOOKBACK_PERIOD + 2], LOOKBACK_PERIOD, GAP_THRESHOLD)
+
+    def pandas_sample():
+        for k in range(PANDAS_SAMPLE):
+            df = pd.DataFrame({'open': columns[k][0], 'high': columns[k][1], 'low': columns[k][2], 'close': columns[k][3]})
+            spike_loop_pandas(df, LOOKBACK_PERIOD, SPIKE_THRESHOLD)
+            gap_loop_pandas(df, LOOKBACK_PERIOD, GAP_THRESHOLD)
+    _, pandas_time = timed(f'pandas loop (extrapolated from {PANDAS_SAMPLE} symbols)', pandas_sample, N_SYMBOLS / PANDAS_SAMPLE)
+
+    def numba_loop():
+        return [(spike_loop_numba(o, c, h, l, LOOKBACK_PERIOD, SPIKE_THRESHOLD), gap_loop_numba(o, c, LOOKBACK_PERIOD, GAP_THRESHOLD)) for o, h, l, c in columns]
+    expected, numba_time = timed('numba O(n * lookback) loop, per symbol', numba_loop)
+
+    def rolling_per_symbol():
+        return [(spike_signal(o, c, h, l, LOOKBACK_PERIOD, SPIKE_THRESHOLD), large_gap_signal(o, c, LOOKBACK_PERIOD, GAP_THRESHOLD)) for o, h, l, c in columns]
+    result, per_symbol_time = timed('rolling any O(n), per symbol', rolling_per_symbol)
+
+    def rolling_batch():
+        return spike_signal(open_, close, high, low, LOOKBACK_PERIOD, SPIKE_THRESHOLD), large_gap_signal(open_, close, LOOKBACK_PERIOD, GAP_THRESHOLD)
+    (spikes, gaps), batch_time = timed('rolling any O(n), bars x symbols array', rolling_batch)
+
+    for k in range(N_SYMBOLS):
+        assert np.array_equal(expected[k][0], result[k][0]) and np.array_equal(expected[k][0], spikes[:, k])
+        assert np.array_equal(expected[k][1], result[k][1]) and np.array_equal(expected[k][1], gaps[:, k])
+
+    print(f'speedup vs pandas loop: {pandas_time / per_symbol_time:.0f}x per symbol, {pandas_time / batch_time:.0f}x batched')
+    print(f'speedup vs numba loop: {numba_time / per_symbol_time:.1f}x per symbol, {numba_time / batch_time:.1f}x batched')
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+import os
+from types import SimpleNamespace
+import backtest_engine.sweep as sweep_module
+from backtest_engine.sweep import expand_param_grid, sweep_strategies, stack_signals, sweep_jobs, ParallelSweep, BACKTEST_SETTINGS
+from strategy.public.EmaStrat import EMAStrategy
+
+def test_expand_param_grid():
+    assert expand_param_grid({'fast_ema_period': [5, 10], 'slow_ema_period': 50}) == [
+        {'fast_ema_period': 5, 'slow_ema_period': 50},
+        {'fast_ema_period': 10, 'slow_ema_period': 50},
+    ]
+    # Lists of grids are concatenated, repeated combinations kept once
+    assert len(expand_param_grid([{'fast_ema_period': [5, 10]}, {'fast_ema_period': range(10, 13)}])) == 4
+
+def test_sweep_strategies_keep_other_params():
+    strategies = sweep_strategies(EMAStrategy(fast_ema_period=3, slow_ema_period=30), [{'fast_ema_period': 5}, {'fast_ema_period': 8}])
+    assert [strategy.params for strategy in strategies] == [{'fast_ema_period': 5, 'slow_ema_period': 30}, {'fast_ema_period': 8, 'slow_ema_period': 30}]
+    with pytest.raises(ValueError):
+        sweep_strategies(EMAStrategy(), [{'window': 5}])
+
+def test_stack_signals_matches_single_runs(make_ohlcv):
+    ohlcv_data = {symbol: make_ohlcv(120, seed=seed) for seed, symbol in enumerate(['AAA', 'BBB'])}
+    combos = expand_param_grid({'fast_ema_period': [5, 10], 'slow_ema_period': [30, 50]})
+    results = [strategy.run(ohlcv_data) for strategy in sweep_strategies(EMAStrategy(), combos)]
+    entries, exits, close_data, open_data = stack_signals(results, combos)
+
+    assert entries.columns.names == ['fast_ema_period', 'slow_ema_period', 'symbol']
+    assert entries.shape == (120, 8) and entries.dtypes.eq(bool).all()
+    for combo, (single_entries, single_exits, single_close, _) in zip(combos, results):
+        key = (combo['fast_ema_period'], combo['slow_ema_period'])
+        pd.testing.assert_frame_equal(entries[key], single_entries, check_names=False)
+        pd.testing.assert_frame_equal(exits[key], single_exits, check_names=False)
+        pd.testing.assert_frame_equal(close_data[key], single_close, check_names=False)
+
+def test_sweep_jobs_are_stable():
+    combos = expand_param_grid({'fast_ema_period': range(5, 15), 'slow_ema_period': [50, 100]})
+    jobs = sweep_jobs(combos, chunk_size=6)
+    assert [len(chunk) for chunk in jobs.values()] == [6, 6, 6, 2]
+    assert [combo for chunk in jobs.values() for combo in chunk] == combos
+    # Same grid and chunk size, same job ids: a rerun finds the results of finished jobs
+    assert list(sweep_jobs(expand_param_grid({'fast_ema_period': range(5, 15), 'slow_ema_period': [50, 100]}), chunk_size=6)) == list(jobs)
+
+def crash_or_fail_job(panel_dir, settings, strategy_name, combos):
+    # Stands in for run_sweep_job: fast_ema_period 8 kills its worker, 9 raises
+    if combos[0]['fast_ema_period'] == 8:
+        os._exit(1)
+    if combos[0]['fast_ema_period'] == 9:
+        raise ValueError('bad parameters')
+    return pd.DataFrame([{**combo, 'sharpe_ratio': float(combo['fast_ema_period'])} for combo in combos])
+
+def test_parallel_sweep_charges_crashes_to_the_crashing_job(tmp_path, monkeypatch):
+    monkeypatch.setattr(sweep_module, 'SWEEP_DIR', tmp_path)
+    monkeypatch.setattr(sweep_module, 'run_sweep_job', crash_or_fail_job)
+    monkeypatch.setattr(ParallelSweep, '_prepare', lambda self: self.results_dir.mkdir(parents=True, exist_ok=True))
+    backtester = SimpleNamespace(**{name: None for name in BACKTEST_SETTINGS})
+    sweep = ParallelSweep(backtester, 'EMA Crossover Strategy', {'fast_ema_period': range(5, 15)}, chunk_size=1, max_workers=3, max_retries=1)
+
+    with pytest.raises(RuntimeError):
+        sweep.run()
+    # Jobs in flight or queued when the worker crashed still run, only the two bad jobs fail
+    assert sorted(sweep.failed_jobs) == sorted(job_id for job_id, combos in sweep.jobs.items() if combos[0]['fast_ema_period'] in (8, 9))
+    assert sorted(sweep.results()['fast_ema_period']) == [5, 6, 7, 10, 11, 12, 13, 14]
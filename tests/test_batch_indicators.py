@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.calculation.batch import (
+    ema_batch,
+    rsi_batch,
+    atr_batch,
+    supertrend_batch,
+    roc_batch,
+    average_volume_batch,
+    slope_r2_batch,
+)
+from utils.calculation.registry import INDICATOR_REGISTRY
+from utils.calculation.slope_r2 import calculate_slope_r2_rolling
+
+def make_panel(make_ohlcv, periods=600, symbols=6):
+    frames = [make_ohlcv(periods, seed=column) for column in range(symbols)]
+    fields = {name: np.column_stack([df[name].to_numpy() for df in frames]) for name in ['open', 'high', 'low', 'close', 'volume']}
+    # Symbols listed later start with NaNs, some miss bars of the union index
+    for column, start in enumerate([0, 0, 1, 37, 250, periods]):
+        for values in fields.values():
+            values[:start, column] = np.nan
+    for row, column in [(300, 1), (301, 1), (420, 1), (100, 3), (500, 4)]:
+        for values in fields.values():
+            values[row, column] = np.nan
+    return fields
+
+def symbol_frame(fields, column):
+    # The symbol's own bars, as the per-symbol functions see them
+    rows = np.flatnonzero(~np.isnan(fields['close'][:, column]))
+    df = pd.DataFrame({name: values[rows, column] for name, values in fields.items()})
+    df.insert(0, 'timestamp', pd.date_range('2020-01-01', periods=len(df), freq='D'))
+    return df, rows
+
+def assert_column(result, expected, column, rows):
+    missing = np.ones(result.shape[0], dtype=bool)
+    missing[rows] = False
+    assert np.isnan(result[missing, column]).all()
+    np.testing.assert_allclose(result[rows, column], expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+def test_batch_indicators_match_per_symbol(make_ohlcv, reference_rsi):
+    fields = make_panel(make_ohlcv)
+    ema = ema_batch(fields['close'], 20)
+    rsi = rsi_batch(fields['close'], 14)
+    atr = atr_batch(fields['high'], fields['low'], fields['close'], 14)
+    supertrend = supertrend_batch(fields['high'], fields['low'], fields['close'], 7, 3.0)
+    roc = roc_batch(fields['close'], 10)
+    average_volume = average_volume_batch(fields['close'], fields['volume'], 30)
+    slope_r2 = slope_r2_batch(fields['close'], 90)
+
+    for column in range(fields['close'].shape[1]):
+        df, rows = symbol_frame(fields, column)
+        if len(rows) == 0:
+            assert np.isnan(ema[:, column]).all()
+            continue
+        assert_column(ema, df['close'].ewm(span=20, adjust=False).mean(), column, rows)
+        assert_column(rsi, reference_rsi(df['close'], 14), column, rows)
+        # Same values as the registered per-symbol indicators of the same name
+        assert_column(atr, INDICATOR_REGISTRY['atr'](df, length=14)['indicator_value'], column, rows)
+        assert_column(supertrend, INDICATOR_REGISTRY['supertrend'](df, length=7, atr_multiplier=3.0)['indicator_value'], column, rows)
+        assert_column(roc, 100 * df['close'].diff(10) / df['close'].shift(10), column, rows)
+        assert_column(average_volume, (df['close'] * df['volume']).rolling(window=30).mean(), column, rows)
+        slopes, r2_values = calculate_slope_r2_rolling(np.log(df['close'].to_numpy()), 90)
+        expected = slopes * r2_values
+        expected[:89] = np.nan
+        assert_column(slope_r2, expected, column, rows)
+
+def test_batch_indicators_short_history(make_ohlcv):
+    fields = {name: values[:5] for name, values in make_panel(make_ohlcv).items()}
+    assert np.isnan(rsi_batch(fields['close'], 14)).all()
+    assert np.isnan(average_volume_batch(fields['close'], fields['volume'], 30)).all()
+    assert np.isnan(slope_r2_batch(fields['close'], 90)).all()
@@ -0,0 +1,497 @@
+import os
+import importlib.util
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import finstore.finstore as finstore_module
+from finstore.finstore import Finstore, Panel, _list_segments
+
+def make_ohlcv(start, periods, close_offset=0.0):
+    timestamps = pd.date_range(start=start, periods=periods, freq='D').strftime('%Y-%m-%d %H:%M:%S')
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'open': [100.0 + i for i in range(periods)],
+        'high': [110.0 + i for i in range(periods)],
+        'low': [90.0 + i for i in range(periods)],
+        'close': [105.0 + i + close_offset for i in range(periods)],
+        'volume': [1000.0 + i for i in range(periods)],
+    })
+
+def test_append_segments_and_compaction(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), append_segments=True)
+    ohlcv_path = os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d', 'TEST', 'ohlcv_data.parquet')
+
+    finstore.write.symbol('TEST', make_ohlcv('2021-01-01', 10))
+    assert os.path.isfile(ohlcv_path), "First write should create the main parquet file."
+    assert _list_segments(ohlcv_path) == []
+
+    # Overlapping rows must keep the values that were written first, like the old read-concat-rewrite path.
+    finstore.write.symbol('TEST', make_ohlcv('2021-01-08', 10, close_offset=1000.0))
+    assert len(_list_segments(ohlcv_path)) == 1, "Appends should be written as a segment."
+
+    _, df = finstore.read.symbol('TEST')
+    assert len(df) == 17
+    assert df['timestamp'].is_unique
+    assert df.loc[df['timestamp'] == '2021-01-10 00:00:00', 'close'].iloc[0] == 114.0
+    assert df.loc[df['timestamp'] == '2021-01-11 00:00:00', 'close'].iloc[0] == 1108.0
+
+    finstore.write.compact('TEST')
+    assert _list_segments(ohlcv_path) == [], "Compaction should remove merged segments."
+    _, compacted_df = finstore.read.symbol('TEST')
+    pd.testing.assert_frame_equal(compacted_df.reset_index(drop=True), df.reset_index(drop=True))
+
+def test_rewrite_merges_existing_segments(tmp_path):
+    segment_store = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), append_segments=True)
+    segment_store.write.symbol('TEST', make_ohlcv('2021-01-01', 5))
+    segment_store.write.symbol('TEST', make_ohlcv('2021-01-06', 5))
+
+    rewrite_store = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path))
+    rewrite_store.write.symbol('TEST', make_ohlcv('2021-01-11', 5))
+
+    ohlcv_path = os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d', 'TEST', 'ohlcv_data.parquet')
+    assert _list_segments(ohlcv_path) == []
+    _, df = rewrite_store.read.symbol('TEST')
+    assert len(df) == 15
+
+def test_symbol_list_single_query(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), append_segments=True)
+    finstore.write.symbol('AAA', make_ohlcv('2021-01-01', 5))
+    finstore.write.symbol('AAA', make_ohlcv('2021-01-04', 5, close_offset=50.0))
+    finstore.write.symbol('BBB', make_ohlcv('2021-02-01', 3))
+
+    results = finstore.read.symbol_list(['AAA', 'BBB', 'MISSING'])
+    assert set(results) == {'AAA', 'BBB'}
+    for symbol in ['AAA', 'BBB']:
+        _, expected = finstore.read.symbol(symbol)
+        pd.testing.assert_frame_equal(results[symbol], expected)
+
+    table = finstore.read.symbol_list(['AAA', 'BBB'], as_arrow=True)
+    assert table.column_names[0] == 'symbol'
+    assert table.num_rows == 11
+    assert table.column('symbol').to_pylist().count('BBB') == 3
+
+def test_read_pushdown(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), append_segments=True)
+    finstore.write.symbol('AAA', make_ohlcv('2021-01-01', 10))
+    finstore.write.symbol('AAA', make_ohlcv('2021-01-11', 10))
+    finstore.write.symbol('BBB', make_ohlcv('2021-01-01', 5))
+
+    _, df = finstore.read.symbol('AAA', start='2021-01-05', end=pd.Timestamp('2021-01-14'), columns=['close'])
+    assert list(df.columns) == ['timestamp', 'close']
+    assert df['timestamp'].tolist() == pd.date_range('2021-01-05', '2021-01-14').tolist()
+
+    results = finstore.read.symbol_list(['AAA', 'BBB'], last_n=3)
+    assert results['AAA']['timestamp'].tolist() == list(pd.date_range('2021-01-18', periods=3))
+    assert len(results['BBB']) == 3
+
+    timestamps = make_ohlcv('2021-01-01', 20)['timestamp']
+    indicators = pd.concat([
+        pd.DataFrame({'timestamp': timestamps, 'indicator_name': 'ema_5', 'indicator_value': [float(i) for i in range(20)]}),
+        pd.DataFrame({'timestamp': timestamps, 'indicator_name': 'rsi_14', 'indicator_value': 50.0}),
+    ], ignore_index=True)
+    finstore.write.technical_data('AAA', indicators)
+    _, merged = finstore.read.merged_df('AAA', columns=['close', 'ema_5'], last_n=2)
+    assert list(merged.columns) == ['timestamp', 'close', 'ema_5']
+    assert merged['ema_5'].tolist() == [18.0, 19.0]
+
+def make_indicators(start, periods, values):
+    timestamps = make_ohlcv(start, periods)['timestamp']
+    return pd.concat([
+        pd.DataFrame({'timestamp': timestamps, 'indicator_name': name, 'indicator_value': [value(i) for i in range(periods)]})
+        for name, value in values.items()
+    ], ignore_index=True)
+
+def test_wide_indicator_layout_and_migration(tmp_path):
+    long_store = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path))
+    long_store.write.symbol('AAA', make_ohlcv('2021-01-01', 10))
+    long_store.write.symbol('BBB', make_ohlcv('2021-01-01', 10))
+    for symbol in ['AAA', 'BBB']:
+        long_store.write.technical_data(symbol, make_indicators('2021-01-01', 10, {'ema_5': float, 'rsi_14': lambda i: 50.0}))
+    _, expected = long_store.read.merged_df('AAA')
+
+    symbol_dir = os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d', 'AAA')
+    long_store.write.migrate_technical_data(['AAA'])
+    assert not os.path.exists(os.path.join(symbol_dir, 'technical_indicators.parquet'))
+    assert os.path.isfile(os.path.join(symbol_dir, 'technical_indicators_wide.parquet'))
+    _, migrated = long_store.read.merged_df('AAA')
+    pd.testing.assert_frame_equal(migrated, expected)
+
+    # New indicators become new columns, existing values win on overlapping timestamps.
+    wide_store = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), indicator_layout='wide')
+    wide_store.write.technical_data('AAA', make_indicators('2021-01-05', 6, {'ema_5': lambda i: -1.0, 'atr_14': lambda i: 2.0}))
+    _, merged = wide_store.read.merged_df('AAA', columns=['close', 'ema_5', 'atr_14'])
+    assert list(merged.columns) == ['timestamp', 'close', 'ema_5', 'atr_14']
+    assert merged['ema_5'].tolist() == [float(i) for i in range(10)]
+    assert merged['atr_14'].isna().sum() == 4
+
+    wide_store.write.migrate_technical_data()
+    assert os.path.isfile(os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d', 'BBB', 'technical_indicators_wide.parquet'))
+
+def test_manifest_tracks_writes(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), pair='USDT', append_segments=True)
+    finstore.write.symbol('AAA/USDT', make_ohlcv('2021-01-01', 10))
+    finstore.write.symbol('AAA/USDT', make_ohlcv('2021-01-08', 10))
+    finstore.write.symbol('BBB/USDT', make_ohlcv('2021-02-01', 3))
+    finstore.write.technical_data('AAA/USDT', make_indicators('2021-01-01', 12, {'ema_5': float}))
+
+    assert sorted(finstore.read.get_symbol_list()) == ['AAA/USDT', 'BBB/USDT']
+    info = finstore.read.symbol_info()
+    assert info.loc['AAA/USDT', 'row_count'] == 17
+    assert info.loc['AAA/USDT', 'last_timestamp'] == pd.Timestamp('2021-01-17')
+    assert info.loc['AAA/USDT', 'indicators'] == {'ema_5': '2021-01-12 00:00:00'}
+    assert info.loc['BBB/USDT', 'first_timestamp'] == pd.Timestamp('2021-02-01')
+
+    version = finstore.manifest.load()['version']
+    finstore.write.compact('AAA/USDT')
+    assert finstore.manifest.load()['version'] == version + 1
+    assert finstore.read.symbol_info(['AAA/USDT']).loc['AAA/USDT', 'row_count'] == 17
+
+    # A missing manifest is rebuilt from the parquet files.
+    expected = finstore.manifest.load()['symbols']
+    os.remove(finstore.manifest.file_path)
+    rebuilt = finstore.manifest.load()['symbols']
+    for symbol in expected:
+        for key in ['first_timestamp', 'last_timestamp', 'row_count', 'columns', 'indicators']:
+            assert rebuilt[symbol][key] == expected[symbol][key]
+
+def test_manifest_counts_rows_filling_holes(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), append_segments=True)
+    finstore.write.symbol('TEST', make_ohlcv('2021-01-01', 5))
+    finstore.write.symbol('TEST', make_ohlcv('2021-01-08', 3))
+    assert finstore.manifest.symbol('TEST')['row_count'] == 8
+    # Rows inside the written range fill the hole, repeated rows are not counted again
+    finstore.write.symbol('TEST', make_ohlcv('2021-01-05', 3))
+    assert finstore.manifest.symbol('TEST')['row_count'] == 10
+    assert finstore.manifest.symbol('TEST')['row_count'] == len(finstore.read.symbol('TEST')[1])
+
+def make_kline(start_ms, close):
+    return {'e': 'kline', 's': 'BTCUSDT', 'k': {'t': start_ms, 'o': '1.0', 'h': '2.0', 'l': '0.5', 'c': str(close), 'v': '10.0', 'V': '4.0'}}
+
+def test_stream_buffered_writer(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1m', base_directory=str(tmp_path))
+    finstore.stream.start_buffering(flush_rows=4, flush_interval=3600)
+    try:
+        # Kline updates for an open candle repeat its start time, the latest update wins.
+        for start_ms, close in [(0, 1.0), (0, 1.5), (60000, 2.0), (60000, 2.5), (120000, 3.0)]:
+            finstore.stream.buffer_trade_data('BTCUSDT', make_kline(start_ms, close), preset='binance_kline')
+        ohlcv_path = os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1m', 'BTCUSDT', 'ohlcv_data.parquet')
+        assert len(_list_segments(ohlcv_path)) == 1, "Reaching flush_rows should write one segment."
+
+        finstore.stream.buffer_trade_data('BTCUSDT', make_kline(120000, 3.5), preset='binance_kline')
+    finally:
+        finstore.stream.stop_buffering()
+
+    df = finstore.stream.fetch_trade_data('BTCUSDT')
+    assert df['timestamp'].tolist() == [0, 60000, 120000]
+    assert df['close'].tolist() == [1.5, 2.5, 3.5]
+
+    finstore.stream.compact('BTCUSDT')
+    assert _list_segments(ohlcv_path) == []
+    pd.testing.assert_frame_equal(finstore.stream.fetch_trade_data('BTCUSDT'), df)
+
+def test_racing_stream_flushes_keep_the_latest_kline(tmp_path, monkeypatch):
+    # The first flush is still writing when a later flush of the same symbol writes its newer update
+    finstore = Finstore(market_name='test_market', timeframe='1m', base_directory=str(tmp_path))
+    first_writing, second_written = threading.Event(), threading.Event()
+    write_segment = finstore_module._write_segment
+    def slow_write_segment(data, file_path, segment_name=None):
+        if not first_writing.is_set():
+            first_writing.set()
+            second_written.wait(10)
+            return write_segment(data, file_path, segment_name)
+        write_segment(data, file_path, segment_name)
+        second_written.set()
+    monkeypatch.setattr(finstore_module, '_write_segment', slow_write_segment)
+
+    finstore.stream.start_buffering(flush_rows=100, flush_interval=3600)
+    try:
+        finstore.stream.buffer_trade_data('BTCUSDT', make_kline(0, 1.0), preset='binance_kline', save_raw_data=False)
+        first_flush = threading.Thread(target=finstore.stream.flush, args=('BTCUSDT',))
+        first_flush.start()
+        first_writing.wait(10)
+        finstore.stream.buffer_trade_data('BTCUSDT', make_kline(0, 2.0), preset='binance_kline', save_raw_data=False)
+        finstore.stream.flush('BTCUSDT')
+        first_flush.join()
+    finally:
+        finstore.stream.stop_buffering()
+    assert finstore.stream.fetch_trade_data('BTCUSDT')['close'].tolist() == [2.0]
+
+def test_hot_cache_matches_parquet_reads(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), append_segments=True)
+    hot_store = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), hot_cache=True)
+    finstore.write.symbol('AAA', make_ohlcv('2021-01-01', 10))
+    finstore.write.symbol('BBB', make_ohlcv('2021-01-01', 5))
+
+    cache_path = os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d', 'AAA', 'ohlcv_data.arrow')
+    _, cached = hot_store.read.symbol('AAA')
+    assert os.path.isfile(cache_path)
+    pd.testing.assert_frame_equal(cached, finstore.read.symbol('AAA')[1])
+
+    # Appending a segment invalidates the cached copy.
+    finstore.write.symbol('AAA', make_ohlcv('2021-01-08', 10, close_offset=1000.0))
+    for kwargs in [{}, {'start': '2021-01-05', 'end': '2021-01-12', 'columns': ['close']}, {'last_n': 3}]:
+        pd.testing.assert_frame_equal(hot_store.read.symbol('AAA', **kwargs)[1], finstore.read.symbol('AAA', **kwargs)[1])
+
+    results = hot_store.read.symbol_list(['AAA', 'BBB'])
+    for symbol in ['AAA', 'BBB']:
+        pd.testing.assert_frame_equal(results[symbol], finstore.read.symbol(symbol)[1])
+    assert hot_store.read.symbol_list(['AAA', 'BBB'], as_arrow=True).num_rows == 22
+
+def test_typed_timestamps_and_migration(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), append_segments=True)
+    market_dir = os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d')
+    for symbol in ['OLD', 'LAZY']:
+        os.makedirs(os.path.join(market_dir, symbol))
+        make_ohlcv('2021-01-01', 10).to_parquet(os.path.join(market_dir, symbol, 'ohlcv_data.parquet'), index=False)
+
+    # Legacy string timestamps are read back as datetimes and can be filtered.
+    _, df = finstore.read.symbol('OLD', start='2021-01-03', end='2021-01-04')
+    assert df['timestamp'].tolist() == list(pd.date_range('2021-01-03', periods=2))
+    assert finstore.read.symbol_info().loc['OLD', 'schema_version'] == 1
+
+    # A write to a legacy symbol rewrites it with typed timestamps instead of appending a segment.
+    lazy_path = os.path.join(market_dir, 'LAZY', 'ohlcv_data.parquet')
+    finstore.write.symbol('LAZY', make_ohlcv('2021-01-11', 5))
+    assert _list_segments(lazy_path) == []
+    assert pq.read_schema(lazy_path).field('timestamp').type == pa.timestamp('ms', tz='UTC')
+    assert finstore.read.symbol_info().loc['LAZY', 'schema_version'] == 2
+
+    finstore.write.migrate_timestamps()
+    old_path = os.path.join(market_dir, 'OLD', 'ohlcv_data.parquet')
+    assert pq.read_schema(old_path).field('timestamp').type == pa.timestamp('ms', tz='UTC')
+    _, migrated = finstore.read.symbol('OLD')
+    assert migrated['timestamp'].tolist() == list(pd.date_range('2021-01-01', periods=10))
+    assert finstore.read.symbol_info().loc['OLD', 'schema_version'] == 2
+
+def write_day_range(base_directory, start, periods, append_segments=False, step=1):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=base_directory, append_segments=append_segments)
+    for offset in range(periods):
+        finstore.write.symbol('TEST', make_ohlcv(pd.Timestamp(start) + pd.Timedelta(days=offset * step), 1))
+
+def read_row_counts(base_directory, reads):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=base_directory)
+    row_counts = []
+    for _ in range(reads):
+        try:
+            row_counts.append(len(finstore.read.symbol('TEST')[1]))
+        except FileNotFoundError:
+            row_counts.append(0)
+    return row_counts
+
+@pytest.mark.parametrize('append_segments', [False, True])
+def test_concurrent_writers_do_not_lose_rows(tmp_path, append_segments):
+    # Each process appends one row at a time through the read-concat-rewrite path, which loses rows without the symbol lock,
+    # or as segments on interleaved days, whose manifest row counts build on the entry of the previous write.
+    starts = ['2021-01-01', '2021-01-02', '2021-01-03', '2021-01-04'] if append_segments else ['2021-01-01', '2022-01-01', '2023-01-01', '2024-01-01']
+    step = len(starts) if append_segments else 1
+    with ProcessPoolExecutor(max_workers=len(starts) + 1) as executor:
+        reader = executor.submit(read_row_counts, str(tmp_path), 50)
+        for future in [executor.submit(write_day_range, str(tmp_path), start, 10, append_segments, step) for start in starts]:
+            future.result()
+        row_counts = reader.result()
+    # A reader running next to the writers only ever sees complete files
+    assert row_counts == sorted(row_counts)
+
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path))
+    _, df = finstore.read.symbol('TEST')
+    assert len(df) == 40
+    assert df['timestamp'].is_unique
+    assert finstore.manifest.symbol('TEST')['row_count'] == 40
+    assert finstore.manifest.symbol('TEST')['version'] == 40
+
+    dir_path = os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d', 'TEST')
+    assert not [name for name in os.listdir(dir_path) if name.endswith('.tmp')], "Temporary files should be renamed or removed."
+
+def make_random_ohlcv(start, periods, seed):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + rng.normal(0, 2, periods).cumsum()
+    open_ = close + rng.normal(0, 1, periods)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start=start, periods=periods, freq='D'),
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.uniform(0, 2, periods),
+        'low': np.minimum(open_, close) - rng.uniform(0, 2, periods),
+        'close': close,
+        'volume': rng.uniform(1000, 2000, periods),
+    })
+
+def test_panel_matches_dictionary_strategies(tmp_path):
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path))
+    # BBB starts later and misses a few days in the middle, so the panel has NaN gaps
+    bbb = make_random_ohlcv('2021-02-01', 200, seed=2)
+    finstore.write.symbol_list({'AAA': make_random_ohlcv('2021-01-01', 300, seed=1), 'BBB': bbb.drop(index=range(50, 55))})
+
+    panel = finstore.read.panel(['AAA', 'BBB', 'MISSING'], start='2021-01-10')
+    assert isinstance(panel, Panel)
+    assert panel.symbols == ['AAA', 'BBB']
+    assert panel['close'].shape == (291, 2)
+    _, aaa = finstore.read.symbol('AAA', start='2021-01-10')
+    np.testing.assert_array_equal(panel['close'][:, 0], aaa['close'].to_numpy())
+    assert np.isnan(panel['close'][:, 1]).sum() == 291 - 195
+    pd.testing.assert_frame_equal(panel.symbol('BBB').reset_index(), finstore.read.symbol('BBB', start='2021-01-10', columns=['open', 'high', 'low', 'close', 'volume'])[1], check_freq=False)
+
+    from strategy.public.EmaStrat import EMAStrategy
+    spec = importlib.util.spec_from_file_location('outside_bar_strategy', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'strategy', 'public', 'Outside Bar Strategy.py'))
+    outside_bar = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(outside_bar)
+
+    ohlcv_dict = finstore.read.symbol_list(['AAA', 'BBB'], start='2021-01-10')
+    for strategy in [EMAStrategy(fast_ema_period=5, slow_ema_period=20), outside_bar.OutsideBarReversalStrategy()]:
+        for expected, result in zip(strategy.run(ohlcv_dict), strategy.run(panel)):
+            pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+    # Saved panels are memory-mapped back with the same index, symbols and values
+    panel.save(str(tmp_path / 'panel'))
+    loaded = Panel.load(str(tmp_path / 'panel'))
+    assert isinstance(loaded['close'], np.memmap) and loaded.symbols == panel.symbols
+    pd.testing.assert_index_equal(loaded.index, panel.index)
+    for field in panel.fields:
+        np.testing.assert_array_equal(loaded[field], panel[field])
+    for symbol, df in loaded.to_dict().items():
+        pd.testing.assert_frame_equal(df, ohlcv_dict[symbol][['timestamp', 'open', 'high', 'low', 'close', 'volume']], check_freq=False)
+
+def rolling_mean_indicator(df, window):
+    return pd.DataFrame({'timestamp': df['timestamp'], 'indicator_name': f'sma_{window}', 'indicator_value': df['close'].rolling(window).mean()})
+
+def failing_indicator(df):
+    raise ValueError('not enough data')
+
+def test_indicators_single_pass_matches_sequential_writes(tmp_path):
+    ohlcv_data = {'AAA': make_random_ohlcv('2021-01-01', 50, seed=1), 'BBB': make_random_ohlcv('2021-01-01', 40, seed=2)}
+    specs = [(rolling_mean_indicator, {'window': 5}), (failing_indicator, {}), (rolling_mean_indicator, {'window': 10})]
+
+    sequential = Finstore(market_name='sequential', timeframe='1d', base_directory=str(tmp_path))
+    sequential.write.symbol_list(ohlcv_data)
+    for calculation_func, calculation_kwargs in specs:
+        sequential.write.indicator(ohlcv_data, calculation_func, **calculation_kwargs)
+
+    single_pass = Finstore(market_name='single_pass', timeframe='1d', base_directory=str(tmp_path))
+    single_pass.write.symbol_list(ohlcv_data)
+    single_pass.write.indicators(ohlcv_data, specs)
+
+    for symbol in ohlcv_data:
+        expected = sequential.read.merged_df(symbol, columns=['close', 'sma_5', 'sma_10'])[1]
+        pd.testing.assert_frame_equal(single_pass.read.merged_df(symbol, columns=['close', 'sma_5', 'sma_10'])[1], expected)
+        assert set(single_pass.manifest.symbol(symbol)['indicators']) == {'sma_5', 'sma_10'}
+
+def test_update_indicators_continues_from_state(tmp_path):
+    from utils.calculation.optimized_indicators import calculate_average_volume_optimized
+    specs = [(calculate_average_volume_optimized, {'lookback_period': 20}), (rolling_mean_indicator, {'window': 5})]
+    ohlcv = make_random_ohlcv('2021-01-01', 120, seed=3)
+
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), limit_data_lookback=30)
+    finstore.write.symbol('AAA', ohlcv.iloc[:100])
+    # No state yet: the stateful indicator is calculated over the full history, even though only 30 bars are passed
+    finstore.write.update_indicators({'AAA': finstore.read.symbol('AAA', last_n=30)[1]}, specs)
+    assert os.path.isfile(os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d', 'AAA', 'indicator_state.json'))
+
+    finstore.write.symbol('AAA', ohlcv.iloc[100:])
+    finstore.write.update_indicators({'AAA': finstore.read.symbol('AAA', last_n=30)[1]}, specs)
+
+    _, merged_df = finstore.read.merged_df('AAA', columns=['average_volume_20'])
+    expected = (ohlcv['close'] * ohlcv['volume']).rolling(20).mean()
+    np.testing.assert_allclose(merged_df['average_volume_20'].to_numpy(), expected.to_numpy(), equal_nan=True)
+    assert finstore.manifest.symbol('AAA')['indicators']['average_volume_20'] == '2021-04-30 00:00:00'
+
+def counting_indicator(df, window, counter_path):
+    # Appends a line per calculation so the test can count them across processes
+    with open(counter_path, 'a') as f:
+        f.write('x\n')
+    return rolling_mean_indicator(df, window)
+
+def test_indicator_cache_keyed_by_data_version(tmp_path):
+    counter_path = str(tmp_path / 'calculations.txt')
+    ohlcv = make_random_ohlcv('2021-01-01', 60, seed=4)
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path / 'store'))
+    finstore.write.symbol('AAA', ohlcv.iloc[:50])
+    finstore.write.symbol('BBB', ohlcv)
+
+    def calculations():
+        return len(open(counter_path).read().split()) if os.path.exists(counter_path) else 0
+
+    first = finstore.indicators.symbol('AAA', counting_indicator, window=5, counter_path=counter_path)
+    np.testing.assert_allclose(first['sma_5'].to_numpy(), ohlcv['close'].iloc[:50].rolling(5).mean().to_numpy(), equal_nan=True)
+    # Cached for the same data version, also for a new Finstore instance (another backtest or deployment)
+    again = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path / 'store')).indicators.symbol('AAA', counting_indicator, window=5, counter_path=counter_path)
+    pd.testing.assert_frame_equal(first, again)
+    assert calculations() == 1
+
+    # Other parameters and other symbols are separate entries
+    results = finstore.indicators.symbol_list(['AAA', 'BBB', 'CCC'], counting_indicator, window=5, counter_path=counter_path)
+    assert list(results) == ['AAA', 'BBB'] and calculations() == 2
+    finstore.indicators.symbol('AAA', counting_indicator, window=10, counter_path=counter_path)
+    assert calculations() == 3
+
+    # Indicator writes do not invalidate the cache, new ohlcv rows do
+    finstore.write.indicator({'AAA': ohlcv.iloc[:50]}, rolling_mean_indicator, window=3)
+    finstore.indicators.symbol('AAA', counting_indicator, window=5, counter_path=counter_path)
+    assert calculations() == 3
+    finstore.write.symbol('AAA', ohlcv.iloc[50:])
+    updated = finstore.indicators.symbol('AAA', counting_indicator, window=5, counter_path=counter_path)
+    assert calculations() == 4 and len(updated) == 60
+    cache_dir = os.path.join(str(tmp_path / 'store'), 'market_name=test_market', 'timeframe=1d', 'AAA', '_indicator_cache')
+    assert len(os.listdir(cache_dir)) == 2  # the stale window=5 result was replaced
+
+def test_indicator_cache_by_registry_name(tmp_path):
+    from utils.calculation.indicators import calculate_ema
+    ohlcv = make_random_ohlcv('2021-01-01', 60, seed=5)
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path))
+    finstore.write.symbol('AAA', ohlcv)
+    by_name = finstore.indicators.symbol('AAA', 'ema', length=10)
+    by_func = finstore.indicators.symbol('AAA', calculate_ema, length=10)
+    pd.testing.assert_frame_equal(by_name, by_func)
+    np.testing.assert_allclose(by_name['ema_10'].to_numpy(), ohlcv['close'].ewm(span=10, adjust=False).mean().to_numpy())
+    assert len(os.listdir(os.path.join(str(tmp_path), 'market_name=test_market', 'timeframe=1d', 'AAA', '_indicator_cache'))) == 1
+
+@pytest.mark.parametrize('store_kwargs', [{}, {'append_segments': True}, {'indicator_layout': 'wide'}])
+def test_indicator_results_write_like_long_rows(tmp_path, store_kwargs):
+    from utils.calculation.indicators import calculate_ema
+    from utils.calculation.slope_r2 import calculate_exponential_regression_multi
+    ohlcv = make_random_ohlcv('2021-01-01', 60, seed=6)
+    later = ohlcv.iloc[40:]
+
+    long_store = Finstore(market_name='long_rows', timeframe='1d', base_directory=str(tmp_path), **store_kwargs)
+    result_store = Finstore(market_name='results', timeframe='1d', base_directory=str(tmp_path), **store_kwargs)
+    for finstore in [long_store, result_store]:
+        finstore.write.symbol('AAA', ohlcv)
+    long_store.write.technical_data('AAA', pd.concat([calculate_ema(ohlcv, 5), calculate_exponential_regression_multi(ohlcv, windows=(10, 5))], ignore_index=True))
+    long_store.write.technical_data('AAA', calculate_ema(later, 5))
+    result_store.write.technical_data('AAA', [calculate_ema.result(ohlcv, 5), calculate_exponential_regression_multi.result(ohlcv, windows=(10, 5))])
+    result_store.write.technical_data('AAA', calculate_ema.result(later, 5))
+
+    columns = ['close', 'ema_5', 'slope_r2_product_10', 'slope_r2_product_5']
+    pd.testing.assert_frame_equal(result_store.read.merged_df('AAA', columns=columns)[1], long_store.read.merged_df('AAA', columns=columns)[1])
+    assert result_store.manifest.symbol('AAA')['indicators'] == long_store.manifest.symbol('AAA')['indicators']
+
+    result = calculate_ema.result(ohlcv, 5)
+    assert result.names == ['ema_5'] and result['ema_5'].dtype == np.float64
+    pd.testing.assert_frame_equal(result.to_long_df(), calculate_ema(ohlcv, 5))
+
+def test_updates_calculate_new_bars_with_warmup(tmp_path):
+    from utils.calculation.slope_r2 import calculate_exponential_regression_optimized
+    ohlcv = make_random_ohlcv('2021-01-01', 120, seed=7)
+    specs = [('slope_r2', {'window': 20})]
+    expected = calculate_exponential_regression_optimized(ohlcv, 20)['indicator_value'].to_numpy()
+
+    # Only the last 30 bars are written, calculated on those bars plus the 19 bar warm-up
+    finstore = Finstore(market_name='test_market', timeframe='1d', base_directory=str(tmp_path), limit_data_lookback=30)
+    finstore.write.symbol('AAA', ohlcv.iloc[:100])
+    finstore.write.indicators({'AAA': ohlcv.iloc[:100]}, specs)
+    _, merged_df = finstore.read.merged_df('AAA', columns=['slope_r2_product_20'])
+    assert merged_df['slope_r2_product_20'].notna().sum() == 30
+    np.testing.assert_allclose(merged_df['slope_r2_product_20'].to_numpy()[-30:], expected[70:100])
+
+    # ohlcv_data holds the new bars and their warm-up: only the new bars are calculated and written
+    finstore.write.symbol('AAA', ohlcv.iloc[100:110])
+    finstore.write.update_indicators({'AAA': finstore.read.symbol('AAA', last_n=10 + 19)[1]}, specs)
+    # ohlcv_data too short for the warm-up: the history is read instead
+    finstore.write.symbol('AAA', ohlcv.iloc[110:])
+    finstore.write.update_indicators({'AAA': finstore.read.symbol('AAA', last_n=5)[1]}, specs)
+
+    _, merged_df = finstore.read.merged_df('AAA', columns=['slope_r2_product_20'])
+    np.testing.assert_allclose(merged_df['slope_r2_product_20'].to_numpy()[70:], expected[70:])
+    assert finstore.manifest.symbol('AAA')['indicators']['slope_r2_product_20'] == '2021-04-30 00:00:00'
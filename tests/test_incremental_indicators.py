@@ -0,0 +1,40 @@
+import json
+import numpy as np
+import pytest
+from utils.calculation.incremental import ema_update, atr_update, supertrend_update, average_volume_update
+from utils.calculation.optimized_indicators import calculate_average_volume_numba
+
+CHUNKS = [(0, 1), (1, 2), (2, 120), (120, 121), (121, 600)]
+
+def run_in_chunks(update_func, df, **kwargs):
+    values = []
+    state = None
+    for start, end in CHUNKS:
+        chunk_values, state = update_func(df.iloc[start:end], state, **kwargs)
+        # States are persisted as json between updates
+        state = json.loads(json.dumps(state))
+        values.append(chunk_values)
+    return np.concatenate(values)
+
+@pytest.mark.parametrize('update_func, kwargs', [
+    (ema_update, {'length': 100}),
+    (atr_update, {'period': 14}),
+    (supertrend_update, {'period': 7, 'multiplier': 3}),
+    (average_volume_update, {'lookback_period': 90}),
+])
+def test_incremental_updates_match_full_recompute(make_ohlcv, update_func, kwargs):
+    df = make_ohlcv(600)
+    full_values, _ = update_func(df, None, **kwargs)
+    np.testing.assert_array_equal(run_in_chunks(update_func, df, **kwargs), full_values)
+
+def test_incremental_matches_existing_indicators(make_ohlcv):
+    df = make_ohlcv(600)
+    np.testing.assert_array_equal(ema_update(df, None, length=100)[0], df['close'].ewm(span=100, adjust=False).mean().to_numpy())
+    np.testing.assert_array_equal(average_volume_update(df, None, lookback_period=90)[0], calculate_average_volume_numba(df['close'].values, df['volume'].values, 90))
+
+def test_incremental_supertrend_matches_faster_supertrend(make_ohlcv):
+    pytest.importorskip('vectorbt')
+    from utils.calculation.supertrend import faster_supertrend
+    df = make_ohlcv(600)
+    expected = faster_supertrend(df, period=7, multiplier=3)['indicator_value'].to_numpy()
+    np.testing.assert_array_equal(supertrend_update(df, None, period=7, multiplier=3)[0], expected)
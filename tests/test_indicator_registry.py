@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+from utils.calculation.registry import INDICATOR_REGISTRY, IndicatorSpec, get_indicator, resolve_specs, required_lookback, required_inputs
+from utils.calculation.indicators import calculate_ema, calculate_roc, calculate_supertrend
+from utils.calculation.optimized_indicators import calculate_spike_optimized
+from utils.calculation.slope_r2 import calculate_exponential_regression_multi
+
+def test_indicator_names_follow_the_function_signature(make_ohlcv):
+    df = make_ohlcv(120)
+    assert calculate_roc(df, lookback_period=12)['indicator_name'].iloc[0] == 'roc_12'
+    # Positional arguments in the function's order and omitted defaults
+    assert calculate_supertrend(df, 2.0, 7)['indicator_name'].iloc[0] == 'supertrend_7_2.0'
+    assert calculate_supertrend(df)['indicator_name'].iloc[0] == 'supertrend_10_3.0'
+    assert calculate_spike_optimized(df, 30)['indicator_name'].iloc[0] == 'spike_30_0.5'
+    assert calculate_roc.indicator_name(12) == 'roc_12'
+
+def test_registry_specs(make_ohlcv):
+    ema = INDICATOR_REGISTRY['ema']
+    assert get_indicator(calculate_ema) is ema and get_indicator(lambda df: df) is None
+    assert ema.outputs(length=50) == ['ema_50']
+    assert INDICATOR_REGISTRY['slope_r2_multi'].outputs() == ['slope_r2_product_90', 'slope_r2_product_30', 'slope_r2_product_15']
+    assert INDICATOR_REGISTRY['supertrend'].outputs(length=7) == ['supertrend_7_3.0']
+    with pytest.raises(ValueError):
+        ema.outputs()
+    with pytest.raises(ValueError):
+        ema.outputs(length=50, span=3)
+
+    df = make_ohlcv(120)
+    pd.testing.assert_frame_equal(INDICATOR_REGISTRY['rsi'](df), INDICATOR_REGISTRY['rsi'].func(df, 14))
+    # Every declared output is what the function writes
+    for name, params in [('ema', {'length': 20}), ('roc', {'lookback_period': 5}), ('spike', {'lookback_period': 10}), ('slope_r2_multi', {}), ('sustained_volume_spike', {'lookback_period': 20, 'spike_duration': 3, 'threshold': 2})]:
+        spec = INDICATOR_REGISTRY[name]
+        assert list(spec(df.copy(), **params)['indicator_name'].unique()) == spec.outputs(**params)
+
+def test_resolve_specs_dedups_and_fills_defaults():
+    specs = [
+        ('ema', {'length': 100}),
+        (calculate_ema, {'length': 100}),
+        ('gap', {}),
+        ('slope_r2_multi', {'windows': (90, 30)}),
+        ('slope_r2', {'window': 30}),  # already written by slope_r2_multi
+        (calculate_exponential_regression_multi, {'windows': (90, 30, 15)}),
+    ]
+    resolved = resolve_specs(specs)
+    assert [(func.__name__, params) for func, params in resolved] == [
+        ('calculate_ema', {'length': 100}),
+        ('detect_large_gap_optimized', {'lookback_period': 90, 'gap_threshold': 0.15}),
+        ('calculate_exponential_regression_multi', {'windows': (90, 30)}),
+        ('calculate_exponential_regression_multi', {'windows': (90, 30, 15)}),
+    ]
+    assert required_lookback(specs) == 400
+    assert required_lookback([('slope_r2', {'window': 30}), ('average_volume', {'lookback_period': 90})]) == 89
+    assert required_inputs([('ema', {'length': 10}), ('spike', {'lookback_period': 5}), ('average_volume', {'lookback_period': 5})]) == ['close', 'open', 'high', 'low', 'volume']
+
+def test_resolve_specs_rejects_name_collisions(monkeypatch):
+    # Same name written by an indicator of another family: which values are stored would depend on the order
+    monkeypatch.setitem(INDICATOR_REGISTRY, 'rsi_as_ema', IndicatorSpec('rsi_as_ema', 'utils.calculation.indicators', 'calculate_rsi', ('close',), {'length': 14}, lambda length: 8 * length, outputs=lambda length: [f'ema_{length}']))
+    with pytest.raises(ValueError):
+        resolve_specs([('ema', {'length': 50}), ('rsi_as_ema', {'length': 50})])
+    assert len(resolve_specs([('ema', {'length': 50}), ('rsi_as_ema', {'length': 20})])) == 2
+
+def test_supertrend_and_faster_supertrend_do_not_share_names():
+    pytest.importorskip('vectorbt')
+    with pytest.raises(ValueError):
+        resolve_specs([('supertrend', {'length': 7, 'atr_multiplier': 3}), ('faster_supertrend', {'period': 7, 'multiplier': 3})])
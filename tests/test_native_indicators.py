@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.calculation.indicators import calculate_rsi, calculate_atr, calculate_supertrend, calculate_roc
+
+def with_flat_bars(df):
+    # A few flat bars (high == low, unchanged close)
+    df.loc[100:102, ['open', 'high', 'low', 'close']] = df.loc[99, 'close']
+    return df
+
+@pytest.mark.parametrize('length', [2, 14, 30])
+def test_native_indicators_match_reference(make_ohlcv, reference_rsi, reference_atr, reference_supertrend, length):
+    df = with_flat_bars(make_ohlcv())
+    rsi = calculate_rsi(df, length)
+    assert rsi['indicator_name'].iloc[0] == f'rsi_{length}'
+    np.testing.assert_allclose(rsi['indicator_value'], reference_rsi(df['close'], length), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(calculate_atr(df, length)['indicator_value'], reference_atr(df, length), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(calculate_supertrend(df, atr_multiplier=3.0, length=length)['indicator_value'], reference_supertrend(df, length, 3.0), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(calculate_roc(df, length)['indicator_value'], 100 * df['close'].diff(length) / df['close'].shift(length), rtol=1e-9, atol=1e-12, equal_nan=True)
+
+def test_native_indicators_match_pandas_ta(make_ohlcv):
+    # pandas_ta delegates RSI, ATR and ROC to TA-Lib when it is installed, which is what the Docker image runs
+    ta = pytest.importorskip('pandas_ta')
+    pytest.importorskip('talib')
+    df = with_flat_bars(make_ohlcv())
+    np.testing.assert_allclose(calculate_rsi(df, 14)['indicator_value'], ta.rsi(df['close'], length=14), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(calculate_atr(df, 14)['indicator_value'], ta.atr(df['high'], df['low'], df['close'], length=14), rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(calculate_roc(df, 10)['indicator_value'], ta.roc(df['close'], length=10), rtol=1e-9, equal_nan=True)
+    supertrend = ta.supertrend(high=df['high'], low=df['low'], close=df['close'], length=10, multiplier=3.0)['SUPERT_10_3.0']
+    np.testing.assert_allclose(calculate_supertrend(df, atr_multiplier=3.0, length=10)['indicator_value'], supertrend, rtol=1e-9, equal_nan=True)
+
+def test_short_history_is_nan(make_ohlcv):
+    df = make_ohlcv(10)
+    assert calculate_rsi(df, 14)['indicator_value'].isna().all()
+    assert calculate_atr(df, 14)['indicator_value'].isna().all()
+    assert calculate_supertrend(df, atr_multiplier=3.0, length=14)['indicator_value'].iloc[1:].isna().all()
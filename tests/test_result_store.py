@@ -0,0 +1,116 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import backtest_engine.result_store as result_store
+from backtest_engine.result_store import ResultStore
+
+def make_record(backtest_id, sharpe_ratio, fast_ema_period=10):
+    return {
+        'backtest_id': backtest_id,
+        'created_at': pd.Timestamp('2025-01-01'),
+        'strategy_name': 'EMA Crossover Strategy',
+        'market_name': 'crypto_binance',
+        'symbol_list': ['BTC/USDT', 'ETH/USDT'],
+        'pair': 'USDT',
+        'timeframe': '1d',
+        'strategy_type': 'multi',
+        'start_date': pd.Timestamp('2024-01-01'),
+        'end_date': pd.Timestamp('2024-03-01'),
+        'init_cash': 1000.0,
+        'fees': 0.001,
+        'slippage': 0.0,
+        'size': 0.1,
+        'cash_sharing': True,
+        'allow_partial': False,
+        'strategy_params': {'fast_ema_period': fast_ema_period, 'slow_ema_period': 50},
+        'total_return': sharpe_ratio / 10,
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sharpe_ratio * 1.5,
+        'max_drawdown': -0.1,
+        'duration_days': 60,
+    }
+
+def make_value(periods=60):
+    index = pd.date_range('2024-01-01', periods=periods, freq='D')
+    return pd.Series(1000.0 * np.cumprod(1 + np.linspace(-0.01, 0.02, periods)), index=index)
+
+def test_catalog_lists_filters_and_loads_lazily(tmp_path):
+    store = ResultStore(tmp_path)
+    assert store.list().empty
+    trades = pd.DataFrame({'Column': ['BTC/USDT'], 'PnL': [12.5]})
+    for position, sharpe_ratio in enumerate([0.5, 2.0, 1.2]):
+        store.save(make_record(f'bt_{position}', sharpe_ratio, fast_ema_period=5 * (position + 1)), make_value(),
+                   trades=trades, stats=pd.Series({'Sharpe Ratio': np.float64(sharpe_ratio), 'Period': pd.Timedelta(days=60)}))
+
+    listed = store.list(where="sharpe_ratio > ?", params=[1.0], order_by='sharpe_ratio DESC')
+    assert list(listed['backtest_id']) == ['bt_1', 'bt_2']
+    assert list(store.list(where="strategy_params->>'fast_ema_period' = '15'")['backtest_id']) == ['bt_2']
+
+    params = store.params('bt_1')
+    assert params['symbol_list'] == ['BTC/USDT', 'ETH/USDT']
+    assert params['strategy_params'] == {'fast_ema_period': 10, 'slow_ema_period': 50}
+    assert params['performance']['sharpe_ratio'] == 2.0
+    assert params['start_date'] == '2024-01-01T00:00:00'
+
+    # Saving under the same id replaces the catalog row
+    store.save(make_record('bt_1', 3.0), make_value())
+    assert len(store.list()) == 3
+    assert store.params('bt_1')['performance']['sharpe_ratio'] == 3.0
+
+    backtest = store.load('bt_0')
+    assert backtest._value is None and backtest._trades is None
+    pd.testing.assert_series_equal(backtest.value, make_value(), check_names=False, check_freq=False, check_index_type=False)
+    assert backtest.returns.iloc[0] == backtest.value.iloc[0] / 1000.0 - 1
+    assert np.isclose(backtest.cumulative_returns.iloc[-1], backtest.value.iloc[-1] / 1000.0 - 1)
+    assert backtest.trades['PnL'].tolist() == [12.5]
+    assert backtest.orders.empty
+    assert backtest.stats()['Sharpe Ratio'] == 0.5
+    assert not backtest.has_portfolio
+
+def test_catalog_compacts_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_store, 'COMPACT_SEGMENTS', 4)
+    store = ResultStore(tmp_path)
+    for position in range(6):
+        store.save(make_record(f'bt_{position}', float(position)), make_value(periods=5))
+
+    assert len(result_store._list_segments(store.catalog_path)) == 2
+    assert list(store.list(order_by='backtest_id')['backtest_id']) == [f'bt_{position}' for position in range(6)]
+
+def write_legacy_backtest(results_dir, backtest_id, sharpe_ratio=1.0):
+    legacy_dir = results_dir / backtest_id
+    legacy_dir.mkdir()
+    record = make_record(backtest_id, sharpe_ratio)
+    params = {key: value for key, value in record.items() if key not in ('total_return', 'sharpe_ratio', 'sortino_ratio', 'max_drawdown', 'duration_days')}
+    params['performance'] = {'returns': 0.1, 'sharpe_ratio': sharpe_ratio, 'max_drawdown': -0.1, 'duration_days': 60}
+    with open(legacy_dir / 'params.json', 'w') as f:
+        json.dump(params, f, default=str)
+
+def test_legacy_backtests_are_indexed(tmp_path):
+    write_legacy_backtest(tmp_path, 'old_backtest')
+    store = ResultStore(tmp_path)
+
+    # Listed without calling index_legacy, the first listing builds the catalog
+    assert list(store.list()['backtest_id']) == ['old_backtest']
+    assert store.index_legacy() == []
+    assert store.params('old_backtest')['performance']['sharpe_ratio'] == 1.0
+    assert store.params('old_backtest')['strategy_params'] == {'fast_ema_period': 10, 'slow_ema_period': 50}
+
+    # A legacy directory added once the catalog exists is found by id and indexed then
+    write_legacy_backtest(tmp_path, 'copied_backtest', sharpe_ratio=2.0)
+    assert store.params('copied_backtest')['performance']['sharpe_ratio'] == 2.0
+    assert sorted(store.list()['backtest_id']) == ['copied_backtest', 'old_backtest']
+    with pytest.raises(FileNotFoundError):
+        store.params('missing_backtest')
+
+def test_backtester_lists_legacy_backtests(tmp_path, monkeypatch):
+    pytest.importorskip('vectorbt')
+    from backtest_engine.backtester import Backtester
+    monkeypatch.setattr(Backtester, 'BACKTEST_DIR', tmp_path)
+    write_legacy_backtest(tmp_path, 'old_backtest')
+
+    backtests = Backtester.list_backtests()
+    assert list(backtests) == ['old_backtest']
+    assert backtests['old_backtest']['symbol_list'] == ['BTC/USDT', 'ETH/USDT']
+    _, params = Backtester.load_backtest('old_backtest')
+    assert params['performance']['sharpe_ratio'] == 1.0
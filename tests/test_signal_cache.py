@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from backtest_engine.signal_cache import SignalCache, signal_fingerprint, encode_signals, decode_signals
+from strategy.public.EmaStrat import EMAStrategy
+
+def make_signals(periods=50, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=periods, freq='h', name='timestamp')
+    columns = pd.Index(['BTC/USDT', 'ETH/USDT', 'SOL/USDT'], name='symbol')
+    entries = pd.DataFrame(rng.random((periods, 3)) > 0.8, index=index, columns=columns)
+    exits = pd.DataFrame(rng.random((periods, 3)) > 0.8, index=index, columns=columns)
+    close_data = pd.DataFrame(100 + rng.normal(0, 1, (periods, 3)).cumsum(axis=0), index=index, columns=columns)
+    open_data = close_data.shift(1)
+    return entries, exits, close_data, open_data
+
+def test_signals_round_trip_as_bitsets():
+    signals = make_signals()
+    blob = encode_signals(signals)
+    # Boolean frames take a bit per value
+    assert len(blob) < signals[0].size * 2 + signals[2].size * 16 + 4096
+
+    decoded = decode_signals(blob)
+    for original, restored in zip(signals, decoded):
+        pd.testing.assert_frame_equal(original, restored)
+    assert decoded[0].dtypes.eq(bool).all()
+
+def test_fingerprint_changes_with_strategy_params_and_data():
+    data_versions = {'BTC/USDT': 'a', 'ETH/USDT': 'b'}
+    key = signal_fingerprint(EMAStrategy(fast_ema_period=10, slow_ema_period=50), ['BTC/USDT', 'ETH/USDT'], data_versions, None, '2024-06-01')
+
+    assert key == signal_fingerprint(EMAStrategy(fast_ema_period=10, slow_ema_period=50), ['BTC/USDT', 'ETH/USDT'], dict(data_versions), None, '2024-06-01')
+    assert key != signal_fingerprint(EMAStrategy(fast_ema_period=12, slow_ema_period=50), ['BTC/USDT', 'ETH/USDT'], data_versions, None, '2024-06-01')
+    assert key != signal_fingerprint(EMAStrategy(fast_ema_period=10, slow_ema_period=50), ['BTC/USDT', 'ETH/USDT'], {**data_versions, 'ETH/USDT': 'c'}, None, '2024-06-01')
+    assert key != signal_fingerprint(EMAStrategy(fast_ema_period=10, slow_ema_period=50), ['BTC/USDT'], data_versions, None, '2024-06-01')
+    assert key != signal_fingerprint(EMAStrategy(fast_ema_period=10, slow_ema_period=50), ['BTC/USDT', 'ETH/USDT'], data_versions, None, '2024-07-01')
+
+def test_signal_cache_evicts_least_recently_used(tmp_path):
+    signal_cache = SignalCache(str(tmp_path), size_limit=500_000)
+    assert signal_cache.get('missing') is None
+
+    signal_cache.set('first', make_signals(seed=1))
+    pd.testing.assert_frame_equal(signal_cache.get('first')[2], make_signals(seed=1)[2])
+    # Past the size limit, older entries make room for new ones
+    for seed in range(2, 20):
+        signal_cache.set(f'key_{seed}', make_signals(periods=2000, seed=seed))
+    assert signal_cache.get('first') is None
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.calculation.slope_r2 import (
+    calculate_slope_r2,
+    calculate_slope_r2_rolling,
+    calculate_slope_r2_rolling_multi,
+    calculate_slope_r2_batch,
+    calculate_exponential_regression_optimized,
+    calculate_exponential_regression_multi,
+)
+
+def reference_slope_r2_rolling(log_close, window):
+    # The previous O(n * window) implementation: a full least squares fit per window
+    n = len(log_close)
+    slopes = np.zeros(n)
+    r2_values = np.zeros(n)
+    for i in range(window - 1, n):
+        slopes[i], r2_values[i] = calculate_slope_r2(np.arange(window), log_close[i - window + 1:i + 1])
+    return slopes, r2_values
+
+def make_log_close(periods=2500, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.log(100.0 * np.exp(rng.normal(0.0005, 0.02, periods).cumsum()))
+
+@pytest.mark.parametrize('window', [2, 15, 30, 90])
+def test_rolling_slope_r2_matches_reference(window):
+    log_close = make_log_close()
+    slopes, r2_values = calculate_slope_r2_rolling(log_close, window)
+    expected_slopes, expected_r2 = reference_slope_r2_rolling(log_close, window)
+    np.testing.assert_allclose(slopes, expected_slopes, rtol=1e-7, atol=1e-12)
+    np.testing.assert_allclose(r2_values, expected_r2, rtol=1e-7, atol=1e-10)
+
+def test_rolling_slope_r2_edge_cases():
+    log_close = make_log_close(200)
+    # Shorter than the window: all zeros, like before
+    slopes, r2_values = calculate_slope_r2_rolling(log_close[:10], 30)
+    assert not slopes.any() and not r2_values.any()
+
+    # A missing price only affects the windows containing it
+    with_gap = log_close.copy()
+    with_gap[100] = np.nan
+    slopes, _ = calculate_slope_r2_rolling(with_gap, 30)
+    assert np.isnan(slopes[100:130]).all()
+    expected_slopes, _ = reference_slope_r2_rolling(log_close, 30)
+    np.testing.assert_allclose(slopes[130:], expected_slopes[130:], rtol=1e-7, atol=1e-12)
+    np.testing.assert_allclose(slopes[:100], expected_slopes[:100], rtol=1e-7, atol=1e-12)
+
+    # Flat prices have no R² instead of raising ZeroDivisionError
+    _, r2_values = calculate_slope_r2_rolling(np.full(50, np.log(100.0)), 30)
+    assert np.isnan(r2_values[29:]).all()
+
+def test_multi_window_and_batch_match_single_window():
+    windows = np.array([90, 30, 15])
+    log_close = make_log_close()
+    slopes, r2_values = calculate_slope_r2_rolling_multi(log_close, windows)
+    for w, window in enumerate(windows):
+        expected_slopes, expected_r2 = calculate_slope_r2_rolling(log_close, window)
+        np.testing.assert_array_equal(slopes[w], expected_slopes)
+        np.testing.assert_array_equal(r2_values[w], expected_r2)
+
+    # Second symbol listed 500 bars later
+    panel = np.column_stack([log_close, np.concatenate([np.full(500, np.nan), make_log_close(2000, seed=1)])])
+    batch_slopes, batch_r2 = calculate_slope_r2_batch(panel, windows)
+    for column in range(panel.shape[1]):
+        first = 0 if column == 0 else 500
+        for w, window in enumerate(windows):
+            expected_slopes, expected_r2 = calculate_slope_r2_rolling(panel[first:, column], window)
+            np.testing.assert_array_equal(batch_slopes[w, first + window - 1:, column], expected_slopes[window - 1:])
+            np.testing.assert_array_equal(batch_r2[w, first + window - 1:, column], expected_r2[window - 1:])
+            assert np.isnan(batch_slopes[w, :first + window - 1, column]).all()
+
+def test_exponential_regression_multi_matches_single_window():
+    log_close = make_log_close(300)
+    df = pd.DataFrame({'timestamp': pd.date_range('2020-01-01', periods=300, freq='D'), 'close': np.exp(log_close)})
+    result = calculate_exponential_regression_multi(df, windows=(90, 30, 15))
+    expected = pd.concat([calculate_exponential_regression_optimized(df, window=window) for window in (90, 30, 15)], ignore_index=True)
+    pd.testing.assert_frame_equal(result, expected)
+
+def test_exponential_regression_matches_sklearn():
+    pytest.importorskip('sklearn')
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import r2_score
+    from utils.calculation.indicators import calculate_exponential_regression
+
+    # Business days, so x (days since the window's first bar) is not a fixed grid
+    timestamps = pd.bdate_range('2020-01-01', periods=150)
+    df = pd.DataFrame({'timestamp': timestamps, 'close': np.exp(make_log_close(150))})
+    window = 30
+    expected = np.full(len(df), np.nan)
+    for end in range(window, len(df) + 1):
+        subset = df.iloc[end - window:end]
+        X = (subset['timestamp'] - subset['timestamp'].min()).dt.days.values.reshape(-1, 1)
+        y = np.log(subset['close'].values)
+        reg = LinearRegression().fit(X, y)
+        expected[end - 1] = reg.coef_[0] * r2_score(y, reg.predict(X))
+
+    result = calculate_exponential_regression(df, window=window)['indicator_value'].to_numpy()
+    np.testing.assert_allclose(result, expected, rtol=1e-7, atol=1e-12)
+
+def test_exponential_regression_intraday_uses_fractional_days():
+    from utils.calculation.indicators import calculate_exponential_regression
+
+    # Hourly bars with a missing stretch, x is the time in days since the window's first bar
+    timestamps = pd.date_range('2020-01-01', periods=200, freq='h').delete(range(60, 75))
+    df = pd.DataFrame({'timestamp': timestamps, 'close': np.exp(make_log_close(len(timestamps)))})
+    window = 48
+    expected = np.full(len(df), np.nan)
+    for end in range(window, len(df) + 1):
+        subset = df.iloc[end - window:end]
+        x = ((subset['timestamp'] - subset['timestamp'].iloc[0]) / pd.Timedelta(days=1)).to_numpy()
+        y = np.log(subset['close'].to_numpy())
+        slope, intercept = np.polyfit(x, y, 1)
+        r2 = 1 - ((y - (slope * x + intercept)) ** 2).sum() / ((y - y.mean()) ** 2).sum()
+        expected[end - 1] = slope * r2
+
+    result = calculate_exponential_regression(df, window=window)['indicator_value'].to_numpy()
+    np.testing.assert_allclose(result, expected, rtol=1e-7, atol=1e-12)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.calculation.optimized_indicators import (
+    spike_signal,
+    large_gap_signal,
+    calculate_spike_optimized,
+    detect_large_gap_optimized,
+    calculate_spike_numba,
+    detect_large_gap_numba,
+)
+
+def reference_spike(df, lookback_period, spike_threshold):
+    # The previous pandas implementation of indicators.calculate_spike
+    spikes = pd.Series(0, index=df.index)
+    for i in range(lookback_period, len(df)):
+        window = df.iloc[i-lookback_period:i]
+        if any((window['close'] - window['open']) / window['open'] >= spike_threshold):
+            spikes.iloc[i] = 1
+        elif any((window['high'] - window['low']) / window['low'] >= spike_threshold*2):
+            spikes.iloc[i] = 1
+    return spikes.to_numpy(dtype=np.float64)
+
+def reference_gap(df, lookback_period, gap_threshold):
+    # The previous pandas implementation of indicators.detect_large_gap
+    gaps = pd.Series(0, index=df.index)
+    for i in range(1, len(df)):
+        if i >= lookback_period:
+            window = df.iloc[i-lookback_period:i+1]
+            gap = (window['open'] - window['close'].shift(1)) / window['close'].shift(1)
+            if any(gap >= gap_threshold) or any(gap <= -gap_threshold):
+                gaps.iloc[i] = 1
+    return gaps.to_numpy(dtype=np.float64)
+
+# Volatile bars with large gaps, so both signals fire
+VOLATILE = {'periods': 400, 'volatility': 0.04, 'gap': 0.05, 'wick': 0.05}
+
+def with_missing_bar(df):
+    # A missing bar never counts as a spike or a gap
+    df.loc[50, ['open', 'high', 'low', 'close']] = np.nan
+    return df
+
+@pytest.mark.parametrize('lookback_period', [0, 1, 5, 30, 90, 500])
+def test_spike_and_gap_match_reference(make_ohlcv, lookback_period):
+    df = with_missing_bar(make_ohlcv(**VOLATILE))
+    spikes = calculate_spike_optimized(df, lookback_period, 0.1)
+    gaps = detect_large_gap_optimized(df, lookback_period, 0.08)
+    assert spikes['indicator_name'].iloc[0] == f'spike_{lookback_period}_0.1'
+    np.testing.assert_array_equal(spikes['indicator_value'].to_numpy(), reference_spike(df, lookback_period, 0.1))
+    np.testing.assert_array_equal(gaps['indicator_value'].to_numpy(), reference_gap(df, lookback_period, 0.08))
+
+def test_batch_matches_per_symbol(make_ohlcv):
+    frames = [with_missing_bar(make_ohlcv(seed=seed, **VOLATILE)) for seed in range(4)]
+    stacked = {column: np.column_stack([df[column].to_numpy() for df in frames]) for column in ['open', 'high', 'low', 'close']}
+    spikes = spike_signal(stacked['open'], stacked['close'], stacked['high'], stacked['low'], 30, 0.1)
+    gaps = large_gap_signal(stacked['open'], stacked['close'], 30, 0.08)
+    for k, df in enumerate(frames):
+        np.testing.assert_array_equal(spikes[:, k], spike_signal(df['open'], df['close'], df['high'], df['low'], 30, 0.1))
+        np.testing.assert_array_equal(gaps[:, k], large_gap_signal(df['open'], df['close'], 30, 0.08))
+
+def test_numba_kernels_are_deprecated(make_ohlcv):
+    df = with_missing_bar(make_ohlcv(**VOLATILE))
+    with pytest.warns(DeprecationWarning):
+        spikes = calculate_spike_numba(df['open'].values, df['close'].values, df['high'].values, df['low'].values, 30, 0.1)
+    with pytest.warns(DeprecationWarning):
+        gaps = detect_large_gap_numba(df['open'].values, df['close'].values, 30, 0.08)
+    np.testing.assert_array_equal(spikes, reference_spike(df, 30, 0.1))
+    np.testing.assert_array_equal(gaps, reference_gap(df, 30, 0.08))
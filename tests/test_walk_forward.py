@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from system.walk_forward import walk_forward_folds, stitch_returns, _sharpe_ratio
+
+def test_rolling_folds_tile_the_test_range():
+    index = pd.date_range('2020-01-01', '2023-12-31', freq='D')
+    folds = walk_forward_folds(index, '730D', '365D')
+
+    assert [fold['test_start'] for fold in folds] == [pd.Timestamp('2021-12-31'), pd.Timestamp('2022-12-31'), pd.Timestamp('2023-12-31')]
+    for fold in folds:
+        assert fold['train_end'] == fold['test_start']
+        assert fold['train_end'] - fold['train_start'] == pd.Timedelta('730D')
+    # Consecutive test windows, the last one cut at the end of the data
+    for previous, fold in zip(folds, folds[1:]):
+        assert previous['test_end'] == fold['test_start']
+    assert folds[-1]['test_end'] > index[-1] > folds[-1]['test_start'] - pd.Timedelta('1D')
+
+def test_anchored_folds_grow_from_the_first_bar():
+    index = pd.date_range('2020-01-01', periods=100, freq='h')
+    folds = walk_forward_folds(index, pd.Timedelta(hours=48), '24h', anchored=True, step='12h')
+
+    assert all(fold['train_start'] == index[0] for fold in folds)
+    assert [fold['train_end'] - index[0] for fold in folds[:3]] == [pd.Timedelta(hours=hours) for hours in (48, 60, 72)]
+    # Test windows overlap when the step is shorter than the test period
+    assert folds[0]['test_end'] > folds[1]['test_start']
+    assert walk_forward_folds(index, '200h', '24h') == []
+
+def make_fold_result(test_start, periods, value):
+    index = pd.date_range(test_start, periods=periods, freq='D')
+    return {'test_start': index[0], 'returns': pd.Series(value, index=index)}
+
+def test_stitch_returns_counts_overlapping_bars_once():
+    # Test windows of 10 days every 5 days overlap by 5 days, given out of order as folds finish
+    results = [make_fold_result('2022-01-06', 10, 0.02), make_fold_result('2022-01-01', 10, 0.01), make_fold_result('2022-01-11', 10, 0.03)]
+    returns = stitch_returns(results)
+
+    assert returns.index.is_unique and returns.index.is_monotonic_increasing
+    assert len(returns) == 20
+    # Each bar comes from the latest fold covering it
+    assert (returns['2022-01-01':'2022-01-05'] == 0.01).all()
+    assert (returns['2022-01-06':'2022-01-10'] == 0.02).all()
+    assert (returns['2022-01-11':'2022-01-20'] == 0.03).all()
+    assert np.isclose((1 + returns).prod(), 1.01 ** 5 * 1.02 ** 5 * 1.03 ** 10)
+    assert stitch_returns([]).empty
+
+def test_sharpe_ratio_annualizes_with_bar_length():
+    index = pd.date_range('2022-01-01', periods=4, freq='D')
+    returns = pd.Series([0.01, -0.01, 0.02, 0.0], index=index)
+    expected = returns.mean() / returns.std() * np.sqrt(365)
+    assert np.isclose(_sharpe_ratio(returns), expected)
+    # Hourly bars: 24 times more bars per year
+    assert np.isclose(_sharpe_ratio(returns.set_axis(pd.date_range('2022-01-01', periods=4, freq='h'))), expected * np.sqrt(24))
+    assert np.isnan(_sharpe_ratio(pd.Series([0.01, 0.01], index=index[:2])))
@@ -0,0 +1,290 @@
+import numpy as np
+from numba import njit, prange
+from utils.calculation.slope_r2 import rolling_slope_r2_nb
+
+# Cross-sectional versions of the per-symbol indicators for (time x symbol) float arrays, e.g. the fields of a
+# Finstore Panel. A panel on the union of the symbols' timestamps has NaN rows where a symbol has no bar (before
+# its listing, or a missing bar), so each column is calculated on its non-NaN closes only, like the per-symbol
+# function on the DataFrame of that symbol's bars, scattered back to their rows, and is NaN on the others.
+# Columns are processed in parallel, and nothing is wrapped in result_df_decorator, so there is no long DataFrame per symbol.
+
+@njit
+def valid_rows_nb(values):
+    """Row numbers of the non-NaN values of a column."""
+    return np.flatnonzero(values == values)
+
+@njit
+def take_nb(values, rows, column):
+    """values[rows, column] as a contiguous 1-D array."""
+    out = np.empty(rows.shape[0])
+    for i in range(rows.shape[0]):
+        out[i] = values[rows[i], column]
+    return out
+
+@njit
+def put_nb(out, rows, column, result):
+    """out[rows, column] = result"""
+    for i in range(rows.shape[0]):
+        out[rows[i], column] = result[i]
+
+@njit
+def ewm_mean_nb(values, com, adjust, minp):
+    """
+    pandas ewm(com=com, adjust=adjust, min_periods=minp, ignore_na=False).mean(), same operations in the same order.
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+    alpha = 1. / (1. + com)
+    old_wt_factor = 1. - alpha
+    new_wt = 1. if adjust else alpha
+    minp = max(minp, 1)
+    weighted = values[0]
+    nobs = int(weighted == weighted)
+    if nobs >= minp:
+        out[0] = weighted
+    old_wt = 1.
+    for i in range(1, n):
+        cur = values[i]
+        is_observation = cur == cur
+        nobs += is_observation
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = ((old_wt * weighted) + (new_wt * cur)) / (old_wt + new_wt)
+                if adjust:
+                    old_wt += new_wt
+                else:
+                    old_wt = 1.
+        elif is_observation:
+            weighted = cur
+        if nobs >= minp:
+            out[i] = weighted
+    return out
+
+@njit
+def ema_nb(close, length):
+    """calculate_ema: close.ewm(span=length, adjust=False).mean()"""
+    return ewm_mean_nb(close, (length - 1) / 2., False, 0)
+
+@njit
+def rsi_nb(close, length):
+    """
+    calculate_rsi: Wilder's RSI as computed by TA-Lib (used by pandas_ta when installed). The first average gain / loss
+    is the mean of the first length changes, then average = (average * (length - 1) + change) / length.
+    NaN for the first length bars, 0 when both averages are 0.
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    if n <= length:
+        return out
+    avg_gain = 0.
+    avg_loss = 0.
+    for i in range(1, length + 1):
+        change = close[i] - close[i - 1]
+        if change < 0:
+            avg_loss -= change
+        else:
+            avg_gain += change
+    avg_gain /= length
+    avg_loss /= length
+    for i in range(length, n):
+        if i > length:
+            change = close[i] - close[i - 1]
+            avg_gain *= (length - 1)
+            avg_loss *= (length - 1)
+            if change < 0:
+                avg_loss -= change
+            else:
+                avg_gain += change
+            avg_gain /= length
+            avg_loss /= length
+        total = avg_gain + avg_loss
+        out[i] = 0. if -1e-14 < total < 1e-14 else 100. * (avg_gain / total)
+    return out
+
+@njit
+def final_bands_trend_nb(close, upper, lower):
+    """get_final_bands_nb trend: the lower band while the trend is up, the upper band while it is down. NaN on the first bar."""
+    n = close.shape[0]
+    trend = np.full(n, np.nan)
+    direction = 1
+    for i in range(1, n):
+        if close[i] > upper[i - 1]:
+            direction = 1
+        elif close[i] < lower[i - 1]:
+            direction = -1
+        else:
+            if direction > 0 and lower[i] < lower[i - 1]:
+                lower[i] = lower[i - 1]
+            if direction < 0 and upper[i] > upper[i - 1]:
+                upper[i] = upper[i - 1]
+        trend[i] = lower[i] if direction > 0 else upper[i]
+    return trend
+
+@njit
+def wilder_atr_nb(high, low, close, length):
+    """
+    calculate_atr: TA-Lib ATR (used by pandas_ta when installed). The first value, at bar length, is the mean of the
+    first length true ranges, then atr = (atr * (length - 1) + true range) / length.
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    if n <= length:
+        return out
+    tr = np.empty(n)
+    for i in range(1, n):
+        # Same comparisons as TA-Lib TRANGE, so NaNs propagate the same way
+        greatest = high[i] - low[i]
+        value = np.abs(close[i - 1] - high[i])
+        if value > greatest:
+            greatest = value
+        value = np.abs(close[i - 1] - low[i])
+        if value > greatest:
+            greatest = value
+        tr[i] = greatest
+    atr = 0.
+    for i in range(1, length + 1):
+        atr += tr[i]
+    atr /= length
+    out[length] = atr
+    for i in range(length + 1, n):
+        atr *= length - 1
+        atr += tr[i]
+        atr /= length
+        out[i] = atr
+    return out
+
+@njit
+def wilder_supertrend_nb(high, low, close, length, multiplier):
+    """
+    calculate_supertrend: pandas_ta supertrend, the final bands of (high + low) / 2 +- multiplier * wilder_atr_nb.
+    Like pandas_ta the first bar is 0 and the bars before the first ATR are NaN.
+    """
+    atr = wilder_atr_nb(high, low, close, length)
+    upper = (high + low) / 2 + multiplier * atr
+    lower = (high + low) / 2 - multiplier * atr
+    trend = final_bands_trend_nb(close, upper, lower)
+    if trend.shape[0] > 0:
+        trend[0] = 0.
+    return trend
+
+@njit
+def roc_nb(close, length):
+    """calculate_roc: TA-Lib ROC, (close / close length bars ago - 1) * 100, 0 if the earlier close is 0."""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    for i in range(length, n):
+        previous = close[i - length]
+        out[i] = ((close[i] / previous) - 1.) * 100. if previous != 0. else 0.
+    return out
+
+@njit
+def rolling_mean_nb(values, window):
+    """
+    Rolling mean with min_periods=window: NaN for the first window - 1 bars and for windows containing a NaN.
+    The running sum is recomputed every window bars so rounding errors do not accumulate.
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if window <= 0:
+        return out
+    running_sum = 0.
+    nan_count = 0
+    for i in range(n):
+        current = values[i]
+        if current != current:
+            nan_count += 1
+        if i >= window and values[i - window] != values[i - window]:
+            nan_count -= 1
+        if (i + 1) % window == 0:
+            # Exact sum of the window ending at i
+            running_sum = 0.
+            for j in range(i - window + 1, i + 1):
+                if values[j] == values[j]:
+                    running_sum += values[j]
+        else:
+            if current == current:
+                running_sum += current
+            if i >= window and values[i - window] == values[i - window]:
+                running_sum -= values[i - window]
+        if i >= window - 1 and nan_count == 0:
+            out[i] = running_sum / window
+    return out
+
+
+@njit(parallel=True)
+def ema_batch(close, length):
+    """
+    EMA of every column of a (time x symbol) array.
+
+    Args:
+        close (np.ndarray): 2-D float array, NaN where a symbol has no bar.
+        length (int): EMA span.
+
+    Returns:
+        np.ndarray: 2-D array shaped like close.
+    """
+    out = np.full(close.shape, np.nan)
+    for column in prange(close.shape[1]):
+        rows = valid_rows_nb(close[:, column])
+        put_nb(out, rows, column, ema_nb(take_nb(close, rows, column), length))
+    return out
+
+@njit(parallel=True)
+def rsi_batch(close, length):
+    """Wilder's RSI (calculate_rsi) of every column of a (time x symbol) array, see ema_batch."""
+    out = np.full(close.shape, np.nan)
+    for column in prange(close.shape[1]):
+        rows = valid_rows_nb(close[:, column])
+        put_nb(out, rows, column, rsi_nb(take_nb(close, rows, column), length))
+    return out
+
+@njit(parallel=True)
+def atr_batch(high, low, close, length):
+    """TA-Lib ATR (calculate_atr) of every column of (time x symbol) high / low / close arrays, on the rows of their non-NaN closes."""
+    out = np.full(close.shape, np.nan)
+    for column in prange(close.shape[1]):
+        rows = valid_rows_nb(close[:, column])
+        put_nb(out, rows, column, wilder_atr_nb(take_nb(high, rows, column), take_nb(low, rows, column), take_nb(close, rows, column), length))
+    return out
+
+@njit(parallel=True)
+def supertrend_batch(high, low, close, length, multiplier):
+    """pandas_ta supertrend (calculate_supertrend) of every column of (time x symbol) high / low / close arrays, on the rows of their non-NaN closes."""
+    out = np.full(close.shape, np.nan)
+    for column in prange(close.shape[1]):
+        rows = valid_rows_nb(close[:, column])
+        put_nb(out, rows, column, wilder_supertrend_nb(take_nb(high, rows, column), take_nb(low, rows, column), take_nb(close, rows, column), length, multiplier))
+    return out
+
+@njit(parallel=True)
+def roc_batch(close, length):
+    """Rate of change (%) of every column of a (time x symbol) array, see ema_batch."""
+    out = np.full(close.shape, np.nan)
+    for column in prange(close.shape[1]):
+        rows = valid_rows_nb(close[:, column])
+        put_nb(out, rows, column, roc_nb(take_nb(close, rows, column), length))
+    return out
+
+@njit(parallel=True)
+def average_volume_batch(close, volume, lookback_period):
+    """Rolling mean of close * volume (calculate_average_volume) of every column of (time x symbol) arrays."""
+    out = np.full(close.shape, np.nan)
+    for column in prange(close.shape[1]):
+        rows = valid_rows_nb(close[:, column])
+        put_nb(out, rows, column, rolling_mean_nb(take_nb(close, rows, column) * take_nb(volume, rows, column), lookback_period))
+    return out
+
+@njit(parallel=True)
+def slope_r2_batch(close, window):
+    """Slope x R² of log(close) against the bar number (calculate_exponential_regression_optimized) of every column."""
+    out = np.full(close.shape, np.nan)
+    for column in prange(close.shape[1]):
+        rows = valid_rows_nb(close[:, column])
+        log_close = np.log(take_nb(close, rows, column))
+        slopes, r2_values = rolling_slope_r2_nb(np.arange(log_close.shape[0]).astype(np.float64), log_close, window, np.nan)
+        put_nb(out, rows, column, slopes * r2_values)
+    return out
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+from numba import njit
+
+# Stateful versions of the indicators that only depend on a fixed amount of history (EMA, ATR / supertrend bands,
+# rolling average volume). Each update function takes the new bars and the state returned by the previous update
+# (None for the first call) and returns the indicator values of the new bars plus the new state, so appending bars
+# costs O(new bars) and gives exactly the values of a full recompute.
+# States are plain dicts of floats / ints / lists so they can be persisted as json (see Finstore.Write.update_indicators).
+
+@njit
+def ewm_mean_state_nb(values, span, mean, old_wt, nobs, minp):
+    """
+    pandas / vectorbt ewm mean (adjust=False, ignore_na=False), continued from (mean, old_wt, nobs).
+    Same operations in the same order as pandas' ewm, so the results are bit-identical to a full recompute.
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    com = (span - 1) / 2.0
+    alpha = 1. / (1. + com)
+    old_wt_factor = 1. - alpha
+    new_wt = alpha
+    for i in range(n):
+        cur = values[i]
+        is_observation = cur == cur
+        nobs += is_observation
+        if mean == mean:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if mean != cur:
+                    mean = ((old_wt * mean) + (new_wt * cur)) / (old_wt + new_wt)
+                old_wt = 1.
+        elif is_observation:
+            mean = cur
+        out[i] = mean if nobs >= minp else np.nan
+    return out, mean, old_wt, nobs
+
+@njit
+def true_range_state_nb(high, low, close, prev_close):
+    n = close.shape[0]
+    tr = np.empty(n)
+    for i in range(n):
+        tr0 = np.abs(high[i] - low[i])
+        tr1 = np.abs(high[i] - prev_close)
+        tr2 = np.abs(low[i] - prev_close)
+        # Like np.max over the stacked columns: NaN if any range is NaN (first bar has no previous close)
+        if tr0 != tr0 or tr1 != tr1 or tr2 != tr2:
+            tr[i] = np.nan
+        else:
+            tr[i] = max(tr0, tr1, tr2)
+        prev_close = close[i]
+    return tr, prev_close
+
+@njit
+def final_bands_state_nb(close, upper, lower, prev_upper, prev_lower, prev_dir, count):
+    """
+    get_final_bands_nb continued from the previous bar's (adjusted) bands and direction.
+    """
+    n = close.shape[0]
+    trend = np.full(n, np.nan)
+    for i in range(n):
+        if count == 0:
+            # First bar of the series: no trend yet, direction starts long
+            prev_dir = 1
+        else:
+            if close[i] > prev_upper:
+                direction = 1
+            elif close[i] < prev_lower:
+                direction = -1
+            else:
+                direction = prev_dir
+                if direction > 0 and lower[i] < prev_lower:
+                    lower[i] = prev_lower
+                if direction < 0 and upper[i] > prev_upper:
+                    upper[i] = prev_upper
+            trend[i] = lower[i] if direction > 0 else upper[i]
+            prev_dir = direction
+        prev_upper = upper[i]
+        prev_lower = lower[i]
+        count += 1
+    return trend, prev_upper, prev_lower, prev_dir, count
+
+@njit
+def rolling_mean_state_nb(tail, values, lookback_period):
+    """
+    Rolling mean over lookback_period values, where tail holds the last lookback_period - 1 values before this update.
+    Each window is summed like calculate_average_volume_numba so the results match it exactly.
+    """
+    buffer = np.concatenate((tail, values))
+    offset = tail.shape[0]
+    out = np.full(values.shape[0], np.nan)
+    for i in range(values.shape[0]):
+        end = offset + i + 1
+        if end >= lookback_period:
+            out[i] = np.sum(buffer[end - lookback_period:end]) / lookback_period
+    return out, buffer[max(0, buffer.shape[0] - (lookback_period - 1)):]
+
+
+def ema_update(df, state=None, length=20):
+    """
+    Stateful calculate_ema: close.ewm(span=length, adjust=False).mean().
+
+    Returns:
+        tuple: (np.ndarray of EMA values for the rows of df, new state)
+    """
+    state = state or {'mean': np.nan, 'old_wt': 1.0, 'nobs': 0}
+    values, mean, old_wt, nobs = ewm_mean_state_nb(df['close'].to_numpy(dtype=np.float64), float(length), state['mean'], state['old_wt'], state['nobs'], 1)
+    return values, {'mean': float(mean), 'old_wt': float(old_wt), 'nobs': int(nobs)}
+
+def atr_update(df, state=None, period=14):
+    """
+    Stateful get_atr_np: Wilder's moving average (vectorbt wwm_mean_1d_nb) of the true range.
+
+    Returns:
+        tuple: (np.ndarray of ATR values for the rows of df, new state)
+    """
+    state = state or {'prev_close': np.nan, 'mean': np.nan, 'old_wt': 1.0, 'nobs': 0}
+    tr, prev_close = true_range_state_nb(df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64), df['close'].to_numpy(dtype=np.float64), state['prev_close'])
+    values, mean, old_wt, nobs = ewm_mean_state_nb(tr, float(2 * period - 1), state['mean'], state['old_wt'], state['nobs'], 0)
+    return values, {'prev_close': float(prev_close), 'mean': float(mean), 'old_wt': float(old_wt), 'nobs': int(nobs)}
+
+def supertrend_update(df, state=None, period=7, multiplier=3):
+    """
+    Stateful faster_supertrend: ATR state plus the previous bar's final bands and trend direction.
+
+    Returns:
+        tuple: (np.ndarray of supertrend values for the rows of df, new state)
+    """
+    state = state or {'atr': None, 'upper': np.nan, 'lower': np.nan, 'direction': 1, 'count': 0}
+    atr, atr_state = atr_update(df, state['atr'], period)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    med_price = (high + low) / 2
+    matr = multiplier * atr
+    upper = med_price + matr
+    lower = med_price - matr
+    trend, prev_upper, prev_lower, direction, count = final_bands_state_nb(df['close'].to_numpy(dtype=np.float64), upper, lower, state['upper'], state['lower'], state['direction'], state['count'])
+    return trend, {'atr': atr_state, 'upper': float(prev_upper), 'lower': float(prev_lower), 'direction': int(direction), 'count': int(count)}
+
+def average_volume_update(df, state=None, lookback_period=90):
+    """
+    Stateful calculate_average_volume_optimized: rolling mean of close * volume, keeping the last
+    lookback_period - 1 values as state.
+
+    Returns:
+        tuple: (np.ndarray of average volume values for the rows of df, new state)
+    """
+    tail = np.asarray(state['tail'] if state else [], dtype=np.float64)
+    volume_usdt = df['close'].to_numpy(dtype=np.float64) * df['volume'].to_numpy(dtype=np.float64)
+    values, tail = rolling_mean_state_nb(tail, volume_usdt, lookback_period)
+    return values, {'tail': tail.tolist()}
+
+
+# calculation function name -> stateful update function
+INCREMENTAL_INDICATORS = {
+    'calculate_ema': ema_update,
+    'faster_supertrend': supertrend_update,
+    'calculate_average_volume_optimized': average_volume_update,
+}
+
+def incremental_indicator(calculation_func):
+    """
+    Returns the stateful update function of a calculation function, None if it has no stateful version.
+    """
+    return INCREMENTAL_INDICATORS.get(getattr(calculation_func, '__name__', None))
@@ -1,9 +1,10 @@
+import warnings
 import pandas as pd
 from utils.decorators import result_df_decorator
-import pandas_ta as ta
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
+from utils.calculation.slope_r2 import rolling_slope_r2_nb
+from utils.calculation.optimized_indicators import spike_signal, large_gap_signal
+from utils.calculation.batch import rsi_nb, roc_nb, wilder_atr_nb, wilder_supertrend_nb
 
 @result_df_decorator(lambda length: f'ema_{length}')
 def calculate_ema(df, length):
@@ -23,7 +24,7 @@ def calculate_ema(df, length):
 @result_df_decorator(lambda length: f'rsi_{length}')
 def calculate_rsi(df, length):
     """
-    Calculate the Relative Strength Index (RSI) for a given length using the 'pandas_ta' library.
+    Calculate the Relative Strength Index (RSI) for a given length using Wilder's smoothing (numba, same values as pandas_ta / TA-Lib).
 
     Parameters:
     df (pd.DataFrame): DataFrame containing OHLCV data with a 'timestamp' column.
@@ -32,29 +33,44 @@ def calculate_rsi(df, length):
     Returns:
     pd.DataFrame: DataFrame with columns 'timestamp', 'indicator_name', 'indicator_value'.
     """
-    rsi = df.ta.rsi(length=length)
-    return rsi
+    rsi = rsi_nb(df['close'].to_numpy(dtype=np.float64), length)
+    return pd.Series(rsi, index=df.index)
+
+@result_df_decorator(lambda length: f'atr_{length}')
+def calculate_atr(df, length=14):
+    """
+    Calculate the Average True Range (ATR) using Wilder's smoothing (numba, same values as pandas_ta / TA-Lib).
+
+    Parameters:
+    df (pd.DataFrame): DataFrame with 'high', 'low', 'close' prices.
+    length (int): The period for ATR calculation.
+
+    Returns:
+    pd.Series: ATR values.
+    """
+    atr = wilder_atr_nb(df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64), df['close'].to_numpy(dtype=np.float64), length)
+    return pd.Series(atr, index=df.index)
 
 @result_df_decorator(lambda length, atr_multiplier: f'supertrend_{length}_{atr_multiplier}')
 def calculate_supertrend(df, atr_multiplier=3.0, length=10):
     """
-    Calculate Supertrend for a given dataframe using ta library.
+    Calculate Supertrend for a given dataframe, the pandas_ta variant (Wilder's ATR, 0 on the first bar) in numba.
 
     Parameters:
     df (pd.DataFrame): DataFrame with 'high', 'low', 'close' prices.
-    atr_period (int): The period for ATR calculation.
-    multiplier (float): The multiplier for Supertrend.
+    length (int): The period for ATR calculation.
+    atr_multiplier (float): The multiplier for Supertrend.
 
     Returns:
     pd.Series: Supertrend values.
     """
-    supertrend = ta.supertrend(high=df['high'], low=df['low'], close=df['close'], length=length, multiplier=atr_multiplier)
-    column_name = f'SUPERT_{length}_{atr_multiplier}'
-    return supertrend[column_name]
+    supertrend = wilder_supertrend_nb(df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64), df['close'].to_numpy(dtype=np.float64), length, float(atr_multiplier))
+    return pd.Series(supertrend, index=df.index)
 
-@result_df_decorator(lambda length: f'roc_{length}')
+@result_df_decorator(lambda lookback_period: f'roc_{lookback_period}')
 def calculate_roc(df, lookback_period):
-    return ta.roc(df['close'], length=lookback_period)
+    roc = roc_nb(df['close'].to_numpy(dtype=np.float64), lookback_period)
+    return pd.Series(roc, index=df.index)
 
 @result_df_decorator(lambda lookback_period: f'average_volume_{lookback_period}')
 def calculate_average_volume(df,lookback_period):
@@ -63,42 +79,21 @@ def calculate_average_volume(df,lookback_period):
 
 @result_df_decorator(lambda window: f'slope_r2_product_{window}')
 def calculate_exponential_regression(df, window=90):
-    # Convert the timestamp to datetime and set it as the index
-    data = df.copy()
-    data['timestamp'] = pd.to_datetime(data['timestamp'])
-    data = data.set_index('timestamp')
-    data['log_close'] = np.log(data['close'])
-    slopes = []
-    r2_values = []
-    dates = []
-
-    for end in range(window, len(data) + 1):
-        subset = data.iloc[end-window:end]
-        X = (subset.index - subset.index.min()).days.values.reshape(-1, 1)
-        y = np.log(subset['close']).values
-
-        reg = LinearRegression().fit(X, y)
-        slope = reg.coef_[0]
-        r2 = r2_score(y, reg.predict(X))
-
-        slopes.append(slope)
-        r2_values.append(r2)
-        dates.append(subset.index[-1])
-
-    # Create a temporary DataFrame to hold the results
-    results_df = pd.DataFrame({'timestamp': dates, f'Slope_{window}': slopes, f'R2_{window}': r2_values})
-    results_df.set_index('timestamp', inplace=True)
-
-    # Join the results back to the original data
-    data = data.join(results_df, how='left')
-    data.reset_index(inplace=True)
-    _slope_r2_product = data[f'Slope_{window}'] * data[f'R2_{window}']
-    return _slope_r2_product
+    """
+    Slope x R² of a least squares fit of log(close) against the time in days (fractional for intraday bars) since
+    the window's first bar, over a rolling window. NaN for the first window - 1 bars.
+    The fit does not depend on where time is counted from, so days are counted once from the first bar.
+    """
+    timestamps = pd.to_datetime(df['timestamp'])
+    days = ((timestamps - timestamps.iloc[0]) / pd.Timedelta(days=1)).to_numpy(dtype=np.float64)
+    slopes, r2_values = rolling_slope_r2_nb(days, np.log(df['close'].to_numpy(dtype=np.float64)), window, np.nan)
+    return pd.Series(slopes * r2_values, index=df.index)
 
 @result_df_decorator(lambda lookback_period, spike_threshold: f'spike_{lookback_period}_{spike_threshold}')
 def calculate_spike(df, lookback_period, spike_threshold=0.5):
     """
     Calculate if there has been a spike of `spike_threshold` or more in the last `lookback_period`.
+    Deprecated: use utils.calculation.optimized_indicators.calculate_spike_optimized, this calls the same implementation.
 
     Parameters:
     df (pd.DataFrame): DataFrame with 'open' and 'close' prices.
@@ -108,20 +103,16 @@ def calculate_spike(df, lookback_period, spike_threshold=0.5):
     Returns:
     pd.Series: Series with 1 if a spike is present, 0 otherwise.
     """
-    spikes = pd.Series(0, index=df.index)
-    for i in range(lookback_period, len(df)):
-        window = df.iloc[i-lookback_period:i]
-        if any((window['close'] - window['open']) / window['open'] >= spike_threshold):
-            spikes.iloc[i] = 1
-        elif any((window['high'] - window['low']) / window['low'] >= spike_threshold*2):
-            spikes.iloc[i] = 1
-    return spikes
+    warnings.warn('calculate_spike is deprecated, use optimized_indicators.calculate_spike_optimized', DeprecationWarning, stacklevel=3)
+    spikes = spike_signal(df['open'].values, df['close'].values, df['high'].values, df['low'].values, lookback_period, spike_threshold)
+    return pd.Series(spikes, index=df.index)
 
 @result_df_decorator(lambda lookback_period, gap_threshold: f'gap_{lookback_period}_{gap_threshold}')
 def detect_large_gap(df, lookback_period=90, gap_threshold=0.15):
     """
     Detect if there has been a gap up or gap down greater than the specified threshold
     in the last lookback_period days.
+    Deprecated: use utils.calculation.optimized_indicators.detect_large_gap_optimized, this calls the same implementation.
 
     Parameters:
     df (pd.DataFrame): DataFrame with 'open' and 'close' prices.
@@ -131,14 +122,6 @@ def detect_large_gap(df, lookback_period=90, gap_threshold=0.15):
     Returns:
     pd.Series: Series with 1 if a large gap is present, 0 otherwise.
     """
-    gaps = pd.Series(0, index=df.index)
-    for i in range(1, len(df)):
-        if i >= lookback_period:
-            window = df.iloc[i-lookback_period:i+1]
-            gap_up = (window['open'] - window['close'].shift(1)) / window['close'].shift(1)
-            gap_down = (window['open'] - window['close'].shift(1)) / window['close'].shift(1)
-            
-            if any(gap_up >= gap_threshold) or any(gap_down <= -gap_threshold):
-                gaps.iloc[i] = 1
-    
-    return gaps
\ No newline at end of file
+    warnings.warn('detect_large_gap is deprecated, use optimized_indicators.detect_large_gap_optimized', DeprecationWarning, stacklevel=3)
+    gaps = large_gap_signal(df['open'].values, df['close'].values, lookback_period, gap_threshold)
+    return pd.Series(gaps, index=df.index)
\ No newline at end of file
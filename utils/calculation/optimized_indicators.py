@@ -1,73 +1,93 @@
+import warnings
 import numpy as np
 from numba import njit
 import pandas as pd
 from utils.decorators import result_df_decorator
 
-@njit
-def calculate_spike_numba(open_prices, close_prices, high_prices, low_prices, lookback_period, spike_threshold):
-    n = len(open_prices)
-    spikes = np.zeros(n)  # Initialize an array of zeros for the spike results
-
-    for i in range(lookback_period, n):
-        spike_found = False
-        # Check for spike in the lookback window
-        for j in range(i - lookback_period, i):
-            if (close_prices[j] - open_prices[j]) / open_prices[j] >= spike_threshold:
-                spike_found = True
-                break  # Exit early if spike is found
-            elif (high_prices[j] - low_prices[j]) / low_prices[j] >= spike_threshold * 2:
-                spike_found = True
-                break
+def rolling_any(flags, lookback_period, include_current=False):
+    """
+    Rolling max of a per-bar boolean along the first axis, as a running count so it is O(n) whatever the lookback.
+
+    Args:
+        flags (np.ndarray): 1-D (bars) or 2-D (bars x symbols) boolean array.
+        lookback_period (int): Window length in bars.
+        include_current (bool): Window is [i - lookback_period + 1, i] if True, [i - lookback_period, i) otherwise.
+
+    Returns:
+        np.ndarray: float array shaped like flags, 1 where the window has a True flag. 0 for the first lookback_period bars.
+    """
+    n = flags.shape[0]
+    counts = np.zeros((n + 1,) + flags.shape[1:], dtype=np.int64)
+    np.cumsum(flags, axis=0, out=counts[1:])
+    result = np.zeros(flags.shape)
+    if lookback_period >= n:
+        return result
+    end = np.arange(lookback_period, n) + (1 if include_current else 0)
+    result[lookback_period:] = (counts[end] - counts[end - lookback_period]) > 0
+    return result
+
+def spike_flags(open_prices, close_prices, high_prices, low_prices, spike_threshold):
+    """
+    Per-bar spike: a close-open move of spike_threshold or more, or a high-low range of 2 * spike_threshold or more.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((close_prices - open_prices) / open_prices >= spike_threshold) | ((high_prices - low_prices) / low_prices >= spike_threshold * 2)
+
+def gap_flags(open_prices, close_prices, gap_threshold):
+    """
+    Per-bar gap: the open is gap_threshold or more above / below the previous close. False for the first bar.
+    """
+    flags = np.zeros(open_prices.shape, dtype=np.bool_)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap = (open_prices[1:] - close_prices[:-1]) / close_prices[:-1]
+    flags[1:] = (gap >= gap_threshold) | (gap <= -gap_threshold)
+    return flags
+
+def spike_signal(open_prices, close_prices, high_prices, low_prices, lookback_period, spike_threshold):
+    """
+    1 at bar i if any of the lookback_period bars before it (bar i excluded) is a spike, 0 otherwise.
+    Accepts 1-D arrays or 2-D (bars x symbols) arrays.
+    """
+    flags = spike_flags(np.asarray(open_prices, dtype=np.float64), np.asarray(close_prices, dtype=np.float64),
+                        np.asarray(high_prices, dtype=np.float64), np.asarray(low_prices, dtype=np.float64), spike_threshold)
+    return rolling_any(flags, lookback_period)
+
+def large_gap_signal(open_prices, close_prices, lookback_period, gap_threshold):
+    """
+    1 at bar i if any of the last lookback_period opens up to and including bar i gapped by gap_threshold or more
+    from the previous close, 0 otherwise. Accepts 1-D arrays or 2-D (bars x symbols) arrays.
+    """
+    flags = gap_flags(np.asarray(open_prices, dtype=np.float64), np.asarray(close_prices, dtype=np.float64), gap_threshold)
+    return rolling_any(flags, lookback_period, include_current=True)
 
-        if spike_found:
-            spikes[i] = 1
-
-    return spikes
+def calculate_spike_numba(open_prices, close_prices, high_prices, low_prices, lookback_period, spike_threshold):
+    """
+    Deprecated: use spike_signal.
+    """
+    warnings.warn('calculate_spike_numba is deprecated, use spike_signal', DeprecationWarning, stacklevel=2)
+    return spike_signal(open_prices, close_prices, high_prices, low_prices, lookback_period, spike_threshold)
 
 # Wrapper function for easier use with pandas DataFrames
 @result_df_decorator(lambda lookback_period, spike_threshold: f'spike_{lookback_period}_{spike_threshold}')
 def calculate_spike_optimized(df, lookback_period, spike_threshold=0.5):
-    open_prices = df['open'].values
-    close_prices = df['close'].values
-    high_prices = df['high'].values
-    low_prices = df['low'].values
-    
-    # Call the Numba-accelerated function
-    spike_array = calculate_spike_numba(open_prices, close_prices, high_prices, low_prices, lookback_period, spike_threshold)
-    
+    spike_array = spike_signal(df['open'].values, df['close'].values, df['high'].values, df['low'].values, lookback_period, spike_threshold)
+
     # Return as a pandas Series to keep the DataFrame structure
     return pd.Series(spike_array, index=df.index)
 
 
-@njit
 def detect_large_gap_numba(open_prices, close_prices, lookback_period, gap_threshold):
-    n = len(open_prices)
-    gaps = np.zeros(n)  # Initialize a result array filled with 0s
-
-    for i in range(1, n):
-        if i >= lookback_period:
-            for j in range(i - lookback_period, i):
-                prev_close = close_prices[j]
-                curr_open = open_prices[j + 1]
-
-                # Calculate gap up and gap down
-                gap = (curr_open - prev_close) / prev_close
-                
-                if gap >= gap_threshold or gap <= -gap_threshold:
-                    gaps[i] = 1
-                    break  # Exit early if gap is found
-
-    return gaps
+    """
+    Deprecated: use large_gap_signal.
+    """
+    warnings.warn('detect_large_gap_numba is deprecated, use large_gap_signal', DeprecationWarning, stacklevel=2)
+    return large_gap_signal(open_prices, close_prices, lookback_period, gap_threshold)
 
 # Wrapper function to work with pandas DataFrame
 @result_df_decorator(lambda lookback_period, gap_threshold: f'gap_{lookback_period}_{gap_threshold}')
 def detect_large_gap_optimized(df, lookback_period=90, gap_threshold=0.15):
-    open_prices = df['open'].values
-    close_prices = df['close'].values
-    
-    # Call the Numba-optimized function
-    gaps_array = detect_large_gap_numba(open_prices, close_prices, lookback_period, gap_threshold)
-    
+    gaps_array = large_gap_signal(df['open'].values, df['close'].values, lookback_period, gap_threshold)
+
     # Convert the result back into a pandas Series
     return pd.Series(gaps_array, index=df.index)
 
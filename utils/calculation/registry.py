@@ -0,0 +1,179 @@
+'''
+Usage :
+from utils.calculation.registry import INDICATOR_REGISTRY, resolve_specs, required_lookback
+
+spec = INDICATOR_REGISTRY["ema"]
+spec.outputs(length=50)                 # ['ema_50']
+spec.warmup(length=50)                  # bars of history before the values are usable
+result_df = spec(ohlcv_df, length=50)   # long DataFrame (timestamp, indicator_name, indicator_value)
+
+# Pipelines pass (name or calculation_func, params) specs; resolve_specs drops duplicates and raises when two
+# different indicators would write the same name
+indicator_specs = resolve_specs([("ema", {"length": 100}), (calculate_ema, {"length": 100})])
+'''
+import importlib
+import json
+from typing import Dict, Callable, Any
+
+class IndicatorSpec:
+    """
+    Declaration of an indicator calculation function.
+
+    Args:
+        name (str): Registry name.
+        module (str), function (str): Where the calculation function lives. It is imported on first use, so the
+                                      registry can be imported without vectorbt / numba compilation.
+        inputs (tuple): ohlcv columns the function reads.
+        params (dict): Parameters with their defaults, None for required ones.
+        warmup (callable): params -> bars of history needed before the first usable value. Recursive indicators (EMA,
+                           Wilder's RSI / ATR, supertrend) never fully forget old bars, their warm-up is the number of
+                           bars after which earlier bars weigh less than ~0.05%.
+        outputs (callable): params -> indicator names written. Defaults to the function's result_df_decorator name(s).
+        family (str): Indicators of one family write the same values under the same names (e.g. slope_r2 and
+                      slope_r2_multi), so resolve_specs can drop one for the other. Defaults to name.
+    """
+    def __init__(self, name : str, module : str, function : str, inputs : tuple, params : dict, warmup : Callable[..., int], outputs : Callable[..., list] = None, family : str = None):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.inputs = tuple(inputs)
+        self.params = dict(params)
+        self._warmup = warmup
+        self._outputs = outputs
+        self.family = family or name
+        self._func = None
+
+    @property
+    def func(self) -> Callable:
+        if self._func is None:
+            self._func = getattr(importlib.import_module(self.module), self.function)
+        return self._func
+
+    def resolve(self, params : dict) -> dict:
+        """
+        Returns params with the defaults of omitted parameters filled in. Raises ValueError for unknown or missing parameters.
+        """
+        unknown = set(params) - set(self.params)
+        if unknown:
+            raise ValueError(f"Unknown parameters {sorted(unknown)} for indicator '{self.name}', expected {list(self.params)}")
+        resolved = {**self.params, **params}
+        missing = [name for name, value in resolved.items() if value is None]
+        if missing:
+            raise ValueError(f"Missing parameters {missing} for indicator '{self.name}'")
+        return resolved
+
+    def outputs(self, **params) -> list:
+        params = self.resolve(params)
+        if self._outputs is not None:
+            return list(self._outputs(**params))
+        if hasattr(self.func, 'indicator_names'):
+            return self.func.indicator_names(**params)
+        return [self.func.indicator_name(**params)]
+
+    def warmup(self, **params) -> int:
+        return int(self._warmup(**self.resolve(params)))
+
+    def __call__(self, df, **params):
+        return self.func(df, **self.resolve(params))
+
+    def __repr__(self):
+        return f"IndicatorSpec('{self.name}', {self.module}.{self.function}, params={self.params})"
+
+# Dictionary to store { indicator_name -> IndicatorSpec }
+INDICATOR_REGISTRY: Dict[str, IndicatorSpec] = {}
+
+def register_indicator(spec : IndicatorSpec) -> IndicatorSpec:
+    INDICATOR_REGISTRY[spec.name] = spec
+    return spec
+
+register_indicator(IndicatorSpec('ema', 'utils.calculation.indicators', 'calculate_ema', ('close',), {'length': None}, lambda length: 4 * length))
+register_indicator(IndicatorSpec('rsi', 'utils.calculation.indicators', 'calculate_rsi', ('close',), {'length': 14}, lambda length: 8 * length))
+register_indicator(IndicatorSpec('atr', 'utils.calculation.indicators', 'calculate_atr', ('high', 'low', 'close'), {'length': 14}, lambda length: 8 * length))
+register_indicator(IndicatorSpec('supertrend', 'utils.calculation.indicators', 'calculate_supertrend', ('high', 'low', 'close'), {'atr_multiplier': 3.0, 'length': 10}, lambda atr_multiplier, length: 8 * length))
+register_indicator(IndicatorSpec('faster_supertrend', 'utils.calculation.supertrend', 'faster_supertrend', ('high', 'low', 'close'), {'period': 7, 'multiplier': 3}, lambda period, multiplier: 8 * period))
+register_indicator(IndicatorSpec('roc', 'utils.calculation.indicators', 'calculate_roc', ('close',), {'lookback_period': None}, lambda lookback_period: lookback_period))
+register_indicator(IndicatorSpec('average_volume', 'utils.calculation.optimized_indicators', 'calculate_average_volume_optimized', ('close', 'volume'), {'lookback_period': None}, lambda lookback_period: lookback_period - 1))
+register_indicator(IndicatorSpec('slope_r2', 'utils.calculation.slope_r2', 'calculate_exponential_regression_optimized', ('close',), {'window': 90}, lambda window: window - 1))
+register_indicator(IndicatorSpec('slope_r2_multi', 'utils.calculation.slope_r2', 'calculate_exponential_regression_multi', ('close',), {'windows': (90, 30, 15)}, lambda windows: max(windows) - 1, family='slope_r2'))
+register_indicator(IndicatorSpec('spike', 'utils.calculation.optimized_indicators', 'calculate_spike_optimized', ('open', 'high', 'low', 'close'), {'lookback_period': None, 'spike_threshold': 0.5}, lambda lookback_period, spike_threshold: lookback_period))
+register_indicator(IndicatorSpec('gap', 'utils.calculation.optimized_indicators', 'detect_large_gap_optimized', ('open', 'close'), {'lookback_period': 90, 'gap_threshold': 0.15}, lambda lookback_period, gap_threshold: lookback_period))
+register_indicator(IndicatorSpec('sustained_volume_spike', 'utils.calculation.optimized_indicators', 'calculate_sustained_volume_spike', ('volume',), {'lookback_period': None, 'spike_duration': None, 'threshold': None},
+                                 lambda lookback_period, spike_duration, threshold: lookback_period + spike_duration))
+
+def get_indicator(indicator) -> IndicatorSpec:
+    """
+    Returns the registered spec of an indicator given by name or calculation function, None for unregistered functions.
+    """
+    if isinstance(indicator, str):
+        if indicator not in INDICATOR_REGISTRY:
+            raise ValueError(f"Unknown indicator '{indicator}', use one of {list(INDICATOR_REGISTRY)} or a calculation function")
+        return INDICATOR_REGISTRY[indicator]
+    for spec in INDICATOR_REGISTRY.values():
+        if spec.module == getattr(indicator, '__module__', None) and spec.function == getattr(indicator, '__name__', None):
+            return spec
+    return None
+
+def resolve_spec(indicator, params : dict):
+    """
+    Returns (calculation_func, params with defaults) for an indicator given by name or calculation function.
+    """
+    spec = get_indicator(indicator)
+    if spec is None:
+        return indicator, dict(params)
+    return spec.func, spec.resolve(params)
+
+def resolve_specs(indicator_specs : list) -> list:
+    """
+    Turns (name or calculation_func, params) specs into (calculation_func, params) specs with defaults filled in,
+    dropping specs whose outputs are all written by an earlier spec of the same family (e.g. the same EMA given twice,
+    or by name and by function).
+
+    Returns:
+        list: (calculation_func, params) tuples in their original order.
+
+    Raises:
+        ValueError: If indicators of different families write the same name (e.g. supertrend with length=7 and
+                    faster_supertrend with period=7 both write supertrend_7_3.0), as the stored values would depend on
+                    the order of the specs.
+    """
+    resolved = []
+    seen_calls = set()
+    # {indicator name written : spec writing it}
+    seen_outputs = {}
+    for indicator, params in indicator_specs:
+        spec = get_indicator(indicator)
+        calculation_func, params = resolve_spec(indicator, params)
+        call_key = (getattr(calculation_func, '__module__', None), getattr(calculation_func, '__qualname__', repr(calculation_func)), json.dumps(sorted(params.items()), default=str))
+        if call_key in seen_calls:
+            continue
+        if spec is not None:
+            outputs = spec.outputs(**params)
+            for output in outputs:
+                if output in seen_outputs and seen_outputs[output].family != spec.family:
+                    raise ValueError(f"Indicators '{seen_outputs[output].name}' and '{spec.name}' both write '{output}' with different values, "
+                                     f"keep only one of them in the specs")
+            if all(output in seen_outputs for output in outputs):
+                continue
+            seen_outputs.update({output: spec for output in outputs})
+        seen_calls.add(call_key)
+        resolved.append((calculation_func, params))
+    return resolved
+
+def required_lookback(indicator_specs : list) -> int:
+    """
+    Longest warm-up of the registered indicators in indicator_specs, i.e. how many bars before the first bar to
+    (re)calculate an incremental update needs. Unregistered calculation functions are not counted.
+    """
+    warmups = [spec.warmup(**params) for spec, params in ((get_indicator(indicator), params) for indicator, params in indicator_specs) if spec is not None]
+    return max(warmups, default=0)
+
+def required_inputs(indicator_specs : list) -> list:
+    """
+    ohlcv columns read by the registered indicators in indicator_specs, e.g. to read only those columns.
+    """
+    columns = {}
+    for indicator, _ in indicator_specs:
+        spec = get_indicator(indicator)
+        if spec is not None:
+            columns.update(dict.fromkeys(spec.inputs))
+    return list(columns)
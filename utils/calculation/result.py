@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+class IndicatorResult:
+    """
+    Values of one or more indicators calculated over the bars of an ohlcv DataFrame.
+
+    Every indicator is a float64 array, and all of them share one reference to the bars' timestamps. Nothing is
+    repeated per row, so a result can be written to columnar storage (see Finstore.Write.technical_data) without
+    building the long (timestamp, indicator_name, indicator_value) DataFrame and its object columns.
+
+    Args:
+        timestamps (pd.Series | np.ndarray): Timestamps of the bars, kept as given (not copied).
+        values (dict): {indicator_name : array-like of len(timestamps)}, converted to float64 (not copied if already float64).
+    """
+    def __init__(self, timestamps, values : dict):
+        self.timestamps = timestamps
+        self.values = {}
+        for name, indicator_values in values.items():
+            indicator_values = np.asarray(indicator_values, dtype=np.float64)
+            if indicator_values.shape != (len(timestamps),):
+                raise ValueError(f"Indicator '{name}' has {indicator_values.shape} values for {len(timestamps)} timestamps")
+            self.values[str(name)] = indicator_values
+
+    @property
+    def names(self) -> list:
+        return list(self.values)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, name : str) -> np.ndarray:
+        return self.values[name]
+
+    def __contains__(self, name : str) -> bool:
+        return name in self.values
+
+    def __repr__(self):
+        return f"IndicatorResult({self.names}, bars={len(self)})"
+
+    def select(self, mask) -> 'IndicatorResult':
+        """
+        Result for the bars where mask (boolean array of len(self)) is True.
+        """
+        return IndicatorResult(self.timestamps[mask], {name: values[mask] for name, values in self.values.items()})
+
+    def to_long_df(self) -> pd.DataFrame:
+        """
+        Long DataFrame with columns 'timestamp', 'indicator_name', 'indicator_value', as returned by result_df_decorator.
+        """
+        frames = [pd.DataFrame({'timestamp': self.timestamps, 'indicator_name': name, 'indicator_value': values}) for name, values in self.values.items()]
+        if not frames:
+            return pd.DataFrame(columns=['timestamp', 'indicator_name', 'indicator_value'])
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    def to_wide_df(self) -> pd.DataFrame:
+        """
+        DataFrame with one column per indicator, indexed by timestamp.
+        """
+        return pd.DataFrame(self.values, index=pd.Index(self.timestamps, name='timestamp'))
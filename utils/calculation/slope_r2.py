@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 from numba import njit , prange
-from utils.decorators import result_df_decorator
+from utils.decorators import result_df_decorator, multi_result_df_decorator
 
 @njit
 def calculate_slope_r2(x, y):
@@ -26,21 +26,131 @@ def calculate_slope_r2(x, y):
     return slope, r2
 
 @njit
-def calculate_slope_r2_rolling(log_close, window):
-    n = len(log_close)
-    slopes = np.zeros(n)
-    r2_values = np.zeros(n)
-    
+def rolling_slope_r2_nb(x, y, window, warmup_value):
+    """
+    Least squares slope and R² of y against x over a rolling window in O(n).
+
+    Running sums (Σx, Σx², Σy, Σxy, Σy²) are slid by one bar per step instead of summing each window again.
+    They are taken relative to the first (x, y) of the window and recomputed exactly every `window` bars, which
+    keeps the magnitudes small and stops rounding errors from accumulating. Slope and R² do not change when x or
+    y are shifted, so the results match calculate_slope_r2 on every window.
+    Windows containing a non-finite y give NaN, flat windows (zero variance of y) give NaN R².
+
+    Args:
+        x (np.ndarray): x value of each bar (e.g. np.arange(n) or days since the first bar).
+        y (np.ndarray): y value of each bar.
+        window (int): window length.
+        warmup_value (float): value of the first window - 1 bars.
+
+    Returns:
+        tuple: (slopes, r2_values) arrays of len(y).
+    """
+    n = len(y)
+    slopes = np.full(n, warmup_value)
+    r2_values = np.full(n, warmup_value)
     if window <= 0 or n < window:
         return slopes, r2_values
-    
+
+    non_finite = 0
+    for k in range(window - 1):
+        if not np.isfinite(y[k]):
+            non_finite += 1
+
+    sum_x = sum_y = sum_xx = sum_xy = sum_yy = 0.0
+    x_ref = y_ref = 0.0
+    sums_valid = False
+    steps = 0
     for i in range(window - 1, n):
-        y = log_close[i-window+1:i+1]
-        x = np.arange(window)
-        slope, r2 = calculate_slope_r2(x, y)
+        start = i - window + 1
+        if not np.isfinite(y[i]):
+            non_finite += 1
+        if start > 0 and not np.isfinite(y[start - 1]):
+            non_finite -= 1
+        if non_finite > 0:
+            slopes[i] = np.nan
+            r2_values[i] = np.nan
+            sums_valid = False
+            continue
+
+        if not sums_valid or steps >= window:
+            x_ref = x[start]
+            y_ref = y[start]
+            sum_x = sum_y = sum_xx = sum_xy = sum_yy = 0.0
+            for k in range(start, i + 1):
+                xk = x[k] - x_ref
+                yk = y[k] - y_ref
+                sum_x += xk
+                sum_y += yk
+                sum_xx += xk * xk
+                sum_xy += xk * yk
+                sum_yy += yk * yk
+            sums_valid = True
+            steps = 0
+        else:
+            x_old = x[start - 1] - x_ref
+            y_old = y[start - 1] - y_ref
+            x_new = x[i] - x_ref
+            y_new = y[i] - y_ref
+            sum_x += x_new - x_old
+            sum_y += y_new - y_old
+            sum_xx += x_new * x_new - x_old * x_old
+            sum_xy += x_new * y_new - x_old * y_old
+            sum_yy += y_new * y_new - y_old * y_old
+            steps += 1
+
+        denominator = window * sum_xx - sum_x * sum_x
+        if denominator == 0:
+            slopes[i] = np.nan
+            r2_values[i] = np.nan
+            continue
+        slope = (window * sum_xy - sum_x * sum_y) / denominator
+        ss_tot = sum_yy - sum_y * sum_y / window
         slopes[i] = slope
-        r2_values[i] = r2
-    
+        # Explained over total sum of squares, equal to 1 - ss_res / ss_tot for a least squares fit
+        r2_values[i] = slope * slope * (denominator / window) / ss_tot if ss_tot > 0 else np.nan
+
+    return slopes, r2_values
+
+@njit
+def calculate_slope_r2_rolling(log_close, window):
+    x = np.arange(len(log_close)).astype(np.float64)
+    return rolling_slope_r2_nb(x, log_close, window, 0.0)
+
+@njit
+def calculate_slope_r2_rolling_multi(log_close, windows):
+    """
+    Rolling slope and R² of log_close for several windows in one call.
+
+    Returns:
+        tuple: (slopes, r2_values) arrays of shape (len(windows), len(log_close)), 0 for each window's warm-up bars.
+    """
+    n = len(log_close)
+    x = np.arange(n).astype(np.float64)
+    slopes = np.empty((len(windows), n))
+    r2_values = np.empty((len(windows), n))
+    for w in range(len(windows)):
+        slopes[w], r2_values[w] = rolling_slope_r2_nb(x, log_close, windows[w], 0.0)
+    return slopes, r2_values
+
+@njit(parallel=True)
+def calculate_slope_r2_batch(log_close, windows):
+    """
+    Rolling slope and R² for a (time x symbol) array, symbols processed in parallel.
+    Leading NaNs of a symbol (listed later) and its warm-up bars are NaN.
+
+    Returns:
+        tuple: (slopes, r2_values) arrays of shape (len(windows), time, symbol).
+    """
+    n, m = log_close.shape
+    x = np.arange(n).astype(np.float64)
+    slopes = np.empty((len(windows), n, m))
+    r2_values = np.empty((len(windows), n, m))
+    for column in prange(m):
+        y = np.ascontiguousarray(log_close[:, column])
+        for w in range(len(windows)):
+            column_slopes, column_r2 = rolling_slope_r2_nb(x, y, windows[w], np.nan)
+            slopes[w, :, column] = column_slopes
+            r2_values[w, :, column] = column_r2
     return slopes, r2_values
 
 @result_df_decorator(lambda window: f'slope_r2_product_{window}')
@@ -51,6 +161,18 @@ def calculate_exponential_regression_optimized(df, window=90):
     slope_r2_product = slopes * r2_values
     return pd.Series(slope_r2_product, index=df.index)
 
+@multi_result_df_decorator(lambda windows: [f'slope_r2_product_{window}' for window in windows])
+def calculate_exponential_regression_multi(df, windows=(90, 30, 15)):
+    """
+    calculate_exponential_regression_optimized for several windows in one pass over the data.
+
+    Returns:
+        pd.DataFrame: long DataFrame with columns 'timestamp', 'indicator_name' (slope_r2_product_<window>), 'indicator_value'.
+    """
+    log_close = np.log(df['close'].values)
+    slopes, r2_values = calculate_slope_r2_rolling_multi(log_close, np.asarray(windows, dtype=np.int64))
+    return [slopes[w] * r2_values[w] for w in range(len(windows))]
+
 @result_df_decorator(lambda window: f'slope_r2_volume_{window}')
 def calculate_exponential_regression_volume(df, window=90):
     log_close = np.log(df['volume'].values)
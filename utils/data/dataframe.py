@@ -25,7 +25,7 @@ def get_top_symbols_by_average_volume(ohlcv_data : dict, top_n : int = 500, year
         if 'volume' in df.columns and 'close' in df.columns and 'timestamp' in df.columns:
             # Filter the DataFrame to include only the last year's data
             #df_last_year = df[df['timestamp'] >= year.strftime('%Y-%m-%d')]
-            df_last_year = df[(year_before.strftime('%Y-%m-%d') < df['timestamp']) & (df['timestamp'] < year.strftime('%Y-%m-%d'))]
+            df_last_year = df[(year_before.normalize() < df['timestamp']) & (df['timestamp'] < year.normalize())]
 
             if not df_last_year.empty:
                 avg_volume = df_last_year['volume'].mean()
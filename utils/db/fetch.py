@@ -109,7 +109,7 @@ def fetch_entries(batch_inserter=None, market_name=None, timeframe=None, symbol_
     elif storage_system == 'finstore':
         finstore = Finstore(market_name=market_name, timeframe=timeframe, enable_append=True, pair=pair)
         symbols = finstore.read.get_symbol_list()
-        merged_dataframe = finstore.read.symbol_list(symbol_list=symbols, merged_dataframe=True)
+        merged_dataframe = finstore.read.symbol_list(symbol_list=symbols, merged_dataframe=True, start=start_timestamp)
         return merged_dataframe
 
 #@cache_decorator(expire=60*60*24*30)
@@ -285,15 +285,12 @@ def fetch_latest_date(market_name=None, timeframe=None, storage_system = 'finsto
 
         finstore = Finstore(market_name=market_name, timeframe=timeframe, enable_append=True, pair=pair)
         symbols = finstore.read.get_symbol_list()
-        ohlcv_data = finstore.read.symbol_list(symbol_list=symbols)
-    
-        latest_timestamps = {}
-        for symbol, df in ohlcv_data.items():
-            if not df.empty:
-                latest_timestamps[symbol] = df['timestamp'].max()
+        # Last timestamps come from the market/timeframe manifest, no parquet file is opened
+        symbol_info = finstore.read.symbol_info(symbol_list=symbols)
+        if symbol_info.empty:
+            return pd.NaT
 
-        latest_timestamps_series = pd.Series(latest_timestamps)
-        min_latest_timestamp = latest_timestamps_series.min()
+        min_latest_timestamp = symbol_info['last_timestamp'].min()
 
         return pd.to_datetime(min_latest_timestamp)
 
@@ -1,3 +1,62 @@
 import threading
+import os
+import time
 
-generic_lock = threading.Lock()
\ No newline at end of file
+generic_lock = threading.Lock()
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+class FileLock:
+    """
+    Exclusive lock on a file that works across processes (fcntl.flock on Unix, msvcrt.locking on Windows).
+    Each acquire opens its own handle, so it also serializes threads of the same process.
+
+    Usage:
+        with FileLock('database/finstore/.../BTC/USDT/.lock'):
+            ...
+    """
+    def __init__(self, path : str, poll_interval : float = 0.05):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.fd = None
+
+    def acquire(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.name == 'nt':
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(self.poll_interval)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.fd = fd
+
+    def release(self):
+        if self.fd is None:
+            return
+        try:
+            if os.name == 'nt':
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
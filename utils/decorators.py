@@ -7,22 +7,75 @@ import pickle
 import inspect
 import time
 import functools
+from utils.calculation.result import IndicatorResult
 
 # Create a cache object
 cache = dc.Cache('database/db')
 
 def result_df_decorator(indicator_name_func):
+    """
+    Wraps an indicator calculation func(df, **params) returning a Series into a long DataFrame with columns
+    'timestamp', 'indicator_name', 'indicator_value'.
+
+    indicator_name_func gets the parameters it names as keyword arguments, bound to func's signature with its
+    defaults applied, so positional arguments and omitted defaults name the indicator correctly.
+    The name is also available without calculating, as wrapper.indicator_name(**params).
+    wrapper.result(df, **params) returns the values as an IndicatorResult (float64 array sharing df's timestamps)
+    instead of the long DataFrame, for writers that do not need the repeated name and object columns.
+    """
+    name_params = list(inspect.signature(indicator_name_func).parameters)
     def decorator(func):
+        signature = inspect.signature(func)
+
+        def indicator_name(*args, **kwargs):
+            bound = signature.bind(None, *args, **kwargs)
+            bound.apply_defaults()
+            return indicator_name_func(**{name: bound.arguments[name] for name in name_params})
+
         @wraps(func)
         def wrapper(df, *args, **kwargs):
             indicator_values = func(df, *args, **kwargs)
-            indicator_name = indicator_name_func(*args, **kwargs)
             result_df = pd.DataFrame({
                 'timestamp': df['timestamp'],
-                'indicator_name': indicator_name,
+                'indicator_name': indicator_name(*args, **kwargs),
                 'indicator_value': indicator_values
             })
             return result_df
+
+        def result(df, *args, **kwargs):
+            indicator_values = func(df, *args, **kwargs)
+            if isinstance(indicator_values, pd.Series) and not indicator_values.index.equals(df.index):
+                indicator_values = indicator_values.reindex(df.index)
+            return IndicatorResult(df['timestamp'], {indicator_name(*args, **kwargs): indicator_values})
+
+        wrapper.indicator_name = indicator_name
+        wrapper.result = result
+        return wrapper
+    return decorator
+
+def multi_result_df_decorator(indicator_names_func):
+    """
+    result_df_decorator for a calculation func(df, **params) returning one array per name in indicator_names_func(**params).
+    The long DataFrame holds the indicators one after the other.
+    """
+    name_params = list(inspect.signature(indicator_names_func).parameters)
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def indicator_names(*args, **kwargs):
+            bound = signature.bind(None, *args, **kwargs)
+            bound.apply_defaults()
+            return list(indicator_names_func(**{name: bound.arguments[name] for name in name_params}))
+
+        def result(df, *args, **kwargs):
+            return IndicatorResult(df['timestamp'], dict(zip(indicator_names(*args, **kwargs), func(df, *args, **kwargs))))
+
+        @wraps(func)
+        def wrapper(df, *args, **kwargs):
+            return result(df, *args, **kwargs).to_long_df()
+
+        wrapper.indicator_names = indicator_names
+        wrapper.result = result
         return wrapper
     return decorator
 